@@ -1,13 +1,28 @@
 # algorithms/a_star.py - GÜNCELLENMİŞ
 import heapq
+import math
+import time
+from collections import OrderedDict
 from typing import Tuple, Dict, List, Optional
+import numpy as np
 from utils.geometry import calculate_distance
+from utils.spatial_index import ZoneIndex
+from utils.time_utils import time_to_minutes, minutes_to_time, DAY_MINUTES
 
 # Türkiye koordinat sınırları
 LAT_MIN, LAT_MAX = 36.0, 42.0  # Enlem
 LON_MIN, LON_MAX = 26.0, 45.0  # Boylam
 
+# Görünürlük grafı köşelerinin poligon dışına itilme payı
+VISIBILITY_MARGIN = 0.01
+# calculate_edge_weight içindeki mesafe katsayıları (1.5 + 0.1 × 100)
+EDGE_COST_PER_UNIT = 1.5 + 0.1 * 100
+# Yol önbelleği anahtarında uç noktaların yuvarlandığı ondalık basamak
+PATH_CACHE_PRECISION = 3
+
 class Node:
+    __slots__ = ('position', 'g', 'h', 'f', 'parent')
+
     def __init__(self, position: Tuple[float, float], g: float = 0.0, h: float = 0.0, parent: Optional['Node'] = None):
         self.position = position
         self.g = g  # Başlangıçtan buraya maliyet
@@ -19,24 +34,127 @@ class Node:
         return self.f < other.f
 
 class AStar:
-    def __init__(self, no_fly_zones: List):
-        self.no_fly_zones = no_fly_zones
+    def __init__(self, no_fly_zones: List, cache_size: int = 256):
         # Adjacency list (komşuluk listesi) - EKLENEN ÖZELLİK
         self.adjacency_list = {}
+        # LRU yol önbelleği: (yöntem, uçlar, aktif bölgeler) -> yol
+        self.cache_size = cache_size
+        self._path_cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.no_fly_zones = no_fly_zones
+
+    @property
+    def no_fly_zones(self) -> List:
+        return self._no_fly_zones
+
+    @no_fly_zones.setter
+    def no_fly_zones(self, zones: List):
+        self._no_fly_zones = zones
+        self._invalidate_caches()
+
+    def _invalidate_caches(self):
+        """Bölge listesine bağlı tüm önbellekleri temizle"""
+        self._zones_signature = tuple(id(nfz) for nfz in self._no_fly_zones)
+        # Sınır kutusu ızgarası: kenar testi yalnızca aday bölgelerde yapılır
+        self._zone_index = ZoneIndex(self._no_fly_zones)
+        # Dakika -> aktif bölge bit maskesi; önbellekler ham zaman yerine bu maskeyle anahtarlanır
+        self._timeline = self._zone_index.timeline
+        self._active_arrays = {}
+        # Aktif bölge kümesine göre önbelleğe alınmış görünürlük grafları
+        self._visibility_graphs = {}
+        self._path_cache.clear()
+
+    def _check_zones_changed(self):
+        """Liste yerinde değiştirildiyse (ekleme/silme) önbellekleri geçersiz kıl"""
+        if tuple(id(nfz) for nfz in self._no_fly_zones) != self._zones_signature:
+            self._invalidate_caches()
 
-    def build_adjacency_list(self, nodes: List[Tuple[float, float]]):
-        """Graf için komşuluk listesi oluştur - EKSİK OLAN ÖZELLIK"""
+    def zone_hits(self, starts, ends) -> np.ndarray:
+        """Parçalar × tüm bölgeler kesişim matrisi"""
+        self._check_zones_changed()
+        return self._zone_index.segment_hits(starts, ends)
+
+    def active_set(self, current_time: str) -> int:
+        """Verilen zamanda aktif bölgelerin bit maskesi (i. bit = i. bölge)"""
+        self._check_zones_changed()
+        return self._timeline.mask_at(current_time)
+
+    def active_mask(self, current_time: str) -> np.ndarray:
+        """Verilen zamanda aktif olan bölgelerin maskesi"""
+        active = self.active_set(current_time)
+        if active not in self._active_arrays:
+            self._active_arrays[active] = np.array([bool(active >> i & 1) for i in range(len(self.no_fly_zones))],
+                                                   dtype=bool)
+        return self._active_arrays[active]
+
+    def cache_info(self) -> Dict:
+        """Önbellek isabet/ıska sayaçları"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'hit_rate': self.cache_hits / total if total else 0.0,
+            'size': len(self._path_cache),
+            'max_size': self.cache_size
+        }
+
+    def clear_cache(self):
+        """Yol önbelleğini ve sayaçları sıfırla"""
+        self._path_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def build_adjacency_list(self, nodes: List[Tuple[float, float]], radius: float = 5.0):
+        """Graf için komşuluk listesi oluştur
+
+        Düğümler radius boyutlu hücrelere (uniform grid) dağıtılır; yalnızca komşu
+        9 hücredeki çiftler karşılaştırılır, kenar ağırlıkları toplu hesaplanır.
+        """
         self.adjacency_list = {}
         for node in nodes:
             self.adjacency_list[node] = []
-            
-        for i, node1 in enumerate(nodes):
-            for j, node2 in enumerate(nodes):
-                if i != j:
-                    distance = calculate_distance(node1, node2)
-                    if distance <= 5.0:  # Komşuluk eşiği
-                        weight = self.calculate_edge_weight(node1, node2, distance)
-                        self.adjacency_list[node1].append((node2, weight))
+        if len(nodes) < 2:
+            return
+
+        points = np.asarray(nodes, dtype=float)
+        cells = np.floor(points / radius).astype(np.int64)
+        buckets = {}
+        for idx, cell in enumerate(map(tuple, cells.tolist())):
+            buckets.setdefault(cell, []).append(idx)
+        buckets = {cell: np.asarray(members) for cell, members in buckets.items()}
+
+        pair_i, pair_j = [], []
+        for (cx, cy), members in buckets.items():
+            for ox in (-1, 0, 1):
+                for oy in (-1, 0, 1):
+                    others = buckets.get((cx + ox, cy + oy))
+                    if others is None:
+                        continue
+                    ii, jj = np.meshgrid(members, others, indexing='ij')
+                    pair_i.append(ii.ravel())
+                    pair_j.append(jj.ravel())
+        pair_i = np.concatenate(pair_i)
+        pair_j = np.concatenate(pair_j)
+
+        diff = points[pair_j] - points[pair_i]
+        distances = np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2)
+        keep = (pair_i != pair_j) & (distances <= radius)  # Komşuluk eşiği
+        pair_i, pair_j, distances = pair_i[keep], pair_j[keep], distances[keep]
+
+        # Önceki çift döngüsüyle aynı sıra: önce i, sonra j
+        order = np.lexsort((pair_j, pair_i))
+        pair_i, pair_j, distances = pair_i[order], pair_j[order], distances[order]
+        weights = self.calculate_edge_weights(points[pair_i], points[pair_j], distances)
+
+        for i, j, weight in zip(pair_i.tolist(), pair_j.tolist(), weights.tolist()):
+            self.adjacency_list[nodes[i]].append((nodes[j], weight))
+
+    def calculate_edge_weights(self, starts: np.ndarray, ends: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        """calculate_edge_weight formülünün (N, 2) kenar dizileri için toplu hali"""
+        weights = distances * 1.5 + (distances * 0.1) * 100
+        # Kestiği her bölge için büyük ceza
+        return weights + 500 * self.zone_hits(starts, ends).sum(axis=1)
 
     def calculate_edge_weight(self, start: Tuple[float, float], end: Tuple[float, float], distance: float) -> float:
         """Kenar ağırlığı hesaplama - EKSİK OLAN FORMULA"""
@@ -47,10 +165,7 @@ class AStar:
         energy_consumption = (distance * 0.1) * 100  # Basit enerji modeli
         
         # 3. No-fly zone cezası
-        nfz_penalty = 0
-        for nfz in self.no_fly_zones:
-            if nfz.does_path_intersect(start, end):
-                nfz_penalty += 500  # Büyük ceza
+        nfz_penalty = 500 * int(self.zone_hits([start], [end]).sum())  # Büyük ceza
         
         # Toplam ağırlık
         total_weight = distance_weight + energy_consumption + nfz_penalty
@@ -62,10 +177,8 @@ class AStar:
         base_distance = calculate_distance(current, goal)
         
         # No-fly zone cezası ekleme  
-        nfz_penalty = 0
-        for nfz in self.no_fly_zones:
-            if nfz.is_active(current_time) and nfz.does_path_intersect(current, goal):
-                nfz_penalty += 200  # Heuristic için ceza
+        hits = self.zone_hits([current], [goal])[0] & self.active_mask(current_time)
+        nfz_penalty = 200 * int(hits.sum())  # Heuristic için ceza
         
         return base_distance + nfz_penalty
 
@@ -81,61 +194,611 @@ class AStar:
             current = current.parent
         return path[::-1]
 
+    def _trace_parents(self, parents: Dict, position: Tuple[float, float]) -> List[Tuple[float, float]]:
+        """Ebeveyn tablosundan yolu geri izle"""
+        path = []
+        while position is not None:
+            path.append(position)
+            position = parents[position]
+        return path[::-1]
+
     def is_valid_path(self, start: Tuple[float, float], end: Tuple[float, float], current_time: str) -> bool:
-        for nfz in self.no_fly_zones:
-            if nfz.is_active(current_time) and nfz.does_path_intersect(start, end):
-                return False
-        return True
+        return not (self.zone_hits([start], [end])[0] & self.active_mask(current_time)).any()
+
+    def valid_segments(self, starts, ends, current_time: str) -> np.ndarray:
+        """is_valid_path'in toplu hali: hiçbir aktif bölgeyi kesmeyen parçaların maskesi"""
+        return ~(self.zone_hits(starts, ends) & self.active_mask(current_time)).any(axis=1)
 
     def is_within_bounds(self, position: Tuple[float, float]) -> bool:
         lat, lon = position
         return LAT_MIN <= lat <= LAT_MAX and LON_MIN <= lon <= LON_MAX
 
+    def _zone_corners(self, active_zones: List) -> List[Tuple[float, float]]:
+        """Yasak bölge köşelerini merkezden dışarı iterek graf düğümleri üret"""
+        corners = []
+        for nfz in self.no_fly_zones:
+            cx = sum(x for x, _ in nfz.coordinates) / len(nfz.coordinates)
+            cy = sum(y for _, y in nfz.coordinates) / len(nfz.coordinates)
+            for x, y in nfz.coordinates:
+                norm = math.hypot(x - cx, y - cy) or 1.0
+                corner = (x + (x - cx) / norm * VISIBILITY_MARGIN,
+                          y + (y - cy) / norm * VISIBILITY_MARGIN)
+                # İçbükey köşeler poligonun içine düşer, onları atla
+                if any(zone.is_point_inside(corner) for zone in active_zones):
+                    continue
+                corners.append(corner)
+        return corners
+
+    def build_visibility_graph(self, current_time: str) -> Dict:
+        """Bölge köşelerinden görünürlük grafı oluştur (aktif bölge kümesi başına bir kez)"""
+        key = self.active_set(current_time)
+        if key in self._visibility_graphs:
+            return self._visibility_graphs[key]
+        active_zones = self._timeline.active_zones(current_time)
+
+        corners = self._zone_corners(active_zones)
+        graph = {corner: [] for corner in corners}
+        if len(corners) > 1:
+            # Tüm köşe çiftleri tek seferde test edilir
+            pair_i, pair_j = np.triu_indices(len(corners), k=1)
+            points = np.asarray(corners, dtype=float)
+            valid = self.valid_segments(points[pair_i], points[pair_j], current_time)
+            pair_i, pair_j = pair_i[valid], pair_j[valid]
+            diff = points[pair_j] - points[pair_i]
+            weights = self.calculate_edge_weights(points[pair_i], points[pair_j],
+                                                  np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2))
+            for i, j, weight in zip(pair_i.tolist(), pair_j.tolist(), weights.tolist()):
+                graph[corners[i]].append((corners[j], weight))
+                graph[corners[j]].append((corners[i], weight))
+
+        self._visibility_graphs[key] = graph
+        return graph
+
+    def find_path_visibility(self, start: Tuple[float, float], goal: Tuple[float, float],
+                             current_time: str) -> Optional[List[Tuple[float, float]]]:
+        """Görünürlük grafı üzerinde A* - başlangıç ve hedef sorgu anında bağlanır"""
+        graph = self.build_visibility_graph(current_time)
+
+        corners = list(graph)
+        corner_points = np.asarray(corners, dtype=float).reshape(-1, 2)
+
+        def visible_from(point):
+            if not corners:
+                return []
+            starts = np.broadcast_to(np.asarray(point, dtype=float), corner_points.shape)
+            valid = self.valid_segments(starts, corner_points, current_time)
+            diff = corner_points[valid] - starts[valid]
+            weights = self.calculate_edge_weights(starts[valid], corner_points[valid],
+                                                  np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2))
+            return [(corners[i], w) for i, w in zip(np.nonzero(valid)[0].tolist(), weights.tolist())]
+
+        start_edges = visible_from(start)
+        goal_edges = {corner: weight for corner, weight in visible_from(goal)}
+        if self.is_valid_path(start, goal, current_time):
+            start_edges.append((goal, self.calculate_edge_weight(start, goal, calculate_distance(start, goal))))
+
+        open_set = [(EDGE_COST_PER_UNIT * calculate_distance(start, goal), 0.0, start)]
+        best_g = {start: 0.0}
+        parents = {start: None}
+
+        while open_set:
+            _, g, position = heapq.heappop(open_set)
+            if position == goal:
+                return self._trace_parents(parents, position)
+            if g > best_g[position]:
+                continue
+
+            neighbors = start_edges if position == start else list(graph[position])
+            if position in goal_edges:
+                neighbors = neighbors + [(goal, goal_edges[position])]
+
+            for neighbor, weight in neighbors:
+                new_g = g + weight
+                if new_g < best_g.get(neighbor, float('inf')):
+                    best_g[neighbor] = new_g
+                    parents[neighbor] = position
+                    h = EDGE_COST_PER_UNIT * calculate_distance(neighbor, goal)
+                    heapq.heappush(open_set, (new_g + h, new_g, neighbor))
+
+        return None
+
+    def compute_cost_matrix(self, sources: List[Tuple[float, float]], targets: List[Tuple[float, float]],
+                            current_time: str) -> np.ndarray:
+        """Yasak bölgeleri dolaşan en kısa yol uzunlukları (kaynak × hedef)
+
+        Görünürlük grafı bir kez kurulur; her kaynaktan köşelere tek bir Dijkstra
+        (bire-çok) koşulur ve hedef maliyetleri köşe mesafelerinden toplu hesaplanır.
+        Ulaşılamayan çiftler np.inf olur.
+        """
+        self._check_zones_changed()
+        graph = self.build_visibility_graph(current_time)
+        corners = list(graph)
+        corner_index = {corner: i for i, corner in enumerate(corners)}
+
+        def visible_lengths(points_a, points_b):
+            """a × b düz bağlantı uzunlukları, aktif bölge kesenler inf"""
+            a = np.asarray(points_a, dtype=float).reshape(-1, 2)
+            b = np.asarray(points_b, dtype=float).reshape(-1, 2)
+            ia, ib = np.repeat(np.arange(len(a)), len(b)), np.tile(np.arange(len(b)), len(a))
+            diff = b[ib] - a[ia]
+            lengths = np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2)
+            lengths[~self.valid_segments(a[ia], b[ib], current_time)] = np.inf
+            return lengths.reshape(len(a), len(b))
+
+        # Köşe -> hedef uzunlukları (görünmeyenler inf)
+        corner_to_target = visible_lengths(corners, targets)
+        matrix = visible_lengths(sources, targets)
+        source_to_corner = visible_lengths(sources, corners)
+        for s, source in enumerate(sources):
+            for j, target in enumerate(targets):
+                if source == target:
+                    matrix[s, j] = 0.0
+            if not corners:
+                continue
+
+            # Kaynaktan tüm köşelere Dijkstra
+            corner_dist = source_to_corner[s].copy()
+            open_set = [(d, corner) for corner, d in zip(corners, corner_dist.tolist()) if d < np.inf]
+            heapq.heapify(open_set)
+            while open_set:
+                d, corner = heapq.heappop(open_set)
+                if d > corner_dist[corner_index[corner]]:
+                    continue
+                for neighbor, _ in graph[corner]:
+                    new_d = d + calculate_distance(corner, neighbor)
+                    if new_d < corner_dist[corner_index[neighbor]]:
+                        corner_dist[corner_index[neighbor]] = new_d
+                        heapq.heappush(open_set, (new_d, neighbor))
+
+            via_corners = (corner_dist[:, None] + corner_to_target).min(axis=0)
+            matrix[s] = np.minimum(matrix[s], via_corners)
+
+        return matrix
+
+    def leg_cost_matrix(self, drones: List, deliveries: List, current_time: str) -> np.ndarray:
+        """(drone başlangıçları + teslimatlar) × teslimatlar engel duyarlı bacak maliyetleri"""
+        sources = [drone.start_pos for drone in drones] + [delivery.pos for delivery in deliveries]
+        targets = [delivery.pos for delivery in deliveries]
+        return self.compute_cost_matrix(sources, targets, current_time)
+
+    def _zone_intervals(self) -> List[Optional[Tuple[int, int]]]:
+        """Her bölgenin aktif olduğu [başlangıç, bitiş] dakika aralığı"""
+        intervals = []
+        for nfz in self.no_fly_zones:
+            zone_start, zone_end = nfz.active_window
+            # is_time_in_range gece yarısını saran aralıkları hiç aktif saymaz
+            intervals.append((zone_start, zone_end) if zone_start <= zone_end else None)
+        return intervals
+
+    def _earliest_departure(self, start: Tuple[float, float], end: Tuple[float, float],
+                            ready_time: float, travel_time: float,
+                            intervals: List, crossed: Dict) -> Optional[float]:
+        """Kenarı hiçbir aktif bölgeye girmeden geçmek için en erken kalkış dakikası"""
+        key = (start, end)
+        if key not in crossed:
+            hits = self.zone_hits([start], [end])[0]
+            crossed[key] = [i for i in np.nonzero(hits)[0].tolist() if intervals[i] is not None]
+
+        departure = ready_time
+        while departure + travel_time < DAY_MINUTES:
+            blocking_end = None
+            for i in crossed[key]:
+                zone_start, zone_end = intervals[i]
+                if departure <= zone_end and departure + travel_time >= zone_start:
+                    blocking_end = zone_end if blocking_end is None else max(blocking_end, zone_end)
+            if blocking_end is None:
+                return departure
+            # Bölge bitiş dakikası dahil aktif, bir sonraki dakikada kalk
+            departure = blocking_end + 1
+        return None
+
+    def find_path_time_dependent(self, start: Tuple[float, float], goal: Tuple[float, float],
+                                 departure_time: str, speed: float, return_times: bool = False):
+        """Uzay-zaman A*: varış zamanını hızdan hesaplar, bölge kapanana kadar beklemeye izin verir
+
+        Amaç en erken varıştır; her kenar, geçiş süresi boyunca aktif olan bölgelere göre
+        kontrol edilir. return_times=True ise (yol, [(varış, kalkış), ...]) döner.
+        """
+        intervals = self._zone_intervals()
+        corners = self._zone_corners(self.no_fly_zones)
+        crossed = {}
+
+        def travel_minutes(a, b):
+            return calculate_distance(a, b) / speed * 60
+
+        start_minute = time_to_minutes(departure_time)
+        open_set = [(start_minute + travel_minutes(start, goal), start_minute, start)]
+        best_arrival = {start: start_minute}
+        parents = {start: None}
+        departures = {}
+
+        while open_set:
+            _, arrival, position = heapq.heappop(open_set)
+            if arrival > best_arrival[position]:
+                continue
+            if position == goal:
+                break
+
+            for neighbor in corners + [goal]:
+                if neighbor == position:
+                    continue
+                travel = travel_minutes(position, neighbor)
+                departure = self._earliest_departure(position, neighbor, arrival, travel, intervals, crossed)
+                if departure is None:
+                    continue
+                new_arrival = departure + travel
+                if new_arrival < best_arrival.get(neighbor, float('inf')):
+                    best_arrival[neighbor] = new_arrival
+                    parents[neighbor] = position
+                    departures[neighbor] = departure
+                    heapq.heappush(open_set, (new_arrival + travel_minutes(neighbor, goal), new_arrival, neighbor))
+        else:
+            return None
+
+        path = self._trace_parents(parents, goal)
+        if not return_times:
+            return path
+
+        times = []
+        for i, waypoint in enumerate(path):
+            leave = departures[path[i + 1]] if i + 1 < len(path) else best_arrival[waypoint]
+            times.append((minutes_to_time(best_arrival[waypoint]), minutes_to_time(leave)))
+        return path, times
+
     def find_path(self, start: Tuple[float, float], goal: Tuple[float, float], 
-                  current_time: str, drone=None, delivery_weight: float = 0) -> Optional[List[Tuple[float, float]]]:
-        """İyileştirilmiş A* algoritması"""
+                  current_time: str, drone=None, delivery_weight: float = 0,
+                  method: str = "visibility") -> Optional[List[Tuple[float, float]]]:
+        """İyileştirilmiş A* algoritması
+
+        method: "visibility" (bölge köşeleri grafı, varsayılan), "grid" (0.01 adımlı
+        ızgara; yalnızca is_within_bounds içindeki koordinatlarda çalışır) veya
+        "time" (drone hızıyla uzay-zaman araması, current_time kalkış zamanıdır)
+        """
         
         # Drone kapasitesi kontrolü - YENİ EKLENEN
         if drone and not self.check_drone_capacity(drone, delivery_weight):
             print(f"❌ Drone {drone.id} kapasitesi aşıldı: {delivery_weight} > {drone.max_weight}")
             return None
-        
+
+        if method not in ("grid", "visibility", "time"):
+            raise ValueError(f"Bilinmeyen A* yöntemi: {method}")
+        if method == "time" and drone is None:
+            raise ValueError("Zaman bağımlı arama için drone hızı gerekli")
+
+        self._check_zones_changed()
+        if method == "time":
+            # Zaman bağımlı sonuç kalkış anına ve hıza bağlıdır
+            zone_key = (current_time, drone.speed)
+        else:
+            zone_key = self.active_set(current_time)
+        key = (method,
+               (round(start[0], PATH_CACHE_PRECISION), round(start[1], PATH_CACHE_PRECISION)),
+               (round(goal[0], PATH_CACHE_PRECISION), round(goal[1], PATH_CACHE_PRECISION)),
+               zone_key)
+
+        if key in self._path_cache:
+            self.cache_hits += 1
+            self._path_cache.move_to_end(key)
+            path = self._path_cache[key]
+            return list(path) if path is not None else None
+        self.cache_misses += 1
+
+        if method == "visibility":
+            path = self.find_path_visibility(start, goal, current_time)
+        elif method == "time":
+            path = self.find_path_time_dependent(start, goal, current_time, drone.speed)
+        else:
+            path = self.find_path_grid(start, goal, current_time)
+
+        if self.cache_size > 0:
+            self._path_cache[key] = tuple(path) if path is not None else None
+            if len(self._path_cache) > self.cache_size:
+                self._path_cache.popitem(last=False)
+        return path
+
+    def _grid_neighbors(self, position: Tuple[float, float], current_time: str, closed_set: set = None):
+        """0.01 adımlı 8 komşuyu (komşu, kenar ağırlığı) olarak üret"""
+        candidates = []
+        for dx in [-0.01, 0, 0.01]:
+            for dy in [-0.01, 0, 0.01]:
+                if dx == 0 and dy == 0:
+                    continue
+
+                neighbor_pos = (round(position[0] + dx, 5), 
+                              round(position[1] + dy, 5))
+
+                if closed_set is not None and neighbor_pos in closed_set:
+                    continue
+                if not self.is_within_bounds(neighbor_pos):
+                    continue
+                candidates.append(neighbor_pos)
+        if not candidates:
+            return
+
+        # Tüm komşu kenarları tek çekirdek çağrısıyla test edilir
+        hits = self.zone_hits([position] * len(candidates), candidates)
+        blocked = (hits & self.active_mask(current_time)).any(axis=1)
+        crossings = hits.sum(axis=1)
+        for k, neighbor_pos in enumerate(candidates):
+            if blocked[k]:
+                continue
+
+            # İyileştirilmiş maliyet hesabı
+            distance = calculate_distance(position, neighbor_pos)
+            yield neighbor_pos, distance * 1.5 + (distance * 0.1) * 100 + 500 * int(crossings[k])
+
+    def find_path_grid(self, start: Tuple[float, float], goal: Tuple[float, float],
+                       current_time: str) -> Optional[List[Tuple[float, float]]]:
+        """0.01 adımlı 8 komşulu ızgara üzerinde A*"""
+        # Heap girdileri (f, g, pozisyon) demetleri; ebeveynler ayrı tabloda tutulur.
+        # best_g'den kötü girdiler eklenmez, eskimiş girdiler çekilince atlanır.
         open_set = []
         # İyileştirilmiş heuristic kullan
         initial_h = self.improved_heuristic(start, goal, current_time)
-        heapq.heappush(open_set, Node(start, 0.0, initial_h))
+        heapq.heappush(open_set, (initial_h, 0.0, start))
+        best_g = {start: 0.0}
+        parents = {start: None}
         closed_set = set()
 
         while open_set:
-            current_node = heapq.heappop(open_set)
+            _, current_g, current_pos = heapq.heappop(open_set)
+            if current_pos in closed_set or current_g > best_g[current_pos]:
+                continue
 
-            if calculate_distance(current_node.position, goal) <= 0.5:
-                return self.reconstruct_path(current_node)
+            if calculate_distance(current_pos, goal) <= 0.5:
+                return self._trace_parents(parents, current_pos)
 
-            closed_set.add(current_node.position)
+            closed_set.add(current_pos)
 
-            for dx in [-0.01, 0, 0.01]:
-                for dy in [-0.01, 0, 0.01]:
-                    if dx == 0 and dy == 0:
-                        continue
+            for neighbor_pos, edge_weight in self._grid_neighbors(current_pos, current_time, closed_set):
+                g = current_g + edge_weight
+                if g >= best_g.get(neighbor_pos, float('inf')):
+                    continue
+                h = self.improved_heuristic(neighbor_pos, goal, current_time)
 
-                    neighbor_pos = (round(current_node.position[0] + dx, 5), 
-                                  round(current_node.position[1] + dy, 5))
+                best_g[neighbor_pos] = g
+                parents[neighbor_pos] = current_pos
+                heapq.heappush(open_set, (g + h, g, neighbor_pos))
 
-                    if neighbor_pos in closed_set:
-                        continue
-                    if not self.is_within_bounds(neighbor_pos):
-                        continue
-                    if not self.is_valid_path(current_node.position, neighbor_pos, current_time):
+        return None
+
+    def find_path_anytime(self, start: Tuple[float, float], goal: Tuple[float, float], current_time: str,
+                          deadline: Optional[float] = None, max_expansions: Optional[int] = None,
+                          initial_epsilon: float = 10.0, epsilon_step: float = 0.5,
+                          goal_tolerance: float = 0.5) -> Tuple[Optional[List[Tuple[float, float]]], float]:
+        """Anytime (ARA*) ızgara araması
+
+        İlk çözüm görünürlük grafından alınır (bütçe ne kadar küçük olursa olsun
+        hemen bir yol döner); ızgara araması şişirilmiş heuristic (epsilon) ile
+        başlar ve süre kaldıkça epsilon'u düşürüp daha ucuz yolu arar. deadline
+        saniye, max_expansions toplam düğüm açma bütçesidir. (yol, ulaşılan
+        alt-optimallik sınırı) döner; çözüm yoksa (None, inf).
+        """
+        stop_at = time.perf_counter() + deadline if deadline is not None else None
+        expansions = 0
+
+        def heuristic(position):
+            # Hedef bölgesine kalan mesafenin kenar maliyeti alt sınırı (tutarlı)
+            return EDGE_COST_PER_UNIT * max(0.0, calculate_distance(position, goal) - goal_tolerance)
+
+        def budget_left():
+            if max_expansions is not None and expansions >= max_expansions:
+                return False
+            return stop_at is None or time.perf_counter() < stop_at
+
+        g_values = {start: 0.0}
+        parents = {start: None}
+        goal_g, goal_pos = float('inf'), None
+        if heuristic(start) == 0.0:
+            goal_g, goal_pos = 0.0, start
+
+        # Başlangıç çözümü: görünürlük yolu, ızgarayla aynı kenar ağırlıklarıyla fiyatlanır
+        incumbent = None
+        if goal_pos is None:
+            incumbent = self.find_path_visibility(start, goal, current_time)
+            if incumbent is not None:
+                goal_g = sum(self.calculate_edge_weight(a, b, calculate_distance(a, b))
+                             for a, b in zip(incumbent, incumbent[1:]))
+
+        def current_path():
+            return self._trace_parents(parents, goal_pos) if goal_pos is not None else incumbent
+
+        epsilon = max(1.0, initial_epsilon)
+        open_set = [(epsilon * heuristic(start), start)]
+        closed_set = set()
+        inconsistent = set()
+
+        def improve_path():
+            nonlocal expansions, goal_g, goal_pos
+            while open_set and open_set[0][0] < goal_g and budget_left():
+                key, position = heapq.heappop(open_set)
+                if position in closed_set or key > g_values[position] + epsilon * heuristic(position):
+                    continue
+                closed_set.add(position)
+                expansions += 1
+                for neighbor, edge_weight in self._grid_neighbors(position, current_time):
+                    g = g_values[position] + edge_weight
+                    if g >= g_values.get(neighbor, float('inf')):
                         continue
+                    g_values[neighbor] = g
+                    parents[neighbor] = position
+                    if heuristic(neighbor) == 0.0 and g < goal_g:
+                        goal_g, goal_pos = g, neighbor
+                    if neighbor in closed_set:
+                        inconsistent.add(neighbor)
+                    else:
+                        heapq.heappush(open_set, (g + epsilon * heuristic(neighbor), neighbor))
+            # Bütçe bitmeden durduysa çözüm epsilon-optimaldir
+            return not (open_set and open_set[0][0] < goal_g)
+
+        def suboptimality_bound(completed):
+            frontier = [g_values[p] + heuristic(p) for _, p in open_set if p not in closed_set]
+            frontier += [g_values[p] + heuristic(p) for p in inconsistent]
+            if not frontier:
+                return 1.0
+            return max(1.0, min(epsilon if completed else float('inf'), goal_g / min(frontier)))
+
+        completed = improve_path()
+        best_path = current_path()
+        bound = suboptimality_bound(completed) if best_path else float('inf')
+
+        while best_path and bound > 1.0 and budget_left():
+            epsilon = max(1.0, epsilon - epsilon_step)
+            # INCONS kümesini açık listeye taşı ve anahtarları yeni epsilon ile yenile
+            positions = {p for _, p in open_set if p not in closed_set} | inconsistent
+            open_set = [(g_values[p] + epsilon * heuristic(p), p) for p in positions]
+            heapq.heapify(open_set)
+            inconsistent = set()
+            closed_set = set()
+
+            completed = improve_path()
+            best_path = current_path()
+            bound = suboptimality_bound(completed)
+
+        return best_path, bound
+
+
+class HierarchicalAStar:
+    """HPA* benzeri iki seviyeli planlayıcı
+
+    Önce cell_size boyutlu kaba hücre grafında rota bulunur; kaba kenarlar aktif
+    bölge kesmeyen düz parçalardır. İnce seviye 0.01'lik ızgarayı taramaz, yalnızca
+    kaba rotanın ara noktaları arasında kısayol arar (HPA* yol yumuşatma adımı).
+    Hücreden dar geçitler kaba grafta görünmez; kaba rota bulunamazsa
+    find_path_visibility ile tam çözünürlükte aranır. Kaba graf kenarları aktif
+    bölge kümesi başına LRU önbellekte (en fazla graph_cache_size küme) tutulur.
+    """
+
+    def __init__(self, astar: AStar, cell_size: float = 5.0, graph_cache_size: int = 16):
+        self.astar = astar
+        self.cell_size = cell_size
+        self.graph_cache_size = graph_cache_size
+        self._abstract_graphs = OrderedDict()
+        self.stats = {'coarse_expansions': 0, 'smoothing_tests': 0, 'fallbacks': 0}
+
+    def _cell_of(self, position: Tuple[float, float]) -> Tuple[int, int]:
+        return (math.floor(position[0] / self.cell_size), math.floor(position[1] / self.cell_size))
+
+    def _center(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        return ((cell[0] + 0.5) * self.cell_size, (cell[1] + 0.5) * self.cell_size)
+
+    def _abstract_graph(self, current_time: str) -> Dict:
+        """Aktif bölge kümesine ait kaba kenar geçerlilik tablosu (tembel doldurulur)"""
+        self.astar._check_zones_changed()
+        key = (self.astar._zones_signature, self.astar.active_set(current_time))
+        if key in self._abstract_graphs:
+            self._abstract_graphs.move_to_end(key)
+        else:
+            self._abstract_graphs[key] = {}
+            if len(self._abstract_graphs) > self.graph_cache_size:
+                self._abstract_graphs.popitem(last=False)
+        return self._abstract_graphs[key]
+
+    def _coarse_path(self, start: Tuple[float, float], goal: Tuple[float, float],
+                     current_time: str) -> Optional[List[Tuple[float, float]]]:
+        """Kaba hücre merkezleri üzerinden [start, merkezler..., goal] rotası"""
+        edges = self._abstract_graph(current_time)
+
+        def edge_cost(a, b):
+            """Kenar ağırlığı (ince seviyeyle aynı formül) ya da geçersizse None"""
+            edge_key = (a, b) if a <= b else (b, a)
+            if edge_key not in edges:
+                if self.astar.is_valid_path(a, b, current_time):
+                    edges[edge_key] = self.astar.calculate_edge_weight(a, b, calculate_distance(a, b))
+                else:
+                    edges[edge_key] = None
+            return edges[edge_key]
+
+        # Arama alanı: bölgeler, başlangıç ve hedefin sınır kutusu + 2 hücre pay
+        xs = [start[0], goal[0]] + [x for nfz in self.astar.no_fly_zones for x, _ in nfz.coordinates]
+        ys = [start[1], goal[1]] + [y for nfz in self.astar.no_fly_zones for _, y in nfz.coordinates]
+        min_cell = self._cell_of((min(xs), min(ys)))
+        max_cell = self._cell_of((max(xs), max(ys)))
+
+        def in_area(cell):
+            return (min_cell[0] - 2 <= cell[0] <= max_cell[0] + 2 and
+                    min_cell[1] - 2 <= cell[1] <= max_cell[1] + 2)
+
+        def around(position):
+            cx, cy = self._cell_of(position)
+            return [(cx + dx, cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+        goal_cells = {cell for cell in around(goal) if edge_cost(self._center(cell), goal) is not None}
+        open_set = [(EDGE_COST_PER_UNIT * calculate_distance(start, goal), 0.0, start)]
+        best_g = {start: 0.0}
+        parents = {start: None}
+
+        while open_set:
+            _, g, position = heapq.heappop(open_set)
+            if g > best_g[position]:
+                continue
+            if position == goal:
+                return self.astar._trace_parents(parents, goal)
+            self.stats['coarse_expansions'] += 1
+
+            if position == start:
+                neighbors = [self._center(cell) for cell in around(start)]
+            else:
+                cell = self._cell_of(position)
+                neighbors = [self._center((cell[0] + dx, cell[1] + dy))
+                             for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy]
+                if cell in goal_cells:
+                    neighbors.append(goal)
+            if position == start:
+                neighbors.append(goal)
+
+            for neighbor in neighbors:
+                if neighbor != goal and not in_area(self._cell_of(neighbor)):
+                    continue
+                weight = edge_cost(position, neighbor)
+                if weight is None:
+                    continue
+                new_g = g + weight
+                if new_g < best_g.get(neighbor, float('inf')):
+                    best_g[neighbor] = new_g
+                    parents[neighbor] = position
+                    h = EDGE_COST_PER_UNIT * calculate_distance(neighbor, goal)
+                    heapq.heappush(open_set, (new_g + h, new_g, neighbor))
+
+        return None
+
+    def _smooth(self, waypoints: List[Tuple[float, float]], current_time: str) -> List[Tuple[float, float]]:
+        """Kaba rotayı yalnızca kendi ara noktaları üzerinden kısalt (string pulling)
+
+        Her çapa noktasından sonraki tüm ara noktalara giden kısayollar tek toplu
+        çağrıyla test edilir; aktif bölge kesmeyen ve kaba rotanın o kısmından
+        pahalı olmayan en uzak kısayol seçilir. Kaba kenarlar zaten geçerli düz
+        parçalar olduğundan ince ızgara araması gerekmez.
+        """
+        points = np.asarray(waypoints, dtype=float)
+        diff = points[1:] - points[:-1]
+        leg_weights = self.astar.calculate_edge_weights(points[:-1], points[1:],
+                                                        np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2))
+        along = np.concatenate(([0.0], np.cumsum(leg_weights)))
 
-                    # İyileştirilmiş maliyet hesabı
-                    edge_weight = self.calculate_edge_weight(current_node.position, neighbor_pos, 
-                                                          calculate_distance(current_node.position, neighbor_pos))
-                    g = current_node.g + edge_weight
-                    h = self.improved_heuristic(neighbor_pos, goal, current_time)
-                    
-                    neighbor_node = Node(neighbor_pos, g, h, current_node)
-                    heapq.heappush(open_set, neighbor_node)
+        path = [waypoints[0]]
+        anchor = 0
+        while anchor < len(waypoints) - 1:
+            targets = points[anchor + 1:]
+            starts = np.broadcast_to(points[anchor], targets.shape)
+            diff = targets - starts
+            weights = self.astar.calculate_edge_weights(starts, targets, np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2))
+            self.stats['smoothing_tests'] += len(targets)
+            # Bir sonraki ara nokta her zaman kabul edilir (kaba kenar)
+            usable = self.astar.valid_segments(starts, targets, current_time)
+            usable &= weights <= along[anchor + 1:] - along[anchor] + 1e-9
+            usable[0] = True
+            anchor += int(np.nonzero(usable)[0][-1]) + 1
+            path.append(waypoints[anchor])
+        return path
 
-        return None
\ No newline at end of file
+    def find_path(self, start: Tuple[float, float], goal: Tuple[float, float],
+                  current_time: str) -> Optional[List[Tuple[float, float]]]:
+        """Kaba rota + ara noktalar üzerinde kısaltma; find_path_visibility gibi seyrek köşe listesi döner"""
+        self.stats = {'coarse_expansions': 0, 'smoothing_tests': 0, 'fallbacks': 0}
+        coarse = self._coarse_path(start, goal, current_time)
+        if coarse is None:
+            # Hücreden dar geçit olabilir: tam çözünürlüklü planlayıcıya düş
+            self.stats['fallbacks'] += 1
+            return self.astar.find_path_visibility(start, goal, current_time)
+        return self._smooth(coarse, current_time)
@@ -1,7 +1,25 @@
-from typing import List, Dict, Set
+import time
+from collections import deque
+import numpy as np
+from typing import List, Dict, Set, Optional, Tuple
+from utils.assignment import linear_assignment, auction_assignment
+from utils.distance_matrix import DistanceMatrix
+from utils.drone_locator import DroneLocator
 from utils.geometry import calculate_distance
+from utils.spatial_index import ZoneIndex
+from utils.time_utils import TimeValue, DAY_MINUTES
 from models.drone import Drone
 from models.delivery_point import DeliveryPoint
+from models.fleet_state import DroneState, FleetState
+
+# Geri izlemeli aramada önbelleğe alınan uygunluk satırlarının en fazla sayısı
+SEARCH_MEMO_LIMIT = 50000
+
+# Açgözlü atamada teslimat başına ilk bakılan en yakın drone sayısı
+NEAREST_DRONES = 32
+
+# Eşleştirmeli atamada öncelik seviyesi başına maliyet indirimi
+MATCHING_PRIORITY_WEIGHT = 100
 
 class CSPConstraints:
     """CSP kısıtlarının net tanımı - EKSİK OLAN ÖZELLIK"""
@@ -12,15 +30,15 @@ class CSPConstraints:
         return drone.can_carry(delivery.weight)
     
     @staticmethod
-    def no_fly_zone_constraint(start_pos, end_pos, no_fly_zones, current_time: str) -> bool:
+    def no_fly_zone_constraint(start_pos, end_pos, no_fly_zones, current_time: TimeValue) -> bool:
         """No-fly zone ihlali kontrolü"""
-        for nfz in no_fly_zones:
-            if nfz.is_active(current_time) and nfz.does_path_intersect(start_pos, end_pos):
+        for nfz in ZoneIndex.for_zones(no_fly_zones).query_segment(start_pos, end_pos, current_time):
+            if nfz.does_path_intersect(start_pos, end_pos):
                 return False
         return True
     
     @staticmethod
-    def time_window_constraint(delivery: DeliveryPoint, current_time: str) -> bool:
+    def time_window_constraint(delivery: DeliveryPoint, current_time: TimeValue) -> bool:
         """Zaman penceresi kısıtı"""
         return delivery.is_in_time_window(current_time)
     
@@ -48,73 +66,688 @@ class CSPVariables:
                     domains[drone_id].append(delivery_id)
         return domains
 
+class FeasibilityMatrix:
+    """Drone × teslimat uygunluk matrisi (kapasite, batarya, zaman penceresi, yasak bölge)
+
+    Tüm kısıtlar tek vektörel geçişte hesaplanır; bir drone'un durumu değişince
+    yalnızca onun satırı güncellenir. require_move=True ise Drone.move_to'nun
+    (gerekirse şarj ederek) başarılı olacağı da şart koşulur. distances verilirse
+    batarya, hareketlerle aynı DistanceMatrix bacak uzunluklarıyla hesaplanır.
+    """
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint], no_fly_zones: List = None,
+                 require_move: bool = False, states: List[DroneState] = None,
+                 distances: DistanceMatrix = None):
+        self.drones = drones
+        self.deliveries = deliveries
+        self.zone_index = ZoneIndex.for_zones(no_fly_zones or [])
+        self.require_move = require_move
+        self.distances = distances
+        self.delivery_ids = [delivery.id for delivery in deliveries]
+
+        self.positions = np.asarray([delivery.pos for delivery in deliveries], dtype=float).reshape(-1, 2)
+        self.weights = np.asarray([delivery.weight for delivery in deliveries], dtype=float)
+        self.window_start = np.asarray([delivery.window.start for delivery in deliveries], dtype=float)
+        self.window_end = np.asarray([delivery.window.end for delivery in deliveries], dtype=float)
+        self.max_weight = np.asarray([drone.max_weight for drone in drones], dtype=float)
+        self.initial_battery = np.asarray([drone.initial_battery for drone in drones], dtype=float)
+        self.battery_threshold = np.asarray([drone.min_battery_threshold for drone in drones], dtype=float)
+
+        if states is None:
+            states = [DroneState(drone.current_pos, drone.time_minutes, drone.battery) for drone in drones]
+        self.matrix = self.rows(range(len(drones)),
+                                [state.pos for state in states],
+                                [state.minutes for state in states],
+                                [state.battery for state in states])
+
+    def rows(self, drone_indices, positions, minutes, batteries) -> np.ndarray:
+        """Verilen drone durumları için (len(drone_indices), N) uygunluk satırları"""
+        ks = np.asarray(list(drone_indices), dtype=np.int64)
+        starts = np.asarray(positions, dtype=float).reshape(-1, 2)
+        minutes = np.asarray(minutes, dtype=float)
+        batteries = np.asarray(batteries, dtype=float)
+        clock = np.floor(minutes).astype(np.int64) % DAY_MINUTES
+
+        # Kapasite ve zaman penceresi
+        feasible = self.weights[None, :] <= self.max_weight[ks, None]
+        feasible &= (self.window_start[None, :] <= clock[:, None]) & (clock[:, None] <= self.window_end[None, :])
+
+        # Batarya: Drone.calculate_energy_consumption ile aynı formül
+        if self.distances is not None:
+            distance = self.distances.block([tuple(start) for start in starts.tolist()], self.delivery_ids)
+        else:
+            diff = self.positions[None, :, :] - starts[:, None, :]
+            distance = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+        energy = distance * (10 + 5 * self.weights[None, :])
+        feasible &= (energy <= batteries[:, None]) | (energy <= self.initial_battery[ks, None])
+        if self.require_move:
+            # Enerji yetmiyorsa move_to ancak eşik altındaysa tam şarj eder
+            can_charge = (batteries <= self.battery_threshold[ks])[:, None]
+            feasible &= (energy <= batteries[:, None]) | (can_charge & (energy <= self.initial_battery[ks, None]))
+
+        # Yasak bölgeler: yalnızca hâlâ uygun çiftler toplu çekirdekle test edilir
+        row_idx, col_idx = np.nonzero(feasible)
+        if len(row_idx) and len(self.zone_index):
+            hits = self.zone_index.segment_hits(starts[row_idx], self.positions[col_idx])
+            active = np.zeros((len(ks), len(self.zone_index)), dtype=bool)
+            for i, minute in enumerate(clock.tolist()):
+                mask = self.zone_index.timeline.mask_at(minute)
+                active[i] = [bool(mask >> z & 1) for z in range(len(self.zone_index))]
+            blocked = (hits & active[row_idx]).any(axis=1)
+            feasible[row_idx[blocked], col_idx[blocked]] = False
+        return feasible
+
+    def update_drone(self, k: int, state: DroneState = None):
+        """Durumu değişen drone'un satırını yeniden hesapla (durum verilmezse Drone'dan okunur)"""
+        if state is None:
+            drone = self.drones[k]
+            state = DroneState(drone.current_pos, drone.time_minutes, drone.battery)
+        self.matrix[k] = self.rows([k], [state.pos], [state.minutes], [state.battery])[0]
+
+    def feasible_drones(self, d: int) -> np.ndarray:
+        return np.nonzero(self.matrix[:, d])[0]
+
 class CSP:
-    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint]):
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint],
+                 distance_matrix: DistanceMatrix = None, fleet_state: FleetState = None):
         self.drones = drones
         self.deliveries = deliveries
+        self.distances = distance_matrix if distance_matrix is not None else DistanceMatrix(drones, deliveries)
+        # Çözücüler bu durumdan başlar; sonuç self.state'e yazılır
+        self.initial_state = fleet_state if fleet_state is not None else FleetState.from_drones(drones)
+        self.state = self.initial_state
         self.variables = CSPVariables(drones, deliveries)
         self.constraints = CSPConstraints()
 
-    def assign_deliveries(self, no_fly_zones: List = None):
-        """Kısıtlarla teslimat ataması - İYİLEŞTİRİLMİŞ"""
+    def assign_deliveries(self, no_fly_zones: List = None, method: str = "greedy",
+                          max_nodes: int = 20000, time_limit: float = 2.0, commit: bool = True):
+        """Kısıtlarla teslimat ataması - İYİLEŞTİRİLMİŞ
+
+        method: "greedy" (öncelik sıralı tek geçiş), "backtracking"
+        (MRV/LCV, ileri kontrol ve AC-3 ile dal-sınır; düğüm ve süre bütçeli),
+        "hungarian" ya da "auction" (tur başına en düşük maliyetli eşleştirme;
+        önerilen "hungarian"dır, "auction" aynı eşleştirme toplamını verir)
+
+        Çözüm FleetState üzerinde yapılır ve self.state'e yazılır; commit=False
+        ise Drone ve DeliveryPoint nesneleri değişmez.
+        """
         if not no_fly_zones:
             no_fly_zones = []
-            
+        if method == "backtracking":
+            assignments = self._assign_backtracking(no_fly_zones, max_nodes, time_limit)
+        elif method in ("hungarian", "auction"):
+            assignments = self._assign_matching(no_fly_zones, method)
+        elif method == "greedy":
+            assignments = self._assign_greedy(no_fly_zones)
+        else:
+            raise ValueError(f"Bilinmeyen CSP yöntemi: {method}")
+        if commit:
+            self.state.apply_to(self.drones, self.deliveries)
+        return assignments
+
+    def _assign_greedy(self, no_fly_zones: List):
+        """Öncelik sıralı tek geçiş; her teslimat en ucuz uygun drone'a"""
+        state = self.initial_state
         assignments = {}
         unassigned_deliveries = set(d.id for d in self.deliveries)
+        # Tüm kısıtlar drone × teslimat matrisinde; atamadan sonra yalnızca o drone'un satırı yenilenir
+        feasibility = FeasibilityMatrix(self.drones, self.deliveries, no_fly_zones, states=state.states,
+                                        distances=self.distances)
         
         # Öncelik sırası ile teslimatları işle
-        sorted_deliveries = sorted(self.deliveries, key=lambda d: -d.priority)
+        sorted_deliveries = sorted(enumerate(self.deliveries), key=lambda item: -item[1].priority)
         
-        for delivery in sorted_deliveries:
-            if delivery.id not in unassigned_deliveries:
-                continue
-                
-            best_drone = None
-            min_cost = float('inf')
-            
-            for drone in self.drones:
-                current_time = drone.current_time.strftime("%H:%M")
-                
-                # Tüm kısıtları kontrol et
-                if not self.constraints.single_package_constraint(drone, delivery):
-                    continue
-                if not self.constraints.time_window_constraint(delivery, current_time):
-                    continue
-                if not self.constraints.battery_constraint(drone, delivery):
+        with DroneLocator(self.drones, positions=[drone_state.pos for drone_state in state.states]) as locator:
+            for index, delivery in sorted_deliveries:
+                if delivery.id not in unassigned_deliveries:
                     continue
-                if not self.constraints.no_fly_zone_constraint(
-                    drone.current_pos, delivery.pos, no_fly_zones, current_time):
+                    
+                candidates = self._nearest_feasible(locator, feasibility, index, delivery.pos)
+                if len(candidates) == 0:
                     continue
                 
-                # Maliyet hesapla
-                distance = calculate_distance(drone.current_pos, delivery.pos)
-                cost = distance + (delivery.weight * 10)  # Ağırlık maliyeti
+                # Maliyet hesapla (eşitlikte ilk drone)
+                costs = [self.distances.between(state.state(k).pos, delivery.pos) + (delivery.weight * 10)
+                         for k in candidates]  # Ağırlık maliyeti
+                best_index = int(candidates[int(np.argmin(costs))])
+                best_drone = self.drones[best_index]
                 
-                if cost < min_cost:
-                    min_cost = cost
-                    best_drone = drone
-            
-            # Atama yap
-            if best_drone:
+                # Atama yap
                 if best_drone.id not in assignments:
                     assignments[best_drone.id] = []
                 assignments[best_drone.id].append(delivery.id)
                 unassigned_deliveries.remove(delivery.id)
                 
                 # Drone durumunu güncelle
-                success = best_drone.move_to(delivery.pos, delivery.weight)
-                if success:
-                    delivery.delivered = True
-                    delivery.assigned_to = best_drone.id
-                    delivery.delivery_time = best_drone.current_time.strftime("%H:%M")
-                    best_drone.complete_delivery()
-                    best_drone.add_to_route(delivery.id)
+                moved = state.move(best_index, best_drone, delivery, self.distances.between)
+                if moved is not None:
+                    state = moved
+                    locator.move(best_index, state.state(best_index).pos)
+                feasibility.update_drone(best_index, state.state(best_index))
         
+        self.state = state
         return assignments
 
+    def _greedy_routes(self, no_fly_zones: List) -> List[List[int]]:
+        """Açgözlü atamanın drone sırasına göre teslimat indeksi dizileri (self.state değişmez)"""
+        state = self.state
+        assignments = self._assign_greedy(no_fly_zones)
+        self.state = state
+        drone_index = {drone.id: k for k, drone in enumerate(self.drones)}
+        delivery_index = {delivery.id: d for d, delivery in enumerate(self.deliveries)}
+        routes = [[] for _ in self.drones]
+        for drone_id, delivery_ids in assignments.items():
+            routes[drone_index[drone_id]] = [delivery_index[delivery_id] for delivery_id in delivery_ids]
+        return routes
+
+    def _nearest_feasible(self, locator: DroneLocator, feasibility: 'FeasibilityMatrix', d: int,
+                          pos, k: int = NEAREST_DRONES) -> List[int]:
+        """En ucuz uygun drone'u kesin içeren en yakın k drone içindeki uygun dronlar (indeks sırasıyla)
+
+        Tablo mesafesi (engel duyarlı olabilir) düz mesafeden kısa olamaz. k. en
+        yakın drone'un düz mesafesi bulunan en düşük tablo mesafesini geçene kadar
+        k ikiye katlanır; kümenin dışındaki her drone kesin daha pahalıdır.
+        """
+        while True:
+            nearest = locator.nearest(pos, k)
+            feasible = sorted(i for i in nearest if feasibility.matrix[i, d])
+            if len(nearest) == len(locator):
+                return feasible
+            if feasible:
+                best = min(self.distances.between(locator.positions[i], pos) for i in feasible)
+                if calculate_distance(locator.positions[nearest[-1]], pos) > best:
+                    return feasible
+            k *= 2
+
+    def _assign_matching(self, no_fly_zones: List, method: str):
+        """Her dağıtım turunda dronlar ile bekleyen teslimatlar arasında en düşük maliyetli eşleştirme
+
+        Maliyet açgözlü atamayla aynıdır (mesafe + ağırlık × 10), yüksek öncelik
+        MATCHING_PRIORITY_WEIGHT kadar indirim alır. Her tur bir drone'a en fazla
+        bir teslimat verir; eşleşen dronlar yeni konumlarından sonraki tura katılır.
+        """
+        state = self.initial_state
+        feasibility = FeasibilityMatrix(self.drones, self.deliveries, no_fly_zones, require_move=True,
+                                        states=state.states, distances=self.distances)
+        priorities = np.asarray([delivery.priority for delivery in self.deliveries], dtype=float)
+        pending = np.ones(len(self.deliveries), dtype=bool)
+        assignments = {}
+
+        while pending.any():
+            columns = np.nonzero(pending)[0]
+            feasible = feasibility.matrix[:, columns]
+            if not feasible.any():
+                break
+            cost = self.distances.block([drone_state.pos for drone_state in state.states],
+                                        [self.deliveries[d].id for d in columns])
+            cost += feasibility.weights[columns] * 10 - priorities[columns] * MATCHING_PRIORITY_WEIGHT
+            cost[~feasible] = np.inf
+            if method == "auction":
+                rows, cols = auction_assignment(cost)
+            else:
+                rows, cols = linear_assignment(cost)
+            if len(rows) == 0:
+                break
+
+            for k, column in zip(rows.tolist(), cols.tolist()):
+                d = int(columns[column])
+                drone, delivery = self.drones[k], self.deliveries[d]
+                pending[d] = False
+                moved = state.move(k, drone, delivery, self.distances.between)
+                if moved is not None:
+                    state = moved
+                    assignments.setdefault(drone.id, []).append(delivery.id)
+                feasibility.update_drone(k, state.state(k))
+        self.state = state
+        return assignments
+
+    def _assign_backtracking(self, no_fly_zones: List, max_nodes: int, time_limit: float):
+        """En iyi arama çözümünü filo durumuna uygula
+
+        Arama açgözlü çözümle başlar; bütçe erken biterse en az onun kadar iyi bir plan döner.
+        """
+        incumbent = self._greedy_routes(no_fly_zones)
+        self.search = BacktrackingSearch(self.drones, self.deliveries, no_fly_zones, self.distances,
+                                         max_nodes=max_nodes, time_limit=time_limit,
+                                         states=self.initial_state.states)
+        routes = self.search.solve(incumbent)
+
+        state = self.initial_state
+        for k, route in enumerate(routes):
+            for d in route:
+                moved = state.move(k, self.drones[k], self.deliveries[d], self.distances.between)
+                if moved is None:
+                    break
+                state = moved
+        self.state = state
+        return state.assignments(since=self.initial_state)
+
+class RouteSimulator:
+    """Drone rotalarını gerçek Drone nesnelerini değiştirmeden adım adım simüle eder"""
+
+    def __init__(self, drones: List[Drone], no_fly_zones: List, distances: DistanceMatrix):
+        self.drones = drones
+        self.zone_index = ZoneIndex.for_zones(no_fly_zones or [])
+        self.distances = distances
+
+    def move(self, k: int, state: DroneState, delivery: DeliveryPoint) -> Optional[DroneState]:
+        """Drone.move_to ile aynı kurallarla teslimat sonrası durum (başarısızsa None)"""
+        return self.drones[k].simulate_move(state, delivery.pos, delivery.weight, self.distances.between)
+
+    def serve(self, k: int, state: DroneState, delivery: DeliveryPoint) -> Optional[DroneState]:
+        """CSPConstraints kısıtları sağlanıyorsa teslimat sonrası durum, aksi halde None"""
+        drone = self.drones[k]
+        minute = int(state.minutes) % DAY_MINUTES
+        if not drone.can_carry(delivery.weight) or not delivery.is_in_time_window(minute):
+            return None
+        energy = drone.calculate_energy_consumption(self.distances.between(state.pos, delivery.pos), delivery.weight)
+        if energy > state.battery and energy > drone.initial_battery:
+            return None
+        for nfz in self.zone_index.query_segment(state.pos, delivery.pos, minute):
+            if nfz.does_path_intersect(state.pos, delivery.pos):
+                return None
+        return self.move(k, state, delivery)
+
+    def leg_cost(self, state: DroneState, delivery: DeliveryPoint) -> float:
+        """Açgözlü atamayla aynı maliyet: mesafe + ağırlık × 10"""
+        return self.distances.between(state.pos, delivery.pos) + delivery.weight * 10
+
+class BacktrackingSearch:
+    """Teslimat ataması için geri izlemeli CSP araması
+
+    Değişkenler teslimatlar, değerler dronlar ya da None'dır (atanmadı). Her
+    drone'un rotası kendisine atanan teslimatların arama sırasıdır; kısıtlar
+    drone'un o anki simüle durumunda (konum, saat, batarya) değerlendirilir.
+
+    - Değişken seçimi: MRV, eşitlikte derece (paylaşılan drone sayısı) ve öncelik
+    - Değer sırası: en az kısıtlayan değer (LCV), None en son
+    - İleri kontrol: kapasite ve kapanmış zaman penceresi kalıcı olarak budanır
+    - AC-3: aynı drone'a düşen teslimat çiftlerinin sıralanabilirliği; yalnızca
+      teslimatı bırakmanın (None) mevcut en iyi çözümü geçemeyeceği durumda budar
+    - Dal-sınır: (teslimat sayısı, öncelik toplamı) üst sınırı en iyi çözümü geçemiyorsa dal kesilir
+    """
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint], no_fly_zones: List,
+                 distances: DistanceMatrix, max_nodes: int = 20000, time_limit: float = 2.0,
+                 states: List[DroneState] = None):
+        self.drones = drones
+        self.deliveries = deliveries
+        self.distances = distances
+        self.simulator = RouteSimulator(drones, no_fly_zones, distances)
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.stats = {'nodes': 0, 'complete': False, 'served': 0, 'seeded': 0}
+        if states is None:
+            states = [DroneState(drone.current_pos, drone.time_minutes, drone.battery) for drone in drones]
+        self.states = list(states)
+        self.feasibility = FeasibilityMatrix(drones, deliveries, no_fly_zones, require_move=True, states=self.states,
+                                             distances=distances)
+        self._rows = {}
+
+    def _row(self, k: int, state: DroneState) -> np.ndarray:
+        """Simüle durumdaki drone'un tüm teslimatlar için uygunluk satırı (önbellekli)"""
+        key = (k, state)
+        if key not in self._rows:
+            if len(self._rows) > SEARCH_MEMO_LIMIT:
+                self._rows.clear()
+            self._rows[key] = self.feasibility.rows([k], [state.pos], [state.minutes], [state.battery])[0]
+        return self._rows[key]
+
+    def _can_serve(self, k: int, state: DroneState, d: int) -> bool:
+        return bool(self._row(k, state)[d])
+
+    def _closed(self, k: int, state: DroneState, d: int) -> bool:
+        """Drone saati pencereyi geçti ya da paket taşınamaz: kalıcı olarak uygunsuz
+
+        Saat FeasibilityMatrix.rows ile aynı şekilde gece yarısında sarılır.
+        """
+        return (not self.drones[k].can_carry(self.deliveries[d].weight) or
+                int(state.minutes) % DAY_MINUTES > self.deliveries[d].window.end)
+
+    def _orderable(self, k: int, state: DroneState, d: int, e: int) -> bool:
+        """d ve e aynı drone'da herhangi bir sırayla pencerelerine sığabilir mi (alt sınır)"""
+        now = int(state.minutes) % DAY_MINUTES
+        window_d, window_e = self.deliveries[d].window, self.deliveries[e].window
+        return (max(now, window_d.start) + 2 <= window_e.end or
+                max(now, window_e.start) + 2 <= window_d.end)
+
+    def _upper_bound(self, score: Tuple[int, int], domains: Dict[int, Set[int]]) -> Tuple[int, int]:
+        open_deliveries = [d for d, domain in domains.items() if domain]
+        return (score[0] + len(open_deliveries),
+                score[1] + sum(self.deliveries[d].priority for d in open_deliveries))
+
+    def _ac3(self, domains: Dict[int, Set[int]], states: List[DroneState], score: Tuple[int, int]) -> bool:
+        """Çift kısıtları üzerinde ark tutarlılığı; çelişkide False"""
+        bound = self._upper_bound(score, domains)
+        # Bırakıldığında üst sınır en iyi çözümün altına düşen teslimatlar mutlaka atanmalı
+        required = {d for d, domain in domains.items()
+                    if domain and (bound[0] - 1, bound[1] - self.deliveries[d].priority) <= self._best_score}
+        if not required:
+            return True
+
+        queue = deque((d, e) for e in required for d in domains if d != e and domains[d] & domains[e])
+        while queue:
+            d, e = queue.popleft()
+            if e not in required:
+                continue
+            removed = {k for k in domains[d]
+                       if not (domains[e] - {k} or self._orderable(k, states[k], d, e))}
+            if removed:
+                domains[d] -= removed
+                if not domains[d] and d in required:
+                    return False
+                queue.extend((f, d) for f in domains if f != d and f != e and domains[f] & domains[d])
+        return True
+
+    def solve(self, incumbent: List[List[int]] = None) -> List[List[int]]:
+        """Drone sırasına göre teslimat indeksi dizileri (en iyi bulunan çözüm)
+
+        incumbent verilirse (ör. açgözlü çözüm) arama onu başlangıç en iyisi
+        olarak alır; bütçe tükense de sonuç ondan kötü olmaz.
+        """
+        states = self.states
+        domains = {d: {k for k in range(len(self.drones)) if not self._closed(k, states[k], d)}
+                   for d in range(len(self.deliveries))}
+
+        self._best_score, self._best_cost = (-1, -1), float('inf')
+        self._best = [[] for _ in self.drones]
+        if incumbent is not None:
+            self._seed(incumbent)
+        self._deadline = time.time() + self.time_limit
+        self._stopped = False
+        self.stats['nodes'] = 0
+
+        if self._ac3(domains, states, (0, 0)):
+            self._search(states, [[] for _ in self.drones], domains, (0, 0), 0.0)
+        self.stats['complete'] = not self._stopped
+        self.stats['served'] = sum(len(route) for route in self._best)
+        return self._best
+
+    def _seed(self, incumbent: List[List[int]]):
+        """Başlangıç çözümünü arama kurallarıyla yürüt; uygulanamayan teslimatlar atlanır"""
+        routes = [[] for _ in self.drones]
+        score, cost = (0, 0), 0.0
+        for k, route in enumerate(incumbent):
+            state = self.states[k]
+            for d in route:
+                new_state = self.simulator.move(k, state, self.deliveries[d]) if self._can_serve(k, state, d) else None
+                if new_state is None:
+                    continue
+                routes[k].append(d)
+                score = (score[0] + 1, score[1] + self.deliveries[d].priority)
+                cost += self.simulator.leg_cost(state, self.deliveries[d])
+                state = new_state
+        self._best_score, self._best_cost = score, cost
+        self._best = routes
+        self.stats['seeded'] = score[0]
+
+    def _search(self, states: List[DroneState], routes: List[List[int]], domains: Dict[int, Set[int]],
+                score: Tuple[int, int], cost: float):
+        """Derinlik öncelikli arama; özyineleme yerine açık yığın (derinlik teslimat sayısı kadar olabilir)"""
+        stack = [self._expand(states, routes, domains, score, cost)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+            else:
+                stack.append(self._expand(*child))
+
+    def _expand(self, states: List[DroneState], routes: List[List[int]], domains: Dict[int, Set[int]],
+                score: Tuple[int, int], cost: float):
+        """Tek arama düğümü: alt düğümlerin argümanlarını sırayla üretir"""
+        self.stats['nodes'] += 1
+        if self.stats['nodes'] > self.max_nodes or time.time() > self._deadline:
+            self._stopped = True
+        if self._stopped:
+            return
+
+        current = {d: [k for k in domain if self._can_serve(k, states[k], d)] for d, domain in domains.items()}
+        candidates = [d for d in current if current[d]]
+        if not candidates:
+            if score > self._best_score or (score == self._best_score and cost < self._best_cost):
+                self._best_score, self._best_cost = score, cost
+                self._best = [list(route) for route in routes]
+            return
+        if self._upper_bound(score, domains) <= self._best_score:
+            return
+
+        # MRV, eşitlikte derece ve öncelik
+        load = {}
+        for d in candidates:
+            for k in current[d]:
+                load[k] = load.get(k, 0) + 1
+        d = min(candidates, key=lambda d: (len(current[d]), -sum(load[k] for k in current[d]),
+                                           -self.deliveries[d].priority, d))
+        delivery = self.deliveries[d]
+        others = [e for e in domains if e != d]
+
+        # LCV: diğer teslimatlara en çok seçenek bırakan drone önce
+        options = []
+        for k in current[d]:
+            new_state = self.simulator.move(k, states[k], delivery)
+            kept = sum(1 for e in others if k in current[e] and self._can_serve(k, new_state, e))
+            leg = self.simulator.leg_cost(states[k], delivery)
+            options.append((-kept, leg, k, new_state))
+        options.sort(key=lambda option: option[:3])
+
+        for _, leg, k, new_state in options:
+            new_states = list(states)
+            new_states[k] = new_state
+            # İleri kontrol: yeni saatle kapanan pencereleri kalıcı olarak buda
+            new_domains = {e: ({v for v in domains[e] if v != k or not self._closed(k, new_state, e)})
+                           for e in others}
+            new_score = (score[0] + 1, score[1] + delivery.priority)
+            if not self._ac3(new_domains, new_states, new_score):
+                continue
+            routes[k].append(d)
+            yield new_states, routes, new_domains, new_score, cost + leg
+            routes[k].pop()
+            if self._stopped:
+                return
+
+        # None: teslimat bırakılır
+        dropped = {e: set(domains[e]) for e in others}
+        if self._ac3(dropped, states, score):
+            yield states, routes, dropped, score, cost
+
+class IncrementalCSP:
+    """Gün içi sipariş ekleme/iptali ve drone güncellemeleri için yerel onarım
+
+    İlk plan açgözlü çözümle başlayan BacktrackingSearch ile bir kez kurulur. Sonraki her değişiklikte
+    yalnızca etkilenen drone'un rotası yeniden simüle edilir; artık uygun
+    olmayan teslimatlar rotadan çıkarılıp atanmamışlarla birlikte öncelik
+    sırasıyla en ucuz uygun konuma eklenir. Diğer rotalara dokunulmaz.
+    Dronlar commit() çağrılana kadar değişmez.
+    """
+
+    def __init__(self, drones: List[Drone], deliveries: List[DeliveryPoint], no_fly_zones: List = None,
+                 distance_matrix: DistanceMatrix = None, max_nodes: int = 20000, time_limit: float = 2.0,
+                 fleet_state: FleetState = None):
+        self.drones = drones
+        self.deliveries = {delivery.id: delivery for delivery in deliveries}
+        self.distances = distance_matrix if distance_matrix is not None else DistanceMatrix(drones, deliveries)
+        self.simulator = RouteSimulator(drones, no_fly_zones or [], self.distances)
+        self._drone_index = {drone.id: k for k, drone in enumerate(drones)}
+        self.initial_state = fleet_state if fleet_state is not None else FleetState.from_drones(drones)
+        self.states = self.initial_state.states
+        self.stats = {'updates': 0, 'revisited': 0}
+
+        incumbent = CSP(drones, deliveries, self.distances, self.initial_state)._greedy_routes(no_fly_zones or [])
+        self.search = BacktrackingSearch(drones, deliveries, no_fly_zones or [], self.distances,
+                                         max_nodes=max_nodes, time_limit=time_limit, states=self.states)
+        self.routes = [[deliveries[d].id for d in route] for route in self.search.solve(incumbent)]
+        assigned = {delivery_id for route in self.routes for delivery_id in route}
+        self.unassigned = set(self.deliveries) - assigned
+
+    def _simulate(self, k: int, route: List[int]) -> Tuple[List[int], List[int]]:
+        """Rotayı baştan yürüt; (uygun kalanlar, çıkarılanlar)"""
+        state = self.states[k]
+        kept, evicted = [], []
+        for delivery_id in route:
+            new_state = self.simulator.serve(k, state, self.deliveries[delivery_id])
+            if new_state is None:
+                evicted.append(delivery_id)
+            else:
+                kept.append(delivery_id)
+                state = new_state
+        return kept, evicted
+
+    def _best_insertion(self, delivery: DeliveryPoint) -> Optional[Tuple[float, int, int]]:
+        """Rotaların geri kalanını bozmayan en ucuz (ek maliyet, drone, konum)"""
+        best = None
+        for k, route in enumerate(self.routes):
+            # Rota ön ekleri bir kez simüle edilir
+            prefix_states, prefix_costs = [self.states[k]], [0.0]
+            for delivery_id in route:
+                step = self.deliveries[delivery_id]
+                prefix_costs.append(prefix_costs[-1] + self.simulator.leg_cost(prefix_states[-1], step))
+                prefix_states.append(self.simulator.move(k, prefix_states[-1], step))
+
+            for position in range(len(route) + 1):
+                state = self.simulator.serve(k, prefix_states[position], delivery)
+                if state is None:
+                    continue
+                cost = prefix_costs[position] + self.simulator.leg_cost(prefix_states[position], delivery)
+                for delivery_id in route[position:]:
+                    step = self.deliveries[delivery_id]
+                    new_state = self.simulator.serve(k, state, step)
+                    if new_state is None:
+                        break
+                    cost += self.simulator.leg_cost(state, step)
+                    state = new_state
+                else:
+                    candidate = (cost - prefix_costs[-1], k, position)
+                    if best is None or candidate < best:
+                        best = candidate
+        return best
+
+    def _insert(self, delivery: DeliveryPoint) -> bool:
+        best = self._best_insertion(delivery)
+        if best is None:
+            return False
+        _, k, position = best
+        self.routes[k].insert(position, delivery.id)
+        self.unassigned.discard(delivery.id)
+        return True
+
+    def _repair(self, pool) -> List[int]:
+        """Havuzdaki teslimatları öncelik sırasıyla yerleştir; yerleşemeyenler atanmamış kalır"""
+        placed = []
+        ordered = sorted(set(pool), key=lambda delivery_id: (-self.deliveries[delivery_id].priority, delivery_id))
+        self.stats['revisited'] += len(ordered)
+        for delivery_id in ordered:
+            if self._insert(self.deliveries[delivery_id]):
+                placed.append(delivery_id)
+            else:
+                self.unassigned.add(delivery_id)
+        return placed
+
+    def _locate(self, delivery_id: int) -> Optional[int]:
+        for k, route in enumerate(self.routes):
+            if delivery_id in route:
+                return k
+        return None
+
+    def _resimulate(self, k: int):
+        """Drone k'nin rotasını yeniden yürüt; düşenleri ve atanmamışları onar"""
+        self.routes[k], evicted = self._simulate(k, self.routes[k])
+        self._repair(evicted + sorted(self.unassigned))
+
+    def add_delivery(self, delivery: DeliveryPoint) -> bool:
+        """Yeni siparişi ekle; gerekirse daha düşük öncelikli bir teslimatı yerinden et"""
+        self.stats['updates'] += 1
+        self.stats['revisited'] += 1
+        self.deliveries[delivery.id] = delivery
+        if self._insert(delivery):
+            return True
+
+        # Yerinden etme: en düşük öncelikliden başlayarak tek bir teslimatı çıkarmayı dene
+        victims = sorted((self.deliveries[delivery_id].priority, delivery_id, k)
+                         for k, route in enumerate(self.routes) for delivery_id in route
+                         if self.deliveries[delivery_id].priority < delivery.priority)
+        for _, victim, k in victims:
+            original = self.routes[k]
+            kept, evicted = self._simulate(k, [d for d in original if d != victim])
+            if evicted:
+                continue
+            self.routes[k] = kept
+            if self._insert(delivery):
+                self._repair([victim])
+                return True
+            self.routes[k] = original
+
+        self.unassigned.add(delivery.id)
+        return False
+
+    def cancel_delivery(self, delivery_id: int) -> bool:
+        """Siparişi plandan çıkar; boşalan yer atanmamış teslimatlara açılır"""
+        if delivery_id not in self.deliveries:
+            return False
+        self.stats['updates'] += 1
+        del self.deliveries[delivery_id]
+        k = self._locate(delivery_id)
+        if k is None:
+            self.unassigned.discard(delivery_id)
+            return True
+        self.routes[k].remove(delivery_id)
+        self._resimulate(k)
+        return True
+
+    def update_drone_state(self, drone_id: int, pos: Tuple[float, float] = None, minutes: float = None,
+                           battery: float = None):
+        """Drone'un gerçek konum/saat/bataryasını al ve yalnızca onun rotasını onar
+
+        Verilmeyen alanlar Drone nesnesinden okunur.
+        """
+        self.stats['updates'] += 1
+        k = self._drone_index[drone_id]
+        drone = self.drones[k]
+        self.states[k] = DroneState(pos if pos is not None else drone.current_pos,
+                                    minutes if minutes is not None else drone.time_minutes,
+                                    battery if battery is not None else drone.battery)
+        self._resimulate(k)
+
+    def assignments(self) -> Dict[int, List[int]]:
+        return {drone.id: list(route) for drone, route in zip(self.drones, self.routes) if route}
+
+    def fleet_state(self) -> FleetState:
+        """Güncel planın sonundaki filo durumu (dronlar değişmez)"""
+        state = self.initial_state
+        for k, (drone, route) in enumerate(zip(self.drones, self.routes)):
+            state = state.with_state(k, self.states[k])
+            for delivery_id in route:
+                moved = state.move(k, drone, self.deliveries[delivery_id], self.distances.between)
+                if moved is None:
+                    break
+                state = moved
+        return state
+
+    def commit(self) -> Dict[int, List[int]]:
+        """Güncel planı dronlara uygula (CSP.assign_deliveries ile aynı çıktı)"""
+        state = self.fleet_state()
+        state.apply_to(self.drones, self.deliveries.values())
+        return state.assignments(since=self.initial_state)
+
 class CSPSolver:
-    def solve(self, drones, deliveries, no_fly_zones):
-        """Gelişmiş CSP çözücü"""
-        csp = CSP(drones, deliveries)
-        return csp.assign_deliveries(no_fly_zones)
\ No newline at end of file
+    def solve(self, drones, deliveries, no_fly_zones, distance_matrix: DistanceMatrix = None,
+              method: str = "greedy", fleet_state: FleetState = None, commit: bool = True,
+              cost_source=None):
+        """Gelişmiş CSP çözücü (sonuç durumu self.state'te)
+
+        Varsayılan açgözlü atamadır; "backtracking" isteğe bağlıdır ve açgözlü
+        çözümden başlayıp bütçe içinde iyileştirir.
+
+        cost_source bir AStar ise ve distance_matrix verilmemişse bacaklar düz
+        çizgi yerine yasak bölgeleri dolaşan yol uzunluklarıyla ölçülür.
+        """
+        if distance_matrix is None and cost_source is not None:
+            distance_matrix = DistanceMatrix.obstacle_aware(drones, deliveries, cost_source)
+        csp = CSP(drones, deliveries, distance_matrix, fleet_state)
+        assignments = csp.assign_deliveries(no_fly_zones, method=method, commit=commit)
+        self.state = csp.state
+        return assignments
+
+    def incremental(self, drones, deliveries, no_fly_zones, distance_matrix: DistanceMatrix = None,
+                    fleet_state: FleetState = None) -> IncrementalCSP:
+        """Gün içi değişiklikler için sıcak tutulan çözüm"""
+        return IncrementalCSP(drones, deliveries, no_fly_zones, distance_matrix, fleet_state=fleet_state)
\ No newline at end of file
@@ -1,35 +1,616 @@
 # algorithms/genetic.py - FİNAL GÜNCELLENMİŞ VERSİYON
+import os
 import random
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import copy
-from utils.geometry import calculate_distance
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from utils.distance_matrix import DistanceMatrix
+from utils.spatial_index import ZoneIndex
+from utils.shared_arrays import publish, attach, release
+from models.fleet_state import FleetState
+
+class PopulationEvaluator:
+    """Tüm popülasyonun fitness değerlerini tek geçişte hesaplar
+
+    GeneticAlgorithm.calculate_fitness ile bit bit aynı sonucu verir. Bireyler
+    (P, K, L) dolgulu teslimat indeksi dizisine dökülür ve rotalar adım adım
+    hep birlikte ilerletilir; ağırlık, batarya ve yasak bölge ihlalleri
+    dallanma yerine maskelerle işlenir. Yalnızca dizilerden oluştuğu için
+    süreçler arasında gönderilebilir.
+    """
+
+    ARRAY_FIELDS = ('distances', 'first_legs', 'delivery_nodes', 'max_weight', 'battery', 'weights', 'zone_hits')
+
+    def __init__(self, drones, deliveries, no_fly_zones, distance_matrix: DistanceMatrix = None,
+                 fleet_state: FleetState = None):
+        if distance_matrix is None:
+            distance_matrix = DistanceMatrix(drones, deliveries)
+        if fleet_state is None:
+            fleet_state = FleetState.from_drones(drones)
+        self.distances = distance_matrix.matrix
+        # İlk bacak drone'un anlık görüntüdeki konumundan ölçülür (K, D)
+        self.first_legs = distance_matrix.block([state.pos for state in fleet_state.states],
+                                                [delivery.id for delivery in deliveries])
+        self.delivery_nodes = np.asarray([distance_matrix.delivery_node(delivery.id) for delivery in deliveries],
+                                         dtype=np.int64)
+        self.max_weight = np.asarray([drone.max_weight for drone in drones], dtype=float)
+        self.battery = np.asarray([state.battery for state in fleet_state.states], dtype=float)
+        self.weights = np.asarray([delivery.weight for delivery in deliveries], dtype=float)
+
+        # Drone başlangıcı -> teslimat kenarının kestiği bölge sayısı (K, D)
+        self.zone_hits = None
+        if no_fly_zones and drones and deliveries:
+            zone_index = ZoneIndex.for_zones(no_fly_zones)
+            ends = [delivery.pos for delivery in deliveries]
+            self.zone_hits = np.stack([zone_index.segment_hits([state.pos] * len(ends), ends).sum(axis=1)
+                                       for state in fleet_state.states]).astype(np.int64)
+
+    @property
+    def n_drones(self) -> int:
+        return len(self.first_legs)
+
+    @property
+    def n_deliveries(self) -> int:
+        return len(self.delivery_nodes)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Değerlendirmenin ihtiyaç duyduğu tüm senaryo dizileri"""
+        return {field: getattr(self, field) for field in self.ARRAY_FIELDS if getattr(self, field) is not None}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'PopulationEvaluator':
+        evaluator = cls.__new__(cls)
+        for field in cls.ARRAY_FIELDS:
+            setattr(evaluator, field, arrays.get(field))
+        return evaluator
+
+    def pack(self, population: List[List[List[int]]]) -> np.ndarray:
+        """Bireyleri -1 ile dolgulu (P, K, L) diziye dök"""
+        routes = [individual[k] if k < len(individual) else ()
+                  for individual in population for k in range(self.n_drones)]
+        lengths = np.fromiter((len(route) for route in routes), dtype=np.int64, count=len(routes))
+        flat = np.fromiter(chain.from_iterable(routes), dtype=np.int64, count=int(lengths.sum()))
+        packed = np.full((len(routes), max(int(lengths.max(initial=0)), 1)), -1, dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        rows = np.repeat(np.arange(len(routes)), lengths)
+        packed[rows, np.arange(len(flat)) - np.repeat(offsets, lengths)] = flat
+        return packed.reshape(len(population), self.n_drones, -1)
+
+    def evaluate(self, population: List[List[List[int]]]) -> np.ndarray:
+        return self.evaluate_packed(self.pack(population))
+
+    def evaluate_packed(self, routes: np.ndarray) -> np.ndarray:
+        """(P, K, L) teslimat indekslerinden (P,) fitness; aralık dışı indeksler atlanır"""
+        n_population, n_drones, length = routes.shape
+        components = self.route_components(routes.reshape(-1, length), np.tile(np.arange(n_drones), n_population))
+        return self.combine(*(component.reshape(n_population, n_drones) for component in components))
+
+    def route_components(self, flat: np.ndarray, drone_of_row: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """(R, L) rotalar ve satırların drone indeksleri -> satır başına
+        (tamamlanan, enerji, mesafe, ihlal, yasak bölge) bileşenleri"""
+        length = flat.shape[1]
+        drone_of_row = np.asarray(drone_of_row)
+
+        # Rotalar uzunluğa göre azalan sıralanır; her adımda yalnızca hâlâ süren rotaların öneki işlenir
+        filled = flat != -1
+        lengths = np.where(filled.any(axis=1), length - np.argmax(filled[:, ::-1], axis=1), 0)
+        order = np.argsort(-lengths, kind="stable")
+        flat, drone_of_row, lengths = flat[order], drone_of_row[order], lengths[order]
+        active_rows = len(lengths) - np.searchsorted(lengths[::-1], np.arange(length), side="right")
+
+        n_nodes = self.distances.shape[1]
+        distances = self.distances.ravel()
+        max_weight = self.max_weight[drone_of_row]
+        battery = self.battery[drone_of_row]
+        # -1: drone henüz anlık görüntü konumunda
+        node = np.full(len(flat), -1, dtype=np.int64)
+        weight = np.zeros(len(flat))
+        energy = np.zeros(len(flat))
+        distance = np.zeros(len(flat))
+        completed = np.zeros(len(flat), dtype=np.int64)
+        violations = np.zeros(len(flat), dtype=np.int64)
+        no_fly = np.zeros(len(flat), dtype=np.int64)
+
+        for step in range(length):
+            n = active_rows[step]
+            column = flat[:n, step]
+            active = (column >= 0) & (column < self.n_deliveries)
+            d = np.where(active, column, 0)
+
+            # Ağırlık: sığmayan teslimat atlanır, durum değişmez
+            new_weight = weight[:n] + self.weights[d]
+            fits = active & (new_weight <= max_weight[:n])
+
+            # Mesafe sığan her teslimat için eklenir; batarya yetmezse konum değişmez
+            delivery_node = self.delivery_nodes[d]
+            leg = np.where(node[:n] >= 0, distances[np.maximum(node[:n], 0) * n_nodes + delivery_node],
+                           self.first_legs[drone_of_row[:n], d])
+            distance[:n] = np.where(fits, distance[:n] + leg, distance[:n])
+            new_energy = energy[:n] + leg * (1 + new_weight * 0.1)
+            accepted = fits & (new_energy <= battery[:n])
+
+            violations[:n] += active & ~accepted
+            completed[:n] += accepted
+            weight[:n] = np.where(accepted, new_weight, weight[:n])
+            energy[:n] = np.where(accepted, new_energy, energy[:n])
+            node[:n] = np.where(accepted, delivery_node, node[:n])
+            if self.zone_hits is not None:
+                no_fly[:n] += np.where(accepted, self.zone_hits[drone_of_row[:n], d], 0)
+
+        # Özgün satır sırasına dön
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return completed[inverse], energy[inverse], distance[inverse], violations[inverse], no_fly[inverse]
+
+    @staticmethod
+    def combine(completed: np.ndarray, energy: np.ndarray, distance: np.ndarray,
+                violations: np.ndarray, no_fly: np.ndarray) -> np.ndarray:
+        """(P, K) rota bileşenlerinden (P,) fitness"""
+        # Toplamlar calculate_fitness ile aynı sırayla (drone drone) biriktirilir
+        total_energy = np.zeros(len(energy))
+        total_distance = np.zeros(len(distance))
+        for k in range(energy.shape[1]):
+            total_energy += energy[:, k]
+            total_distance += distance[:, k]
+
+        completed = completed.sum(axis=1)
+        violations = violations.sum(axis=1)
+        no_fly = no_fly.sum(axis=1)
+        fitness = completed * 100 - total_energy * 0.5 - violations * 200 - no_fly * 300 - total_distance * 0.1
+        return np.maximum(fitness, 0)
+
+# İşçi süreçlerinde paylaşılan bellekten kurulan değerlendirici
+_worker_evaluator = None
+_worker_blocks = []
+_worker_cache = None
+
+def _attach_evaluator(spec):
+    global _worker_evaluator, _worker_blocks, _worker_cache
+    _worker_blocks, arrays = attach(spec)
+    _worker_cache = None
+    _worker_evaluator = PopulationEvaluator.from_arrays(arrays)
+
+def _evaluate_chunk(routes: np.ndarray) -> np.ndarray:
+    return _worker_evaluator.evaluate_packed(routes)
+
+def _route_chunk(chunk: Tuple[np.ndarray, np.ndarray]) -> Tuple[np.ndarray, ...]:
+    return _worker_evaluator.route_components(*chunk)
+
+def _compact(routes: np.ndarray) -> np.ndarray:
+    """Bloğu kendi dolgu uzunluğuna kırp ve küçük tamsayı tipine çevir"""
+    dtype = np.int32 if routes.max(initial=0) < np.iinfo(np.int32).max else routes.dtype
+    filled = np.flatnonzero((routes != -1).reshape(-1, routes.shape[-1]).any(axis=0))
+    return np.ascontiguousarray(routes[..., :filled[-1] + 1 if len(filled) else 1], dtype=dtype)
+
+class ParallelEvaluator:
+    """PopulationEvaluator'ı süreç havuzunda çalıştırır
+
+    Senaryo dizileri bir kez multiprocessing.shared_memory'ye yazılır ve
+    işçiler başlarken bunlara kopyasız bağlanır; her nesilde yalnızca
+    paketlenmiş kromozom blokları gönderilir. Sonuçlar seri değerlendirmeyle
+    aynıdır. close() (ya da with) havuzu kapatıp belleği bırakır.
+    """
+
+    def __init__(self, evaluator: PopulationEvaluator, workers: int = None):
+        self.evaluator = evaluator
+        self.workers = workers or os.cpu_count() or 1
+        self._blocks, spec = publish(evaluator.arrays())
+        try:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_evaluator,
+                                             initargs=(spec,))
+        except Exception:
+            release(self._blocks, unlink=True)
+            raise
+
+    @property
+    def n_drones(self) -> int:
+        return self.evaluator.n_drones
+
+    def __enter__(self) -> 'ParallelEvaluator':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+        release(self._blocks, unlink=True)
+        self._blocks = []
+
+    def evaluate(self, population: List[List[List[int]]]) -> np.ndarray:
+        return self.evaluate_packed(self.evaluator.pack(population))
+
+    def evaluate_packed(self, routes: np.ndarray) -> np.ndarray:
+        if len(routes) == 0:
+            return np.zeros(0)
+        # Bloklar küçük tamsayı tipinde ve kendi dolgu uzunluklarına kırpılarak gönderilir
+        chunks = [_compact(chunk) for chunk in np.array_split(routes, min(self.workers, len(routes)))]
+        return np.concatenate(list(self._pool.map(_evaluate_chunk, chunks)))
+
+    def route_components(self, flat: np.ndarray, drone_of_row: np.ndarray) -> Tuple[np.ndarray, ...]:
+        if len(flat) == 0:
+            return self.evaluator.route_components(flat, drone_of_row)
+        parts = min(self.workers, len(flat))
+        chunks = [(_compact(rows), drones) for rows, drones in zip(np.array_split(flat, parts),
+                                                                  np.array_split(np.asarray(drone_of_row), parts))]
+        results = list(self._pool.map(_route_chunk, chunks))
+        return tuple(np.concatenate(component) for component in zip(*results))
+
+    def combine(self, *components) -> np.ndarray:
+        return self.evaluator.combine(*components)
+
+class FitnessCache:
+    """Değerlendirici önünde sınırlı (LRU) fitness önbelleği
+
+    Bireyler kanonik anahtarla saklanır: tam olarak drone sayısı kadar rota
+    demeti (eksik rotalar boş, fazlası yok sayılır). Elit kopyaları ve
+    klonlar yeniden hesaplanmaz. Rota bileşenleri de (drone, rota) anahtarıyla
+    ayrıca saklanır; çoğu rotası ortak bireylerde yalnızca yeni rotalar
+    değerlendirilir. Sonuçlar önbelleksiz değerlendirmeyle bit bit aynıdır.
+    """
+
+    def __init__(self, evaluator, max_size: int = 4096, max_routes: int = None):
+        self.evaluator = evaluator
+        self.n_drones = evaluator.n_drones
+        self.max_size = max_size
+        self.max_routes = max_routes if max_routes is not None else max_size * max(self.n_drones, 1)
+        self._scores = OrderedDict()
+        self._routes = OrderedDict()
+        self.hits = self.misses = 0
+        self.route_hits = self.route_misses = 0
+
+    def key(self, individual: List[List[int]]) -> Tuple[Tuple[int, ...], ...]:
+        return tuple(tuple(individual[k]) if k < len(individual) else () for k in range(self.n_drones))
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def route_hit_rate(self) -> float:
+        total = self.route_hits + self.route_misses
+        return self.route_hits / total if total else 0.0
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hit_rate,
+                'route_hits': self.route_hits, 'route_misses': self.route_misses,
+                'route_hit_rate': self.route_hit_rate, 'size': len(self._scores), 'routes': len(self._routes)}
+
+    @staticmethod
+    def _store(cache: OrderedDict, key, value, limit: int):
+        cache[key] = value
+        if len(cache) > limit:
+            cache.popitem(last=False)
+
+    def evaluate(self, population: List[List[List[int]]]) -> np.ndarray:
+        scores = np.empty(len(population))
+        missing = {}
+        for i, individual in enumerate(population):
+            key = self.key(individual)
+            score = self._scores.get(key)
+            if score is not None:
+                self._scores.move_to_end(key)
+                scores[i] = score
+            elif key in missing:
+                # Aynı nesildeki klon: ilk kopyanın sonucunu paylaşır
+                missing[key].append(i)
+            else:
+                missing[key] = [i]
+        self.hits += len(population) - len(missing)
+        self.misses += len(missing)
+        if not missing:
+            return scores
+
+        keys = list(missing)
+        components = self._components(keys)
+        fitness = self.evaluator.combine(*(component.reshape(len(keys), self.n_drones)
+                                           for component in components))
+        for key, score in zip(keys, fitness.tolist()):
+            scores[missing[key]] = score
+            self._store(self._scores, key, score, self.max_size)
+        return scores
+
+    def _components(self, keys) -> Tuple[np.ndarray, ...]:
+        """Bireylerin tüm (drone, rota) bileşenleri; önbellekte olmayan rotalar tek geçişte değerlendirilir"""
+        pairs = [(k, route) for key in keys for k, route in enumerate(key)]
+        cached, new_pairs = {}, {}
+        for pair in pairs:
+            if pair in cached or pair in new_pairs:
+                # Bu geçişte başka bir bireyle paylaşılan rota
+                self.route_hits += bool(pair[1])
+                continue
+            value = self._routes.get(pair)
+            if value is not None:
+                self._routes.move_to_end(pair)
+                cached[pair] = value
+                self.route_hits += 1
+            elif not pair[1]:
+                # Boş rota her zaman sıfır bileşenlidir
+                cached[pair] = (0, 0.0, 0.0, 0, 0)
+            else:
+                new_pairs[pair] = None
+                self.route_misses += 1
+
+        if new_pairs:
+            rows = list(new_pairs)
+            lengths = [len(route) for _, route in rows]
+            flat = np.full((len(rows), max(lengths)), -1, dtype=np.int64)
+            for r, (_, route) in enumerate(rows):
+                flat[r, :len(route)] = route
+            drone_of_row = np.fromiter((k for k, _ in rows), dtype=np.int64, count=len(rows))
+            values = zip(*(component.tolist() for component in self.evaluator.route_components(flat, drone_of_row)))
+            for pair, value in zip(rows, values):
+                cached[pair] = value
+                self._store(self._routes, pair, value, self.max_routes)
+
+        columns = list(zip(*(cached[pair] for pair in pairs)))
+        return (np.asarray(columns[0], dtype=np.int64), np.asarray(columns[1], dtype=float),
+                np.asarray(columns[2], dtype=float), np.asarray(columns[3], dtype=np.int64),
+                np.asarray(columns[4], dtype=np.int64))
+
+class ArrayPopulation:
+    """Popülasyonun dizi tabanlı kodlaması: dev tur + drone bölme noktaları
+
+    tours (P, N) int32 her bireyin teslimat permütasyonu, splits (P, K) int32
+    rotaların bitiş konumlarıdır: drone k'nin rotası
+    tours[p, splits[p, k-1]:splits[p, k]]. splits[p, -1]'den sonraki
+    teslimatlar atanmamıştır. Çaprazlama ve mutasyon satırlar üzerinde
+    yerinde çalışır; bireyler Python listesine yalnızca gerektiğinde açılır.
+    """
+
+    __slots__ = ('tours', 'splits')
+
+    def __init__(self, tours: np.ndarray, splits: np.ndarray):
+        self.tours = tours
+        self.splits = splits
+
+    @classmethod
+    def empty(cls, size: int, num_drones: int, num_deliveries: int) -> 'ArrayPopulation':
+        return cls(np.zeros((size, num_deliveries), dtype=np.int32), np.zeros((size, num_drones), dtype=np.int32))
+
+    @classmethod
+    def random(cls, size: int, num_drones: int, num_deliveries: int, rng: np.random.Generator,
+               smart_count: int = 0) -> 'ArrayPopulation':
+        """initialize_population karşılığı: ilk smart_count birey dengeli, diğerleri rastgele dağıtılır"""
+        population = cls.empty(size, num_drones, num_deliveries)
+        population.tours[:] = rng.permuted(np.broadcast_to(np.arange(num_deliveries, dtype=np.int32),
+                                                           (size, num_deliveries)), axis=1)
+        if num_drones == 0:
+            return population
+        # Dengeli: round-robin dağıtımdaki rota uzunlukları
+        balanced = num_deliveries // num_drones + (np.arange(num_drones) < num_deliveries % num_drones)
+        counts = rng.multinomial(num_deliveries, [1 / num_drones] * num_drones, size=size)
+        counts[:smart_count] = balanced
+        np.cumsum(counts, axis=1, out=population.splits)
+        return population
+
+    @classmethod
+    def from_individuals(cls, population: List[List[List[int]]], num_drones: int,
+                         num_deliveries: int) -> 'ArrayPopulation':
+        result = cls.empty(len(population), num_drones, num_deliveries)
+        for p, individual in enumerate(population):
+            routes = [individual[k] if k < len(individual) else [] for k in range(num_drones)]
+            assigned = [delivery for route in routes for delivery in route]
+            missing = np.setdiff1d(np.arange(num_deliveries), assigned)
+            result.tours[p] = np.concatenate((np.asarray(assigned, dtype=np.int32), missing))
+            result.splits[p] = np.cumsum([len(route) for route in routes])
+        return result
+
+    def __len__(self) -> int:
+        return len(self.tours)
+
+    def starts(self) -> np.ndarray:
+        starts = np.zeros_like(self.splits)
+        starts[:, 1:] = self.splits[:, :-1]
+        return starts
+
+    def individual(self, p: int) -> List[List[int]]:
+        bounds = [0] + self.splits[p].tolist()
+        tour = self.tours[p]
+        return [tour[start:end].tolist() for start, end in zip(bounds, bounds[1:])]
+
+    def to_individuals(self) -> List[List[List[int]]]:
+        return [self.individual(p) for p in range(len(self))]
+
+    def pack(self) -> np.ndarray:
+        """PopulationEvaluator.evaluate_packed için -1 dolgulu (P, K, L) rotalar"""
+        starts = self.starts()
+        lengths = self.splits - starts
+        steps = np.arange(max(int(lengths.max(initial=0)), 1))
+        index = np.minimum(starts[..., None] + steps, max(self.tours.shape[1] - 1, 0))
+        if self.tours.shape[1] == 0:
+            return np.full(index.shape, -1, dtype=np.int32)
+        routes = np.take_along_axis(self.tours, index.reshape(len(self), -1), axis=1).reshape(index.shape)
+        routes[steps >= lengths[..., None]] = -1
+        return routes
+
+    def copy_rows(self, source: 'ArrayPopulation', rows: np.ndarray, begin: int = 0):
+        """source'un rows satırlarını begin'den itibaren bu diziye yaz"""
+        end = begin + len(rows)
+        np.take(source.tours, rows, axis=0, out=self.tours[begin:end])
+        np.take(source.splits, rows, axis=0, out=self.splits[begin:end])
+
+    def order_crossover(self, source: 'ArrayPopulation', first: np.ndarray, second: np.ndarray, begin: int = 0):
+        """GeneticAlgorithm.crossover karşılığı (OX benzeri), tüm çiftler tek vektörel geçişte
+
+        Çocuk ilk ebeveynin atanmış turunun ilk yarısını korur, ardından ikinci
+        ebeveynin atanmış turunun aynı noktadan sonraki kısmındaki yeni
+        teslimatları sırasıyla ekler; geri kalanlar atanmamış kuyruğa gider.
+        Atanmış tur dronlara dengeli bölünür.
+        """
+        end = begin + len(first)
+        tours, splits = self.tours[begin:end], self.splits[begin:end]
+        np.take(source.tours, first, axis=0, out=tours)
+        np.take(source.splits, first, axis=0, out=splits)
+        n = tours.shape[1]
+        if n == 0 or splits.shape[1] == 0:
+            return
+        cut = splits[:, -1] // 2
+        positions = np.arange(n)
+        head = positions < cut[:, None]
+
+        # İlk ebeveynin başından alınanlar işaretlenir; ikinci ebeveynde kalanlar sırasıyla yerleşir
+        taken = np.zeros(tours.shape, dtype=bool)
+        np.put_along_axis(taken, tours, head, axis=1)
+        donor = source.tours[second]
+        rest = ~np.take_along_axis(taken, donor, axis=1)
+        donated = rest & (positions >= cut[:, None]) & (positions < source.splits[second, -1][:, None])
+        leftover = rest & ~donated
+        assigned = cut + donated.sum(axis=1)
+        target = np.where(donated, cut[:, None] + np.cumsum(donated, axis=1) - 1,
+                          assigned[:, None] + np.cumsum(leftover, axis=1) - 1)
+        rows = np.broadcast_to(np.arange(len(first))[:, None], rest.shape)
+        tours[rows[rest], target[rest]] = donor[rest]
+
+        # Atanmış tur dronlara eşit uzunlukta ardışık parçalar halinde dağıtılır (round-robin ile aynı uzunluklar)
+        n_drones = splits.shape[1]
+        drones = np.arange(1, n_drones + 1)
+        splits[:] = (assigned // n_drones)[:, None] * drones + np.minimum(drones, (assigned % n_drones)[:, None])
+
+    def mutate(self, rows: np.ndarray, rng: np.random.Generator):
+        """GeneticAlgorithm.mutate'in üç mutasyon tipi, seçilen satırlarda yerinde"""
+        for p, kind in zip(rows.tolist(), rng.integers(0, 3, len(rows)).tolist()):
+            tour, splits = self.tours[p], self.splits[p]
+            bounds = np.concatenate(([0], splits))
+            lengths = np.diff(bounds)
+            if kind == 0:
+                # Swap: farklı iki dronun birer teslimatı yer değiştirir
+                non_empty = np.flatnonzero(lengths)
+                if len(non_empty) >= 2:
+                    a, b = rng.choice(non_empty, 2, replace=False)
+                    i = bounds[a] + rng.integers(lengths[a])
+                    j = bounds[b] + rng.integers(lengths[b])
+                    tour[i], tour[j] = tour[j], tour[i]
+            elif kind == 1:
+                # Insert: bir teslimat başka bir dronun rotasının sonuna taşınır
+                non_empty = np.flatnonzero(lengths)
+                if len(non_empty):
+                    a = rng.choice(non_empty)
+                    b = rng.integers(len(splits))
+                    i = bounds[a] + rng.integers(lengths[a])
+                    delivery = tour[i]
+                    if b >= a:
+                        tour[i:splits[b] - 1] = tour[i + 1:splits[b]]
+                        tour[splits[b] - 1] = delivery
+                        splits[a:b] -= 1
+                    else:
+                        tour[splits[b] + 1:i + 1] = tour[splits[b]:i]
+                        tour[splits[b]] = delivery
+                        splits[b:a] += 1
+            else:
+                # Reverse: bir rotanın bir kısmı tersine çevrilir
+                long_routes = np.flatnonzero(lengths > 1)
+                if len(long_routes):
+                    k = rng.choice(long_routes)
+                    start = bounds[k] + rng.integers(lengths[k] - 1)
+                    end = rng.integers(start + 1, bounds[k + 1] + 1)
+                    tour[start:end] = tour[start:end][::-1]
+
+ENCODINGS = ("list", "array")
+
+# Ada modeli: her görev bir adayı migrasyon aralığı kadar nesil ilerletir
+ISLAND_TOPOLOGIES = ("ring", "random")
+
+def _evolve_island(task):
+    """Adanın popülasyonunu generations nesil ilerlet
+
+    Adanın rastgele sayı durumu görevle birlikte taşınır; sonuç hangi işçide
+    çalıştığından bağımsızdır. Son popülasyon, fitness değerleri ve nesil
+    başına en iyi fitness döner.
+    """
+    global _worker_cache
+    params, island, generations = task
+    if _worker_cache is None and params['cache_size']:
+        _worker_cache = FitnessCache(_worker_evaluator, params['cache_size'])
+    evaluator = _worker_cache or _worker_evaluator
+    ga = GeneticAlgorithm(population_size=params['population_size'], mutation_rate=params['mutation_rate'],
+                          cache_size=0)
+    ga.population = island['population']
+    if island['rng'] is None:
+        random.seed(island['seed'])
+    else:
+        random.setstate(island['rng'])
+
+    # Elitizm en iyiyi koruduğundan nesil sonundaki en iyi, adanın şimdiye kadarki en iyisidir
+    history = []
+    fitness_scores = evaluator.evaluate(ga.population).tolist()
+    for _ in range(generations):
+        ga.population = ga.next_generation(fitness_scores)
+        fitness_scores = evaluator.evaluate(ga.population).tolist()
+        history.append(max(fitness_scores))
+    return dict(island, population=ga.population, scores=fitness_scores, history=history, rng=random.getstate())
 
 class GeneticAlgorithm:
-    def __init__(self, population_size: int = 50, mutation_rate: float = 0.1, generations: int = 100):
+    def __init__(self, population_size: int = 50, mutation_rate: float = 0.1, generations: int = 100,
+                 workers: int = None, cache_size: int = 0, encoding: str = "list"):
         self.population_size = population_size
         self.mutation_rate = mutation_rate
         self.generations = generations
+        # 1'den büyükse fitness değerlendirmesi bu kadar süreçte paralel yapılır
+        self.workers = workers
+        # Önbellekte tutulan en fazla birey sayısı; 0 (varsayılan) önbelleği kapatır. Vektörel
+        # değerlendirme ucuz olduğundan önbellek defteri tek süreçte isabetlerden pahalıya gelir
+        self.cache_size = cache_size
+        self.fitness_cache = None
+        # "list": liste listesi bireyler; "array": ArrayPopulation (dev tur + bölme noktaları)
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Bilinmeyen kodlama: {encoding}")
+        self.encoding = encoding
         self.population = []
         self.best_fitness_history = []
+        # Verilmeyen mesafe tablosu ve filo durumu girdileri değişene kadar yeniden kullanılır
+        self._matrix_cache = None
+        self._fleet_cache = None
+
+    def _scenario(self, drones, deliveries, distance_matrix: DistanceMatrix = None,
+                  fleet_state: FleetState = None) -> Tuple[DistanceMatrix, FleetState]:
+        """Verilmeyen DistanceMatrix ve FleetState; aynı girdilerle tekrar kurulmaz"""
+        if distance_matrix is None:
+            key = (tuple((id(drone), drone.id, tuple(drone.start_pos)) for drone in drones),
+                   tuple((id(delivery), delivery.id, tuple(delivery.pos)) for delivery in deliveries))
+            if self._matrix_cache is None or self._matrix_cache[0] != key:
+                self._matrix_cache = (key, DistanceMatrix(drones, deliveries))
+            distance_matrix = self._matrix_cache[1]
+        if fleet_state is None:
+            key = tuple((id(drone), drone.id, tuple(drone.current_pos), drone.time_minutes, drone.battery,
+                         tuple(drone.current_route), drone.deliveries_completed, drone.energy_consumed,
+                         drone.total_distance) for drone in drones)
+            if self._fleet_cache is None or self._fleet_cache[0] != key:
+                self._fleet_cache = (key, FleetState.from_drones(drones))
+            fleet_state = self._fleet_cache[1]
+        return distance_matrix, fleet_state
 
-    def calculate_fitness(self, routes: List[List[int]], drones, deliveries, no_fly_zones) -> float:
+    def calculate_fitness(self, routes: List[List[int]], drones, deliveries, no_fly_zones,
+                          distance_matrix: DistanceMatrix = None, fleet_state: FleetState = None) -> float:
         """
         İYİLEŞTİRİLMİŞ FITNESS FONKSIYONU
         Formül: (Teslimat sayısı × 100) - (Enerji × 0.5) - (Kural ihlali × 200)
+
+        Batarya ve konum fleet_state'ten okunur (verilmezse Drone nesnelerinden);
+        ilk bacak anlık görüntüdeki konumdan ölçülür.
         """
         completed_deliveries = 0
         total_energy = 0
         rule_violations = 0
         total_distance = 0
         no_fly_violations = 0
+        distance_matrix, fleet_state = self._scenario(drones, deliveries, distance_matrix, fleet_state)
+        # Tamamlanan teslimat kenarları biriktirilip tek seferde bölgelerle test edilir
+        segment_starts, segment_ends = [], []
 
         for drone_idx, route in enumerate(routes):
             if drone_idx >= len(drones) or not route:
                 continue
 
             drone = drones[drone_idx]
-            current_pos = drone.start_pos
+            drone_state = fleet_state.state(drone_idx)
+            # None: drone henüz anlık görüntüdeki konumunda
+            current_node = None
             current_weight = 0
             energy_consumed = 0
             route_distance = 0
@@ -46,29 +627,36 @@ class GeneticAlgorithm:
                     continue
 
                 # 2. MESAFE VE ENERJİ HESAPLAMA
-                distance = calculate_distance(current_pos, delivery.pos)
+                delivery_node = distance_matrix.delivery_node(delivery.id)
+                if current_node is None:
+                    distance = float(distance_matrix.block([drone_state.pos], [delivery.id])[0, 0])
+                else:
+                    distance = distance_matrix.node_distance(current_node, delivery_node)
                 route_distance += distance
                 
                 # Gelişmiş enerji modeli: Uzaklık × (1 + ağırlık faktörü)
                 energy_needed = distance * (1 + (current_weight + delivery.weight) * 0.1)
 
                 # 3. BATARYA KONTROLÜ
-                if energy_consumed + energy_needed <= drone.battery:
+                if energy_consumed + energy_needed <= drone_state.battery:
                     completed_deliveries += 1
                     current_weight += delivery.weight
                     energy_consumed += energy_needed
-                    current_pos = delivery.pos
+                    current_node = delivery_node
                     
                     # 4. NO-FLY ZONE KONTROLÜ
-                    for no_fly_zone in no_fly_zones:
-                        if no_fly_zone.does_path_intersect(drone.current_pos, delivery.pos):
-                            no_fly_violations += 1
+                    segment_starts.append(drone_state.pos)
+                    segment_ends.append(delivery.pos)
                 else:
                     rule_violations += 1
 
             total_energy += energy_consumed
             total_distance += route_distance
 
+        if segment_starts and no_fly_zones:
+            zone_index = ZoneIndex.for_zones(no_fly_zones)
+            no_fly_violations = int(zone_index.segment_hits(segment_starts, segment_ends).sum())
+
         # FİTNESS HESAPLAMA - İYİLEŞTİRİLMİŞ FORMÜL
         delivery_reward = completed_deliveries * 100
         energy_penalty = total_energy * 0.5
@@ -222,66 +810,250 @@ class GeneticAlgorithm:
                 end = random.randint(start + 1, len(route))
                 route[start:end] = reversed(route[start:end])
 
-    def optimize(self, drones, deliveries, no_fly_zones) -> Tuple[List[List[int]], float, List[float]]:
-        """GELİŞMİŞ GENETİK ALGORİTMA OPTİMİZASYONU"""
-        print(f"🧬 GA Parametreleri: Popülasyon={self.population_size}, Mutasyon={self.mutation_rate}, Nesil={self.generations}")
+    def _evolve_arrays(self, evaluator, num_drones: int, num_deliveries: int) -> Tuple[List[List[int]], float, List[float]]:
+        """optimize'ın dizi kodlamalı döngüsü
 
-        self.initialize_population(len(drones), len(deliveries))
-        self.best_fitness_history = []
+        İki ArrayPopulation tamponu dönüşümlü kullanılır: elitler ve çocuklar
+        doğrudan sonraki tampona yazılır, en iyi birey ayrı satırlara kopyalanır;
+        nesil başına birey nesnesi ve deepcopy yoktur. Rastgelelik küresel
+        random'dan tohumlanan numpy üretecinden gelir.
+        """
+        rng = np.random.default_rng(random.getrandbits(64))
+        size = self.population_size
+        current = ArrayPopulation.random(size, num_drones, num_deliveries, rng, smart_count=max(1, size // 5))
+        following = ArrayPopulation.empty(size, num_drones, num_deliveries)
+        best = ArrayPopulation.empty(1, num_drones, num_deliveries)
+        elite_count = min(max(1, size // 10), size)
+        children = size - elite_count
+        tournament_size = min(5, size)
 
-        best_individual = None
         best_fitness = -float('inf')
         stagnation_counter = 0
         max_stagnation = 20
 
         for generation in range(self.generations):
-            fitness_scores = []
-            for individual in self.population:
-                fitness = self.calculate_fitness(individual, drones, deliveries, no_fly_zones)
-                fitness_scores.append(fitness)
+            fitness_scores = np.asarray(evaluator.evaluate_packed(current.pack()))
 
-            current_max_fitness = max(fitness_scores)
-            
-            # En iyi bireyi güncelle
-            if current_max_fitness > best_fitness:
-                best_fitness = current_max_fitness
-                best_individual = copy.deepcopy(self.population[fitness_scores.index(current_max_fitness)])
+            top = int(np.argmax(fitness_scores))
+            if fitness_scores[top] > best_fitness:
+                best_fitness = float(fitness_scores[top])
+                best.copy_rows(current, np.array([top]))
                 stagnation_counter = 0
             else:
                 stagnation_counter += 1
 
             self.best_fitness_history.append(best_fitness)
 
-            # Progress raporu
             if generation % 20 == 0 or generation == self.generations - 1:
-                avg_fitness = np.mean(fitness_scores)
-                print(f"   Nesil {generation}: En iyi={best_fitness:.2f}, Ortalama={avg_fitness:.2f}")
+                print(f"   Nesil {generation}: En iyi={best_fitness:.2f}, Ortalama={np.mean(fitness_scores):.2f}")
 
-            # Erken durma - stagnation kontrolü
             if stagnation_counter >= max_stagnation:
                 print(f"   ⚡ Erken durma: {max_stagnation} nesil iyileşme yok")
                 break
 
-            # Yeni nesil oluştur
-            new_population = []
-            
-            # Elitizm - En iyi %10'u koru
-            elite_count = max(1, self.population_size // 10)
-            elite_indices = sorted(range(len(fitness_scores)), 
-                                 key=lambda i: fitness_scores[i], reverse=True)[:elite_count]
+            # Elitizm: en iyi %10 doğrudan kopyalanır
+            elite = np.argsort(-fitness_scores, kind="stable")[:elite_count]
+            following.copy_rows(current, elite)
+
+            # Turnuva seçimi (iadeli), çift çift OX ve yerinde mutasyon
+            if children:
+                pairs = (children + 1) // 2
+                entrants = rng.integers(0, size, (2 * pairs, tournament_size))
+                winners = entrants[np.arange(2 * pairs), np.argmax(fitness_scores[entrants], axis=1)]
+                first = np.concatenate((winners[0::2], winners[1::2]))[:children]
+                second = np.concatenate((winners[1::2], winners[0::2]))[:children]
+                following.order_crossover(current, first, second, begin=elite_count)
+                mutated = elite_count + np.flatnonzero(rng.random(children) < self.mutation_rate)
+                following.mutate(mutated, rng)
+
+            current, following = following, current
+
+        self.population = current.to_individuals()
+        return best.individual(0), best_fitness, self.best_fitness_history
+
+    def optimize_islands(self, drones, deliveries, no_fly_zones, islands: int = 4, migration_interval: int = 10,
+                         migration_size: int = 2, topology: str = "ring", distance_matrix: DistanceMatrix = None,
+                         fleet_state: FleetState = None) -> Tuple[List[List[int]], float, List[float]]:
+        """ADA MODELİ GENETİK ALGORİTMA
+
+        Her ada population_size bireylik ayrı bir popülasyondur ve süreç
+        havuzunda bağımsız evrilir (senaryo dizileri paylaşılan bellektedir).
+        Her migration_interval nesilde adaların en iyi migration_size bireyi
+        komşu adanın en kötülerinin yerine geçer: "ring" topolojisinde i -> i+1,
+        "random" topolojisinde rastgele başka bir ada. Erken durma, tüm
+        adaların en iyisi max_stagnation nesil iyileşmediğinde uygulanır.
+        """
+        if topology not in ISLAND_TOPOLOGIES:
+            raise ValueError(f"Bilinmeyen ada topolojisi: {topology}")
+        print(f"🧬 GA Ada Modeli: Ada={islands}, Popülasyon={self.population_size}, Mutasyon={self.mutation_rate}, "
+              f"Nesil={self.generations}, Migrasyon={migration_size}/{migration_interval} nesil ({topology})")
+
+        self.best_fitness_history = []
+        distance_matrix, fleet_state = self._scenario(drones, deliveries, distance_matrix, fleet_state)
+        evaluator = PopulationEvaluator(drones, deliveries, no_fly_zones, distance_matrix, fleet_state)
+
+        # Adaların ilk popülasyonları ve tohumları ana süreçte, küresel random'dan
+        states = []
+        for _ in range(islands):
+            self.initialize_population(len(drones), len(deliveries))
+            states.append({'population': self.population, 'seed': random.getrandbits(64), 'rng': None})
+        params = {'population_size': self.population_size, 'mutation_rate': self.mutation_rate,
+                  'cache_size': self.cache_size}
+
+        best_individual = None
+        best_fitness = -float('inf')
+        stagnation_counter = 0
+        max_stagnation = 20
+        blocks, spec = publish(evaluator.arrays())
+        try:
+            with ProcessPoolExecutor(max_workers=min(islands, self.workers or os.cpu_count() or 1),
+                                     initializer=_attach_evaluator, initargs=(spec,)) as pool:
+                generation = 0
+                while generation < self.generations:
+                    steps = min(migration_interval, self.generations - generation)
+                    states = list(pool.map(_evolve_island, [(params, state, steps) for state in states]))
+
+                    # Nesil bazında tüm adaların en iyisi
+                    for step in range(steps):
+                        epoch_best = max(state['history'][step] for state in states)
+                        if epoch_best > best_fitness:
+                            best_fitness = epoch_best
+                            stagnation_counter = 0
+                        else:
+                            stagnation_counter += 1
+                        self.best_fitness_history.append(best_fitness)
+                    top_state = max(states, key=lambda state: max(state['scores']))
+                    best_fitness = max(top_state['scores'])
+                    best_individual = copy.deepcopy(top_state['population'][top_state['scores'].index(best_fitness)])
+                    generation += steps
+
+                    avg_fitness = np.mean([score for state in states for score in state['scores']])
+                    print(f"   Nesil {generation}: En iyi={best_fitness:.2f}, Ortalama={avg_fitness:.2f}")
+                    if stagnation_counter >= max_stagnation:
+                        print(f"   ⚡ Erken durma: {max_stagnation} nesil iyileşme yok")
+                        break
+                    if generation < self.generations:
+                        self._migrate(states, migration_size, topology)
+        finally:
+            release(blocks, unlink=True)
+
+        self.population = [individual for state in states for individual in state['population']]
+        return best_individual, best_fitness, self.best_fitness_history
+
+    @staticmethod
+    def _migrate(states: List[Dict], migration_size: int, topology: str):
+        """Adaların en iyi bireylerini hedef adaların en kötülerinin yerine kopyala"""
+        n = len(states)
+        if n < 2 or migration_size <= 0:
+            return
+        if topology == "ring":
+            targets = [(i + 1) % n for i in range(n)]
+        else:
+            targets = [random.choice([j for j in range(n) if j != i]) for i in range(n)]
+
+        # Göçmenler migrasyondan önceki popülasyonlardan seçilir
+        emigrants = []
+        for state in states:
+            ranked = sorted(range(len(state['scores'])), key=lambda i: state['scores'][i], reverse=True)
+            emigrants.append([(copy.deepcopy(state['population'][i]), state['scores'][i])
+                              for i in ranked[:migration_size]])
+        for source, target in enumerate(targets):
+            state = states[target]
+            worst = sorted(range(len(state['scores'])), key=lambda i: state['scores'][i])[:migration_size]
+            for i, (individual, score) in zip(worst, emigrants[source]):
+                state['population'][i] = individual
+                state['scores'][i] = score
+
+    def next_generation(self, fitness_scores: List[float]) -> List[List[List[int]]]:
+        """Elitizm, seçim, çaprazlama ve mutasyonla sonraki nesil"""
+        new_population = []
+
+        # Elitizm - En iyi %10'u koru
+        elite_count = max(1, self.population_size // 10)
+        elite_indices = sorted(range(len(fitness_scores)), 
+                             key=lambda i: fitness_scores[i], reverse=True)[:elite_count]
+
+        for idx in elite_indices:
+            new_population.append(copy.deepcopy(self.population[idx]))
+
+        # Kalan popülasyonu crossover ve mutasyon ile oluştur
+        while len(new_population) < self.population_size:
+            parent1, parent2 = self.selection(fitness_scores)
+            child1, child2 = self.crossover(parent1, parent2)
+
+            self.mutate(child1)
+            self.mutate(child2)
+
+            new_population.extend([child1, child2])
+
+        return new_population[:self.population_size]
+
+    def optimize(self, drones, deliveries, no_fly_zones, distance_matrix: DistanceMatrix = None,
+                 fleet_state: FleetState = None, cost_source=None) -> Tuple[List[List[int]], float, List[float]]:
+        """GELİŞMİŞ GENETİK ALGORİTMA OPTİMİZASYONU
+
+        cost_source bir AStar ise ve distance_matrix verilmemişse mesafeler yasak
+        bölgeleri dolaşan yol uzunluklarıdır (DistanceMatrix.obstacle_aware).
+        """
+        print(f"🧬 GA Parametreleri: Popülasyon={self.population_size}, Mutasyon={self.mutation_rate}, Nesil={self.generations}")
+
+        if self.encoding == "list":
+            self.initialize_population(len(drones), len(deliveries))
+        self.best_fitness_history = []
+        # Mesafeler tüm nesiller boyunca tek tablodan okunur
+        if distance_matrix is None and cost_source is not None:
+            distance_matrix = DistanceMatrix.obstacle_aware(drones, deliveries, cost_source)
+        # Dronlar değiştirilmez; tüm bireyler aynı başlangıç durumundan değerlendirilir
+        distance_matrix, fleet_state = self._scenario(drones, deliveries, distance_matrix, fleet_state)
+        evaluator = PopulationEvaluator(drones, deliveries, no_fly_zones, distance_matrix, fleet_state)
+        parallel = None
+        if self.workers and self.workers > 1:
+            evaluator = parallel = ParallelEvaluator(evaluator, self.workers)
+        self.fitness_cache = None
+        # Dizi kodlaması paketli dizileri doğrudan değerlendirir; demet anahtarlar birey nesnesi üretirdi
+        if self.cache_size and self.encoding == "list":
+            evaluator = self.fitness_cache = FitnessCache(evaluator, self.cache_size)
+
+        best_individual = None
+        best_fitness = -float('inf')
+        stagnation_counter = 0
+        max_stagnation = 20
+
+        try:
+            if self.encoding == "array":
+                return self._evolve_arrays(evaluator, len(drones), len(deliveries))
+            for generation in range(self.generations):
+                # Tüm popülasyon tek vektörel geçişte (calculate_fitness ile aynı değerler)
+                fitness_scores = evaluator.evaluate(self.population).tolist()
+
+                current_max_fitness = max(fitness_scores)
             
-            for idx in elite_indices:
-                new_population.append(copy.deepcopy(self.population[idx]))
+                # En iyi bireyi güncelle
+                if current_max_fitness > best_fitness:
+                    best_fitness = current_max_fitness
+                    best_individual = copy.deepcopy(self.population[fitness_scores.index(current_max_fitness)])
+                    stagnation_counter = 0
+                else:
+                    stagnation_counter += 1
 
-            # Kalan popülasyonu crossover ve mutasyon ile oluştur
-            while len(new_population) < self.population_size:
-                parent1, parent2 = self.selection(fitness_scores)
-                child1, child2 = self.crossover(parent1, parent2)
-                
-                self.mutate(child1)
-                self.mutate(child2)
-                
-                new_population.extend([child1, child2])
+                self.best_fitness_history.append(best_fitness)
+
+                # Progress raporu
+                if generation % 20 == 0 or generation == self.generations - 1:
+                    avg_fitness = np.mean(fitness_scores)
+                    print(f"   Nesil {generation}: En iyi={best_fitness:.2f}, Ortalama={avg_fitness:.2f}")
+                    if self.fitness_cache is not None:
+                        print(f"   Önbellek isabeti: birey=%{self.fitness_cache.hit_rate * 100:.1f}, "
+                              f"rota=%{self.fitness_cache.route_hit_rate * 100:.1f}")
+
+                # Erken durma - stagnation kontrolü
+                if stagnation_counter >= max_stagnation:
+                    print(f"   ⚡ Erken durma: {max_stagnation} nesil iyileşme yok")
+                    break
 
-            self.population = new_population[:self.population_size]
-            return best_individual, best_fitness, self.best_fitness_history
\ No newline at end of file
+                # Yeni nesil oluştur
+                self.population = self.next_generation(fitness_scores)
+            return best_individual, best_fitness, self.best_fitness_history
+        finally:
+            if parallel is not None:
+                parallel.close()
\ No newline at end of file
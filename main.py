@@ -13,8 +13,9 @@ from algorithms.a_star import AStar
 from algorithms import genetic
 from visualization.plot_map import plot_routes
 from utils.performance_metrics import PerformanceMetrics
+from utils.distance_matrix import DistanceMatrix
+from models.fleet_state import FleetState
 import time
-import numpy as np
 
 from algorithms.csp import CSPSolver
 
@@ -49,10 +50,12 @@ class DroneVisualization:
                 if len(route) > 3:
                     print(f"   └── ... ve {len(route)-3} teslimat daha")
 
-def calculate_energy_consumption(routes, drones, deliveries):
+def calculate_energy_consumption(routes, drones, deliveries, distance_matrix=None):
     """Geliştirilmiş enerji tüketimi hesaplama"""
     if not routes or not drones or not deliveries:
         return 0.0
+    if distance_matrix is None:
+        distance_matrix = DistanceMatrix(drones, deliveries)
     
     total_energy = 0
     active_drones = 0
@@ -62,15 +65,15 @@ def calculate_energy_consumption(routes, drones, deliveries):
             continue
             
         drone = drones[drone_idx]
-        current_pos = drone.start_pos
+        current_node = distance_matrix.drone_node(drone.id)
         drone_energy = 0
         
         for delivery_id in route:
             if delivery_id < len(deliveries):
                 delivery = deliveries[delivery_id]
                 # Mesafe hesaplama
-                distance = np.sqrt((delivery.pos[0] - current_pos[0])**2 + 
-                                 (delivery.pos[1] - current_pos[1])**2)
+                delivery_node = distance_matrix.delivery_node(delivery.id)
+                distance = distance_matrix.node_distance(current_node, delivery_node)
                 
                 # Enerji hesaplama: mesafe + ağırlık faktörü + hız faktörü
                 base_energy = distance * (drone.speed / 10)  # Hız faktörü
@@ -78,7 +81,7 @@ def calculate_energy_consumption(routes, drones, deliveries):
                 energy = base_energy * (1 + weight_penalty)
                 
                 drone_energy += energy
-                current_pos = delivery.pos
+                current_node = delivery_node
         
         if drone_energy > 0:
             total_energy += drone_energy
@@ -145,12 +148,19 @@ def run_test_scenario(scenario_name, num_drones=None, num_deliveries=None, num_n
         
         print(f"✅ {len(drones)} drone, {len(deliveries)} teslimat, {len(no_fly_zones)} yasak bölge hazır")
 
+        # Tüm algoritmalar aynı mesafe tablosunu ve aynı başlangıç durumunu kullanır
+        distance_matrix = DistanceMatrix(drones, deliveries)
+        fleet_state = FleetState.from_drones(drones)
+        csp_state = None
+
         # CSP Algoritması
         print(f"\n🧩 CSP ile teslimat ataması yapılıyor...")
         start_time = time.time()
         try:
             csp_solver = CSPSolver()
-            assignments = csp_solver.solve(drones, deliveries, no_fly_zones)
+            assignments = csp_solver.solve(drones, deliveries, no_fly_zones, distance_matrix,
+                                           fleet_state=fleet_state, commit=False)
+            csp_state = csp_solver.state
             csp_time = time.time() - start_time
             print(f"⏱️ CSP süresi: {csp_time:.3f} saniye")
         except Exception as e:
@@ -167,7 +177,7 @@ def run_test_scenario(scenario_name, num_drones=None, num_deliveries=None, num_n
             for i, drone in enumerate(drones):
                 if i < len(deliveries):
                     delivery = deliveries[i]
-                    route = astar.find_path(drone.current_pos, delivery.pos, current_time="12:00")
+                    route = astar.find_path(fleet_state.state(i).pos, delivery.pos, current_time="12:00")
                     astar_routes.append(route if route else [])
                 else:
                     astar_routes.append([])
@@ -194,7 +204,8 @@ def run_test_scenario(scenario_name, num_drones=None, num_deliveries=None, num_n
                 generations=ga_params['generations']
             )
             
-            best_routes, best_fitness, fitness_history = ga.optimize(drones, deliveries, no_fly_zones)
+            best_routes, best_fitness, fitness_history = ga.optimize(drones, deliveries, no_fly_zones, distance_matrix,
+                                                                     fleet_state)
             ga_time = time.time() - start_time
             print(f"⏱️ GA süresi: {ga_time:.3f} saniye")
             print(f"🎯 En iyi fitness: {best_fitness:.2f}")
@@ -208,7 +219,7 @@ def run_test_scenario(scenario_name, num_drones=None, num_deliveries=None, num_n
         total_deliveries = len(deliveries)
         completed_deliveries = sum(len(route) for route in best_routes) if best_routes else 0
         completion_rate = (completed_deliveries / total_deliveries) * 100 if total_deliveries > 0 else 0
-        avg_energy = calculate_energy_consumption(best_routes, drones, deliveries)
+        avg_energy = calculate_energy_consumption(best_routes, drones, deliveries, distance_matrix)
         total_time = csp_time + astar_time + ga_time
         
         # Ağırlık verimliliği hesapla
@@ -233,6 +244,10 @@ def run_test_scenario(scenario_name, num_drones=None, num_deliveries=None, num_n
             print(f"A* Süresi: {astar_time:.3f}s ({(astar_time/total_time)*100:.1f}%)")
             print(f"GA Süresi: {ga_time:.3f}s ({(ga_time/total_time)*100:.1f}%)")
 
+        # CSP sonucu yalnızca raporlama için model nesnelerine yazılır
+        if csp_state is not None:
+            csp_state.apply_to(drones, deliveries)
+
         # Görselleştirme
         print(f"\n🗺️ Sonuçlar görselleştiriliyor...")
         try:
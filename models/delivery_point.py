@@ -1,6 +1,6 @@
 import heapq
 from typing import Tuple, List
-from utils.time_utils import is_time_in_range
+from utils.time_utils import TimeWindow, TimeValue, time_to_minutes
 
 class DeliveryPoint:
     def __init__(self, id: int, pos: Tuple[float, float], weight: float, priority: int, time_window: Tuple[str, str]):
@@ -19,8 +19,17 @@ class DeliveryPoint:
         self.assigned_to = None
         self.delivery_time = None
 
-    def is_in_time_window(self, current_time_str: str) -> bool:
-        return is_time_in_range(current_time_str, self.time_window)
+    @property
+    def time_window(self) -> Tuple[str, str]:
+        return self._time_window
+
+    @time_window.setter
+    def time_window(self, time_window: Tuple[str, str]):
+        self._time_window = time_window
+        self.window = TimeWindow.parse(time_window)
+
+    def is_in_time_window(self, current_time_str: TimeValue) -> bool:
+        return self.window.contains(time_to_minutes(current_time_str))
     
     def __lt__(self, other):
         """Min-Heap için karşılaştırma (yüksek öncelik = düşük sayı)"""
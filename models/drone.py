@@ -1,7 +1,12 @@
 from datetime import datetime, timedelta
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 from utils.geometry import calculate_distance
-from utils.time_utils import is_time_in_range
+from models.fleet_state import DroneState
+from utils.spatial_index import ZoneIndex
+from utils.time_utils import time_to_minutes, minutes_to_time, DAY_MINUTES
+
+# datetime uyumluluk özelliklerinin referans günü (strptime varsayılanı)
+_EPOCH = datetime(1900, 1, 1)
 
 class Drone:
     def __init__(self, id: int, max_weight: float, battery: int, speed: float, start_pos: Tuple[float, float]):
@@ -11,9 +16,12 @@ class Drone:
         self.initial_battery = battery
         self.speed = speed
         self.start_pos = start_pos
+        # Konum değişince çağrılır (ör. DroneLocator); listener(drone)
+        self._position_listeners = []
         self.current_pos = start_pos
-        self.current_time = datetime.strptime("09:00", "%H:%M")
-        self.available_time = self.current_time
+        # Zaman gün içi dakika olarak tutulur; dizge/datetime yalnızca dış arayüzde
+        self.time_minutes = time_to_minutes("09:00")
+        self.available_minutes = self.time_minutes
         self.energy_consumed = 0
         self.deliveries_completed = 0
         self.current_route = []
@@ -29,8 +37,8 @@ class Drone:
 
     def reset(self):
         self.current_pos = self.start_pos
-        self.current_time = datetime.strptime("09:00", "%H:%M")
-        self.available_time = self.current_time
+        self.time_minutes = time_to_minutes("09:00")
+        self.available_minutes = self.time_minutes
         self.battery = self.initial_battery
         self.energy_consumed = 0
         self.deliveries_completed = 0
@@ -40,6 +48,48 @@ class Drone:
         self.is_charging = False
         self.charge_start_time = None
 
+    @property
+    def current_pos(self) -> Tuple[float, float]:
+        return self._current_pos
+
+    @current_pos.setter
+    def current_pos(self, pos: Tuple[float, float]):
+        self._current_pos = pos
+        for listener in self._position_listeners:
+            listener(self)
+
+    def add_position_listener(self, listener):
+        self._position_listeners.append(listener)
+
+    def remove_position_listener(self, listener):
+        if listener in self._position_listeners:
+            self._position_listeners.remove(listener)
+
+    @property
+    def current_minute(self) -> int:
+        """Gün içi tam dakika (strftime("%H:%M") ile aynı kesme ve sarma)"""
+        return int(self.time_minutes) % DAY_MINUTES
+
+    @property
+    def current_time_str(self) -> str:
+        return minutes_to_time(self.time_minutes)
+
+    @property
+    def current_time(self) -> datetime:
+        return _EPOCH + timedelta(minutes=self.time_minutes)
+
+    @current_time.setter
+    def current_time(self, value: datetime):
+        self.time_minutes = (value - _EPOCH).total_seconds() / 60
+
+    @property
+    def available_time(self) -> datetime:
+        return _EPOCH + timedelta(minutes=self.available_minutes)
+
+    @available_time.setter
+    def available_time(self, value: datetime):
+        self.available_minutes = (value - _EPOCH).total_seconds() / 60
+
     def can_carry(self, weight: float) -> bool:
         return weight <= self.max_weight
 
@@ -65,23 +115,23 @@ class Drone:
         """Şarj başlat - EKSİK OLAN ÖZELLIK"""
         if not self.is_charging:
             self.is_charging = True
-            self.charge_start_time = self.current_time
+            self.charge_start_time = self.time_minutes
             # Şarj istasyonuna git
             if self.current_pos != self.charging_station_pos:
                 travel_distance = calculate_distance(self.current_pos, self.charging_station_pos)
                 travel_time = (travel_distance / self.speed) * 60  # Dakika
-                self.current_time += timedelta(minutes=travel_time)
+                self.time_minutes += travel_time
                 self.current_pos = self.charging_station_pos
 
     def complete_charging(self, target_battery: int = None):
         """Şarjı tamamla - EKSİK OLAN ÖZELLIK"""
-        if self.is_charging and self.charge_start_time:
+        if self.is_charging and self.charge_start_time is not None:
             if target_battery is None:
                 target_battery = self.initial_battery
             
             charging_time = self.calculate_charging_time(target_battery)
-            self.current_time += timedelta(minutes=charging_time)
-            self.available_time = self.current_time
+            self.time_minutes += charging_time
+            self.available_minutes = self.time_minutes
             self.battery = target_battery
             self.is_charging = False
             self.charge_start_time = None
@@ -112,11 +162,11 @@ class Drone:
         from models.no_fly_zone import NoFlyZone
         path_distance = calculate_distance(self.current_pos, dest_pos)
         energy_needed = self.calculate_energy_consumption(path_distance, weight)
-        current_time_str = self.current_time.strftime("%H:%M")
+        current_minute = self.current_minute
         
         # No-fly zone kontrolü
-        for nfz in no_fly_zones:
-            if nfz.is_active(current_time_str) and nfz.does_path_intersect(self.current_pos, dest_pos):
+        for nfz in ZoneIndex.for_zones(no_fly_zones).query_segment(self.current_pos, dest_pos, current_minute):
+            if nfz.does_path_intersect(self.current_pos, dest_pos):
                 return False
         
         # Batarya kontrolü (şarj seçeneği ile)
@@ -148,10 +198,26 @@ class Drone:
         self.energy_consumed += energy
         self.total_distance += path_distance
         travel_time_minutes = (path_distance / self.speed) * 60  # Saatte km -> dakikaya çevir
-        self.current_time += timedelta(minutes=travel_time_minutes + 2)  # +2 dk teslimat süresi
-        self.available_time = self.current_time
+        self.time_minutes += travel_time_minutes + 2  # +2 dk teslimat süresi
+        self.available_minutes = self.time_minutes
         return True
 
+    def simulate_move(self, state: DroneState, dest_pos: Tuple[float, float], weight: float,
+                      distance_fn=calculate_distance) -> Optional[DroneState]:
+        """move_to ile aynı kurallarla hareketin sonucu; drone değişmez (başarısızsa None)"""
+        pos, minutes, battery = state
+        path_distance = distance_fn(pos, dest_pos)
+        energy = self.calculate_energy_consumption(path_distance, weight)
+        if energy > battery and battery <= self.min_battery_threshold:
+            # Şarj istasyonuna gidip tam şarj
+            if pos != self.charging_station_pos:
+                minutes += (distance_fn(pos, self.charging_station_pos) / self.speed) * 60
+            minutes += int(max(0, (self.initial_battery - battery) / self.charge_rate))
+            battery = self.initial_battery
+        if energy > battery:
+            return None
+        return DroneState(dest_pos, minutes + ((path_distance / self.speed) * 60 + 2), battery - energy)
+
     def add_to_route(self, delivery_point_id: int):
         self.current_route.append(delivery_point_id)
 
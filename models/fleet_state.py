@@ -0,0 +1,116 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from utils.geometry import calculate_distance
+from utils.time_utils import minutes_to_time
+
+class DroneState(NamedTuple):
+    """Bir drone'un hareketle değişen durumu"""
+    pos: Tuple[float, float]
+    minutes: float
+    battery: float
+
+class DroneRecord(NamedTuple):
+    """Filo durumunda bir drone'un kaydı (toplamlar Drone alanlarıyla aynı anlamda)"""
+    state: DroneState
+    route: Tuple[int, ...] = ()
+    # Teslim dakikaları; durum kurulmadan önceki teslimatlar için None
+    delivery_minutes: Tuple[Optional[float], ...] = ()
+    completed: int = 0
+    energy: float = 0.0
+    distance: float = 0.0
+
+class FleetState:
+    """Model nesnelerini değiştirmeden çözücülerin üzerinde çalıştığı filo durumu
+
+    Değişmezdir: her hareket yalnızca ilgili drone'un kaydını değiştiren yeni
+    bir FleetState döndürür, diğer kayıtlar paylaşılır. Anlık görüntü nesnenin
+    kendisidir (O(1)); geri dönmek için eski referans kullanılır. Sonuç
+    apply_to ile Drone ve DeliveryPoint nesnelerine yazılır.
+    """
+
+    __slots__ = ('drone_ids', 'records', '_delivered')
+
+    def __init__(self, drone_ids, records):
+        self.drone_ids = tuple(drone_ids)
+        self.records = tuple(records)
+        self._delivered = None
+
+    @classmethod
+    def from_drones(cls, drones) -> 'FleetState':
+        return cls((drone.id for drone in drones),
+                   (DroneRecord(DroneState(drone.current_pos, drone.time_minutes, drone.battery),
+                                tuple(drone.current_route), (None,) * len(drone.current_route),
+                                drone.deliveries_completed, drone.energy_consumed, drone.total_distance)
+                    for drone in drones))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def state(self, k: int) -> DroneState:
+        return self.records[k].state
+
+    @property
+    def states(self) -> List[DroneState]:
+        return [record.state for record in self.records]
+
+    @property
+    def delivered(self) -> frozenset:
+        """Bu durumda teslim edilmiş teslimat id'leri"""
+        if self._delivered is None:
+            self._delivered = frozenset(delivery_id for record in self.records
+                                        for delivery_id, minute in zip(record.route, record.delivery_minutes)
+                                        if minute is not None)
+        return self._delivered
+
+    def snapshot(self) -> 'FleetState':
+        return self
+
+    def _replace(self, k: int, record: DroneRecord) -> 'FleetState':
+        records = list(self.records)
+        records[k] = record
+        return FleetState(self.drone_ids, records)
+
+    def with_state(self, k: int, state: DroneState) -> 'FleetState':
+        """Drone k'nin konum/saat/bataryasını değiştir (ör. gerçek telemetri)"""
+        return self._replace(k, self.records[k]._replace(state=state))
+
+    def move(self, k: int, drone, delivery, distance_fn=calculate_distance) -> Optional['FleetState']:
+        """Drone.move_to ile aynı teslimat hareketi; başarısızsa None"""
+        record = self.records[k]
+        new_state = drone.simulate_move(record.state, delivery.pos, delivery.weight, distance_fn)
+        if new_state is None:
+            return None
+        distance = distance_fn(record.state.pos, delivery.pos)
+        return self._replace(k, DroneRecord(new_state, record.route + (delivery.id,),
+                                            record.delivery_minutes + (new_state.minutes,),
+                                            record.completed + 1,
+                                            record.energy + drone.calculate_energy_consumption(distance, delivery.weight),
+                                            record.distance + distance))
+
+    def assignments(self, since: 'FleetState' = None) -> Dict[int, List[int]]:
+        """Drone id -> teslimat id'leri; since verilirse yalnızca ondan sonra eklenenler"""
+        result = {}
+        for k, (drone_id, record) in enumerate(zip(self.drone_ids, self.records)):
+            start = len(since.records[k].route) if since is not None else 0
+            if len(record.route) > start:
+                result[drone_id] = list(record.route[start:])
+        return result
+
+    def apply_to(self, drones, deliveries=()):
+        """Durumu model nesnelerine yaz"""
+        by_id = {delivery.id: delivery for delivery in deliveries}
+        for drone, record in zip(drones, self.records):
+            drone.current_pos, drone.time_minutes, drone.battery = record.state
+            drone.available_minutes = drone.time_minutes
+            drone.current_route = list(record.route)
+            drone.deliveries_completed = record.completed
+            drone.energy_consumed = record.energy
+            drone.total_distance = record.distance
+            drone.is_charging = False
+            drone.charge_start_time = None
+            for delivery_id, minute in zip(record.route, record.delivery_minutes):
+                delivery = by_id.get(delivery_id)
+                if minute is None or delivery is None:
+                    continue
+                delivery.delivered = True
+                delivery.assigned_to = drone.id
+                delivery.delivery_time = minutes_to_time(minute)
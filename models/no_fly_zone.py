@@ -1,6 +1,9 @@
 from typing import List, Tuple
-from utils.time_utils import is_time_in_range
-from utils.geometry import point_in_polygon, does_path_intersect_polygon
+import numpy as np
+from utils.time_utils import TimeWindow, TimeValue, time_to_minutes
+from utils.geometry import (point_in_polygon, does_path_intersect_edges, polygon_edges, polygon_bbox,
+                            polygon_centroid, polygon_signed_area, polygon_is_simple, polygon_is_convex,
+                            point_in_convex_polygon, segment_touches_convex_polygon)
 
 class NoFlyZone:
     def __init__(self, id: int, coordinates: List[Tuple[float, float]], active_time: Tuple[str, str]):
@@ -8,11 +11,56 @@ class NoFlyZone:
         self.coordinates = coordinates
         self.active_time = active_time
 
-    def is_active(self, current_time_str: str) -> bool:
-        return is_time_in_range(current_time_str, self.active_time)
+    @property
+    def coordinates(self) -> List[Tuple[float, float]]:
+        return self._coordinates
+
+    @coordinates.setter
+    def coordinates(self, coordinates: List[Tuple[float, float]]):
+        """Koordinatlar değişince geometri bir kez yeniden derlenir"""
+        self._coordinates = coordinates
+        points = [tuple(point) for point in coordinates]
+        self.edges = polygon_edges(points)
+        self.edge_starts = np.asarray([start for start, _ in self.edges], dtype=float).reshape(-1, 2)
+        self.edge_ends = np.asarray([end for _, end in self.edges], dtype=float).reshape(-1, 2)
+        self.bbox = polygon_bbox(points) if points else None
+        self.centroid = polygon_centroid(points) if points else None
+        self.is_simple = len(points) < 4 or polygon_is_simple(points)
+        self.is_convex = polygon_is_convex(points)
+        # Dışbükey hızlı yollar saat yönü tersi sıralama bekler
+        self._convex_ring = (points if polygon_signed_area(points) > 0 else points[::-1]) if self.is_convex else None
+
+    @property
+    def active_time(self) -> Tuple[str, str]:
+        return self._active_time
+
+    @active_time.setter
+    def active_time(self, active_time: Tuple[str, str]):
+        self._active_time = active_time
+        self.active_window = TimeWindow.parse(active_time)
+
+    def is_active(self, current_time_str: TimeValue) -> bool:
+        return self.active_window.contains(time_to_minutes(current_time_str))
+
+    def _outside_bbox(self, min_x: float, min_y: float, max_x: float, max_y: float) -> bool:
+        return (self.bbox is None or max_x < self.bbox[0] or min_x > self.bbox[2] or
+                max_y < self.bbox[1] or min_y > self.bbox[3])
 
     def is_point_inside(self, point: Tuple[float, float]) -> bool:
-        return point_in_polygon(point, self.coordinates)
+        if self._outside_bbox(point[0], point[1], point[0], point[1]):
+            return False
+        if self._convex_ring is not None:
+            inside = point_in_convex_polygon(point, self._convex_ring)
+            if inside is not None:
+                return inside
+        return point_in_polygon(point, self._coordinates)
 
     def does_path_intersect(self, start: Tuple[float, float], end: Tuple[float, float]) -> bool:
-        return does_path_intersect_polygon(start, end, self.coordinates)
+        if self._outside_bbox(min(start[0], end[0]), min(start[1], end[1]),
+                              max(start[0], end[0]), max(start[1], end[1])):
+            return False
+        if self._convex_ring is not None:
+            touches = segment_touches_convex_polygon(start, end, self._convex_ring)
+            if touches is not None:
+                return touches
+        return does_path_intersect_edges(start, end, self.edges)
@@ -1,6 +1,26 @@
+import inspect
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+import numpy as np
 from utils.data_generator import DataGenerator
-from algorithms.csp import CSP
-from algorithms.genetic import GeneticAlgorithm
+from algorithms.csp import CSP, CSPSolver, IncrementalCSP, CSPConstraints, FeasibilityMatrix, BacktrackingSearch
+from algorithms.genetic import GeneticAlgorithm, PopulationEvaluator, ParallelEvaluator, FitnessCache, ArrayPopulation
+from algorithms.a_star import AStar, HierarchicalAStar
+from models.drone import Drone
+from models.delivery_point import DeliveryPoint
+from models.fleet_state import FleetState
+from models.no_fly_zone import NoFlyZone
+from utils.geometry import calculate_distance, does_path_intersect_polygon, point_in_polygon, segments_intersect_polygons
+from utils.assignment import linear_assignment, auction_assignment
+from utils.drone_locator import DroneLocator
+from utils.distance_matrix import DistanceMatrix
+from utils.spatial_index import ZoneIndex
+from utils.time_utils import time_to_minutes, minutes_to_time, is_time_in_range
+from utils.zone_timeline import ZoneTimeline
 
 def test_csp():
     drones = DataGenerator.generate_drones(3)
@@ -12,6 +32,73 @@ def test_csp():
     for d in deliveries:
         print(f"Teslimat {d.id}: Drone {d.assigned_to}, Teslimat zamanı: {d.delivery_time}")
 
+def test_csp_backtracking():
+    # Arama, aynı veride açgözlü atamadan daha az teslimat bırakmamalı
+    greedy_data = DataGenerator.load_predefined_dataset(validate=False)
+    search_data = DataGenerator.load_predefined_dataset(validate=False)
+    greedy = CSP(greedy_data['drones'], greedy_data['deliveries']).assign_deliveries(greedy_data['no_fly_zones'])
+    planner = CSP(search_data['drones'], search_data['deliveries'])
+    result = planner.assign_deliveries(search_data['no_fly_zones'], method="backtracking")
+
+    served = sum(len(ids) for ids in result.values())
+    print("Açgözlü:", sum(len(ids) for ids in greedy.values()), "Geri izleme:", served, planner.search.stats)
+    assert served >= sum(len(ids) for ids in greedy.values())
+    assert served == sum(1 for d in search_data['deliveries'] if d.delivered)
+
+def test_csp_incremental():
+    # Değişiklikler dronlara dokunmamalı; commit() güncel planı aynen uygulamalı
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries = data['drones'], data['deliveries']
+    planner = IncrementalCSP(drones, deliveries, data['no_fly_zones'], max_nodes=3000)
+    cancelled = next(route[0] for route in planner.routes if route)
+    planner.cancel_delivery(cancelled)
+    planner.update_drone_state(drones[0].id, minutes=drones[0].time_minutes + 60)
+
+    plan = planner.assignments()
+    print("Artımlı CSP:", plan, planner.stats)
+    assert all(cancelled not in ids for ids in plan.values())
+    assert all(drone.deliveries_completed == 0 for drone in drones)
+    assert planner.commit() == plan
+
+def test_fleet_state():
+    # commit=False dronlara dokunmamalı; aynı başlangıç durumundan tekrar çözüm aynı olmalı
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries = data['drones'], data['deliveries']
+    planner = CSP(drones, deliveries)
+    first = planner.assign_deliveries(data['no_fly_zones'], commit=False)
+    second = CSP(drones, deliveries, fleet_state=planner.initial_state).assign_deliveries(data['no_fly_zones'],
+                                                                                         commit=False)
+    print("FleetState atamaları:", first)
+    assert first == second and first == planner.state.assignments(since=planner.initial_state)
+    assert all(drone.deliveries_completed == 0 for drone in drones)
+    assert not any(delivery.delivered for delivery in deliveries)
+
+    planner.state.apply_to(drones, deliveries)
+    assert sum(drone.deliveries_completed for drone in drones) == sum(len(ids) for ids in first.values())
+
+def test_matching():
+    # Macar yöntemi ve açık artırma aynı en düşük maliyeti bulmalı; sonsuz hücre eşleşmez
+    inf = float('inf')
+    cost = [[4, 1, 3, inf],
+            [2, 0, 5, 3],
+            [3, 2, 2, inf]]
+    for solver in (linear_assignment, auction_assignment):
+        rows, cols = solver(cost)
+        total = sum(cost[r][c] for r, c in zip(rows, cols))
+        print(solver.__name__, list(zip(rows.tolist(), cols.tolist())), total)
+        assert len(rows) == 3 and total == 5
+
+def test_drone_locator():
+    # En yakın dronlar kaba kuvvetle aynı olmalı; move_to sonrası indeks güncellenmeli
+    drones = DataGenerator.generate_drones(50)
+    with DroneLocator(drones) as locator:
+        drones[0].move_to((50, 50), 0)
+        nearest = locator.nearest((50, 50), 5)
+        brute = sorted(range(len(drones)), key=lambda k: (((drones[k].current_pos[0] - 50) ** 2 +
+                                                           (drones[k].current_pos[1] - 50) ** 2) ** 0.5, k))[:5]
+        print("En yakın dronlar:", nearest)
+        assert nearest[0] == 0 and nearest == brute
+
 def test_genetic():
     deliveries = DataGenerator.generate_delivery_points(10)
     ga = GeneticAlgorithm(deliveries)
@@ -20,9 +107,616 @@ def test_genetic():
     print("Genetik Algoritma Sıralaması (teslimat ID'leri):")
     print(best_sequence)
 
+def test_population_evaluator():
+    # Vektörel değerlendirme calculate_fitness ile birebir aynı olmalı
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    ga = GeneticAlgorithm(population_size=20)
+    ga.initialize_population(len(drones), len(deliveries))
+    ga.population.append([[0, 1, 2]] + [[] for _ in drones[1:]])
+
+    scores = PopulationEvaluator(drones, deliveries, zones).evaluate(ga.population).tolist()
+    expected = [ga.calculate_fitness(individual, drones, deliveries, zones) for individual in ga.population]
+    print("Vektörel fitness:", scores[-3:])
+    assert scores == expected
+
+def test_parallel_evaluator():
+    # Süreç havuzu paylaşılan bellekteki senaryoyla seri sonucu vermeli
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    ga = GeneticAlgorithm(population_size=30)
+    ga.initialize_population(len(drones), len(deliveries))
+
+    evaluator = PopulationEvaluator(drones, deliveries, zones)
+    with ParallelEvaluator(evaluator, workers=2) as parallel:
+        scores = parallel.evaluate(ga.population).tolist()
+    print("Paralel fitness:", scores[:3])
+    assert scores == evaluator.evaluate(ga.population).tolist()
+
+def test_fitness_cache():
+    # Klonlar önbellekten, ortak rotalar rota önbelleğinden gelmeli; değerler aynı kalmalı
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    ga = GeneticAlgorithm(population_size=10)
+    ga.initialize_population(len(drones), len(deliveries))
+    population = ga.population + [[list(route) for route in ga.population[0]]]
+    population.append([list(route) for route in ga.population[1]])
+    population[-1][0] = population[-1][0][::-1] + [0]
+
+    evaluator = PopulationEvaluator(drones, deliveries, zones)
+    cache = FitnessCache(evaluator, max_size=8)
+    scores = cache.evaluate(population).tolist()
+    print("Önbellek istatistikleri:", cache.stats)
+    assert scores == evaluator.evaluate(population).tolist()
+    assert cache.hits == 1 and cache.route_hits >= len(drones) - 2
+    assert cache.stats['size'] == 8
+    assert cache.evaluate(population[5:10]).tolist() == scores[5:10] and cache.hits == 6
+
+def test_island_model():
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    ga = GeneticAlgorithm(population_size=12, generations=6)
+    best, fitness, history = ga.optimize_islands(drones, deliveries, zones, islands=2, migration_interval=3)
+
+    print("Ada modeli en iyi fitness:", fitness)
+    assert len(history) == 6 and history == sorted(history)
+    assert fitness == history[-1] == ga.calculate_fitness(best, drones, deliveries, zones)
+    assert len(ga.population) == 24
+
+    # Halka: her adanın en iyisi sonraki adanın en kötüsünün yerine geçer
+    states = [{'population': [[[i]], [[i + 10]]], 'scores': [1.0, 2.0]} for i in range(3)]
+    GeneticAlgorithm._migrate(states, 1, "ring")
+    assert [state['population'][0] for state in states] == [[[12]], [[10]], [[11]]]
+
+def test_array_population():
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    n_drones, n_deliveries = len(drones), len(deliveries)
+    rng = np.random.default_rng(0)
+    population = ArrayPopulation.random(20, n_drones, n_deliveries, rng, smart_count=4)
+    individuals = population.to_individuals()
+
+    # Paketli diziler liste kodlamasıyla aynı fitness'ı vermeli
+    evaluator = PopulationEvaluator(drones, deliveries, zones)
+    assert evaluator.evaluate_packed(population.pack()).tolist() == evaluator.evaluate(individuals).tolist()
+    assert ArrayPopulation.from_individuals(individuals, n_drones, n_deliveries).to_individuals() == individuals
+
+    # Çaprazlama ve mutasyondan sonra turlar permütasyon, bölme noktaları sıralı kalmalı
+    children = ArrayPopulation.empty(20, n_drones, n_deliveries)
+    children.order_crossover(population, rng.integers(0, 20, 20), rng.integers(0, 20, 20))
+    children.mutate(np.arange(20), rng)
+    assert (np.sort(children.tours, axis=1) == np.arange(n_deliveries)).all()
+    assert (np.diff(children.splits, axis=1) >= 0).all() and (children.splits[:, -1] <= n_deliveries).all()
+
+    ga = GeneticAlgorithm(population_size=20, generations=5, encoding="array")
+    best, fitness, history = ga.optimize(drones, deliveries, zones)
+    print("Dizi kodlamalı GA fitness:", fitness)
+    assert fitness == ga.calculate_fitness(best, drones, deliveries, zones)
+
+def test_astar_visibility():
+    zone = NoFlyZone(0, [(40, 30), (60, 30), (60, 50), (40, 50)], ("09:00", "11:00"))
+    astar = AStar([zone])
+    path = astar.find_path((30, 40), (70, 40), current_time="10:00", method="visibility")
+
+    print("A* Görünürlük Rotası:", path)
+    assert path[0] == (30, 40) and path[-1] == (70, 40)
+    for start, end in zip(path, path[1:]):
+        assert astar.is_valid_path(start, end, "10:00")
+    # Varsayılan yöntem 0-100 senaryo koordinatlarında da yol bulmalı
+    assert astar.find_path((30, 40), (70, 40), current_time="10:00") == path
+
+def test_astar_time_dependent():
+    # Bölge 09:30'da kapanıyor; yavaş drone dolaşmak yerine bekleyip düz geçmeli
+    zone = NoFlyZone(0, [(40, 30), (60, 30), (60, 50), (40, 50)], ("09:00", "09:30"))
+    astar = AStar([zone])
+    path, times = astar.find_path_time_dependent((30, 40), (70, 40), "09:00", speed=6.0, return_times=True)
+
+    print("A* Uzay-Zaman Rotası:", path, times)
+    assert path == [(30, 40), (70, 40)]
+    assert times[0][1] == "09:31"
+
+def test_segment_kernel():
+    # Toplu çekirdek tekil kesişim testiyle aynı sonucu vermeli (sınıra değen/doğrusal dahil)
+    polygons = [[(40, 30), (60, 30), (60, 50), (40, 50)], [(0, 0), (10, 0), (5, 8)]]
+    segments = [((30, 40), (70, 40)), ((40, 20), (40, 60)), ((0, 0), (10, 0)),
+                ((20, 20), (30, 30)), ((60, 50), (70, 60)), ((5, -5), (5, 20))]
+    hits = segments_intersect_polygons([s for s, _ in segments], [e for _, e in segments], polygons)
+
+    print("Kesişim matrisi:", hits.tolist())
+    for m, (start, end) in enumerate(segments):
+        for k, polygon in enumerate(polygons):
+            assert hits[m, k] == does_path_intersect_polygon(start, end, polygon)
+
+def test_astar_path_cache():
+    # Aynı sorgu önbellekten dönmeli; bölge listesi değişince önbellek geçersizleşmeli
+    zone = NoFlyZone(0, [(40, 30), (60, 30), (60, 50), (40, 50)], ("09:00", "11:00"))
+    astar = AStar([zone])
+    first = astar.find_path((30, 40), (70, 40), current_time="10:00", method="visibility")
+    second = astar.find_path((30, 40), (70, 40), current_time="10:00", method="visibility")
+    second.append((0, 0))
+    assert astar.find_path((30, 40), (70, 40), current_time="10:00", method="visibility") == first
+    assert astar.cache_info()['hits'] == 2 and astar.cache_info()['misses'] == 1
+
+    # Üstten dolaşan rotayı kapatan yeni bölge yerinde eklenir
+    astar.no_fly_zones.append(NoFlyZone(1, [(35, 45), (65, 45), (65, 60), (35, 60)], ("09:00", "11:00")))
+    third = astar.find_path((30, 40), (70, 40), current_time="10:00", method="visibility")
+    print("A* Önbellek:", astar.cache_info(), third)
+    assert astar.cache_info()['misses'] == 2 and astar.cache_info()['size'] == 1
+    for start, end in zip(third, third[1:]):
+        assert astar.is_valid_path(start, end, "10:00")
+
+def test_obstacle_aware_costs():
+    # Bölge kesen bacaklar düz mesafeden uzun ölçülmeli; çözücüler bu tabloyla çalışmalı
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    astar = AStar(zones)
+    straight = DistanceMatrix(drones, deliveries)
+    costs = DistanceMatrix.obstacle_aware(drones, deliveries, astar, "09:00")
+    n_drones = len(drones)
+    detour = costs.matrix[:, n_drones:]
+    points = straight.points
+    targets = points[n_drones:]
+    blocked = np.array([~astar.valid_segments(np.broadcast_to(point, targets.shape), targets, "09:00")
+                        for point in points]) & (straight.matrix[:, n_drones:] > 0)
+    print("Dolaşan bacak sayısı:", int(blocked.sum()))
+    assert (detour >= straight.matrix[:, n_drones:] - 1e-9).all()
+    assert (detour[blocked] > straight.matrix[:, n_drones:][blocked]).all()
+
+    assignments = CSPSolver().solve(drones, deliveries, zones, method="greedy", commit=False, cost_source=astar)
+    assert all(len(ids) == len(set(ids)) for ids in assignments.values())
+    ga = GeneticAlgorithm(population_size=10, generations=2)
+    best, fitness, _ = ga.optimize(drones, deliveries, zones, cost_source=astar)
+    assert fitness == ga.calculate_fitness(best, drones, deliveries, zones, costs)
+
+def test_adjacency_list():
+    # Izgara ile toplu kurulan komşuluk listesi çift döngülü referansla aynı olmalı
+    zone = NoFlyZone(0, [(40, 30), (60, 30), (60, 50), (40, 50)], ("09:00", "11:00"))
+    astar = AStar([zone])
+    rng = np.random.default_rng(3)
+    nodes = [tuple(point) for point in rng.uniform(30, 70, (300, 2)).round(2).tolist()]
+    astar.build_adjacency_list(nodes, radius=5.0)
+
+    reference = {node: [] for node in nodes}
+    for node in nodes:
+        for other in nodes:
+            distance = calculate_distance(node, other)
+            if node != other and distance <= 5.0:
+                reference[node].append((other, astar.calculate_edge_weight(node, other, distance)))
+    print("Komşuluk kenarı sayısı:", sum(len(edges) for edges in reference.values()))
+    assert astar.adjacency_list == reference
+
+def test_astar_anytime():
+    # Çok küçük bütçede bile geçerli bir yol dönmeli; bütçe arttıkça sınır kötüleşmemeli
+    zone = NoFlyZone(0, [(37.5, 31.5), (38.5, 31.5), (38.5, 32.2), (37.5, 32.2)], ("09:00", "11:00"))
+    astar = AStar([zone])
+    start, goal = (38.0, 30.0), (38.2, 33.5)
+    quick, quick_bound = astar.find_path_anytime(start, goal, "10:00", max_expansions=20)
+    longer, longer_bound = astar.find_path_anytime(start, goal, "10:00", max_expansions=500)
+    deadline, _ = astar.find_path_anytime(start, goal, "10:00", deadline=0.0)
+
+    print("Anytime A* sınırları:", quick_bound, longer_bound)
+    for path in (quick, longer, deadline):
+        assert path[0] == start and calculate_distance(path[-1], goal) <= 0.5
+        for a, b in zip(path, path[1:]):
+            assert astar.is_valid_path(a, b, "10:00")
+    assert 1.0 <= longer_bound <= quick_bound < float('inf')
+
+def test_hierarchical_astar():
+    # Kaba rota + kısaltma: yol geçerli olmalı ve aktif bölgeye girmemeli
+    zone = NoFlyZone(0, [(37.0, 33.0), (41.0, 33.0), (41.0, 34.0), (37.0, 34.0)], ("09:00", "11:00"))
+    astar = AStar([zone])
+    planner = HierarchicalAStar(astar, cell_size=1.0)
+    start, goal = (39.0, 27.0), (39.0, 40.0)
+    path = planner.find_path(start, goal, "10:00")
+
+    print("Hiyerarşik A* yolu:", path, planner.stats)
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert astar.is_valid_path(a, b, "10:00")
+        assert not does_path_intersect_polygon(a, b, zone.coordinates)
+    assert len(path) > 2
+
+def test_zone_index_hits():
+    # ZoneIndex aday süzmeli yolu, blok boyutundan bağımsız olarak tam çekirdekle aynı olmalı
+    zones = [NoFlyZone(0, [(40, 30), (60, 30), (60, 50), (40, 50)], ("09:00", "11:00")),
+             NoFlyZone(1, [(0, 0), (10, 0), (5, 8)], ("09:00", "11:00"))]
+    rng = np.random.default_rng(4)
+    starts, ends = rng.integers(0, 70, (200, 2)), rng.integers(0, 70, (200, 2))
+    reference = segments_intersect_polygons(starts, ends, [zone.coordinates for zone in zones])
+    hits = ZoneIndex(zones).segment_hits(starts, ends, chunk_size=7)
+
+    print("Kesişen parça-bölge çifti:", int(hits.sum()))
+    assert (hits == reference).all()
+    for m in range(len(starts)):
+        for k, zone in enumerate(zones):
+            assert hits[m, k] == does_path_intersect_polygon(tuple(starts[m]), tuple(ends[m]), zone.coordinates)
+
+def test_no_fly_zone_fast_paths():
+    # Derlenmiş geometri ve dışbükey kısayollar özgün poligon testleriyle aynı sonucu vermeli
+    polygons = [[(2, 2), (8, 2), (8, 7), (2, 7)],              # dışbükey, saat yönü tersi
+                [(2, 7), (8, 7), (8, 2), (2, 2)],              # dışbükey, saat yönü
+                [(1, 1), (9, 1), (9, 9), (5, 4), (1, 9)],      # içbükey
+                [(3, 1), (9, 5), (3, 9)]]                      # üçgen
+    rng = np.random.default_rng(11)
+    points = [tuple(p) for p in rng.integers(0, 11, (300, 2)).tolist()]
+    segments = [(tuple(a), tuple(b)) for a, b in rng.integers(0, 11, (300, 2, 2)).tolist()]
+
+    for polygon in polygons:
+        zone = NoFlyZone(0, polygon, ("09:00", "10:00"))
+        print("Bölge:", polygon, "dışbükey:", zone.is_convex)
+        for point in points:
+            assert zone.is_point_inside(point) == point_in_polygon(point, polygon)
+        for start, end in segments:
+            assert zone.does_path_intersect(start, end) == does_path_intersect_polygon(start, end, polygon)
+
+def test_fitness_scenario_cache():
+    # calculate_fitness girdiler değişmedikçe mesafe tablosunu ve filo durumunu yeniden kurmamalı
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    ga = GeneticAlgorithm(population_size=10)
+    ga.initialize_population(len(drones), len(deliveries))
+    scores = [ga.calculate_fitness(individual, drones, deliveries, zones) for individual in ga.population]
+    matrix, fleet = ga._scenario(drones, deliveries)
+    assert ga._scenario(drones, deliveries) == (matrix, fleet)
+
+    # Batarya değişince yalnızca filo durumu yenilenir
+    drones[0].battery /= 2
+    new_matrix, new_fleet = ga._scenario(drones, deliveries)
+    print("Önbellekli fitness:", scores[:3])
+    assert new_matrix is matrix and new_fleet is not fleet
+    assert new_fleet.state(0).battery == drones[0].battery
+    assert ga.calculate_fitness(ga.population[0], drones, deliveries, zones) == \
+        GeneticAlgorithm().calculate_fitness(ga.population[0], drones, deliveries, zones)
+
+def test_time_minutes():
+    # Dakika tabanlı zaman modeli eski strptime tabanlı hesaplarla aynı olmalı
+    def reference_minutes(time_str):
+        parsed = datetime.strptime(time_str, "%H:%M")
+        return parsed.hour * 60 + parsed.minute
+
+    def reference_in_range(time_str, time_range):
+        return (datetime.strptime(time_range[0], "%H:%M") <= datetime.strptime(time_str, "%H:%M")
+                <= datetime.strptime(time_range[1], "%H:%M"))
+
+    times = [f"{h:02d}:{m:02d}" for h in range(24) for m in range(60)]
+    windows = [("09:00", "10:30"), ("00:00", "23:59"), ("12:15", "12:15"), ("22:00", "02:00")]
+    for time_str in times:
+        assert time_to_minutes(time_str) == reference_minutes(time_str)
+        assert minutes_to_time(time_to_minutes(time_str)) == time_str
+        for window in windows:
+            assert is_time_in_range(time_str, window) == reference_in_range(time_str, window)
+    for bad in ("24:00", "12:60", "ab:cd"):
+        for parse in (time_to_minutes, reference_minutes):
+            try:
+                parse(bad)
+                assert False, bad
+            except ValueError:
+                pass
+
+    # Drone saati: eski datetime alanının strftime çıktısıyla aynı kesme ve sarma
+    drone = Drone(0, 5.0, 1000, 10.0, (0, 0))
+    epoch = datetime.strptime("09:00", "%H:%M")
+    for elapsed in (0, 0.4, 59.99, 61.5, 900.25, 1500.0):
+        drone.time_minutes = time_to_minutes("09:00") + elapsed
+        expected = (epoch + timedelta(minutes=elapsed)).strftime("%H:%M")
+        assert drone.current_time_str == expected
+        assert drone.current_minute == reference_minutes(expected)
+    print("Zaman modeli", len(times), "dakika için doğrulandı")
+
+def test_zone_timeline():
+    # Her dakika (ve ara değerler) için maske NoFlyZone.is_active ile aynı olmalı
+    windows = [("09:00", "10:30"), ("00:00", "23:59"), ("12:15", "12:15"), ("22:00", "02:00"),
+               ("10:00", "09:00"), (600.5, 700), (0, 1440), (1430, 1500), (-30, 5)]
+    square = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    zones = [NoFlyZone(i, square, window) for i, window in enumerate(windows)]
+    timeline = ZoneTimeline(zones)
+
+    minutes = [m for m in range(-1, 1442)] + [m + 0.5 for m in range(0, 1440, 7)] + [600.25, 700.0, 700.5]
+    for minute in minutes:
+        mask = timeline.mask_at(minute)
+        for i, zone in enumerate(zones):
+            assert bool(mask >> i & 1) == zone.is_active(minute), (minute, windows[i])
+    for time_str in ("00:00", "09:00", "10:30", "10:31", "23:59"):
+        assert timeline.active_zones(time_str) == [zone for zone in zones if zone.is_active(time_str)]
+    print("Zaman çizelgesi", len(minutes), "an için doğrulandı")
+
+def test_csp_backtracking_budget():
+    # Bütçe hemen tükense de arama açgözlü çözümden geri düşmemeli
+    drones = DataGenerator.generate_drones(8)
+    deliveries = DataGenerator.generate_delivery_points(60)
+    zones = DataGenerator.generate_no_fly_zones(3)
+    greedy = CSP(drones, deliveries)
+    greedy.assign_deliveries(zones, commit=False)
+    greedy_served = sum(len(ids) for ids in greedy.state.assignments(since=greedy.initial_state).values())
+
+    planner = CSP(drones, deliveries)
+    result = planner.assign_deliveries(zones, method="backtracking", max_nodes=1, commit=False)
+    served = sum(len(ids) for ids in result.values())
+    print("Bütçesiz geri izleme:", served, "açgözlü:", greedy_served, planner.search.stats)
+    assert not planner.search.stats['complete']
+    assert served >= greedy_served > 0
+
+def test_csp_incremental_seed():
+    # Bütçe hemen tükense de artımlı planın ilk hali açgözlü çözümden geri düşmemeli
+    drones = DataGenerator.generate_drones(8)
+    deliveries = DataGenerator.generate_delivery_points(60)
+    zones = DataGenerator.generate_no_fly_zones(3)
+    greedy = CSP(drones, deliveries)
+    greedy.assign_deliveries(zones, commit=False)
+    greedy_served = sum(len(ids) for ids in greedy.state.assignments(since=greedy.initial_state).values())
+
+    planner = IncrementalCSP(drones, deliveries, zones, max_nodes=1)
+    served = sum(len(ids) for ids in planner.assignments().values())
+    print("Artımlı ilk plan:", served, "açgözlü:", greedy_served, planner.search.stats)
+    assert served >= greedy_served > 0
+
+def test_auction_shapes():
+    # Tamsayı maliyetlerde açık artırma her biçimde Macar yöntemiyle aynı toplamı bulmalı
+    rng = np.random.default_rng(18)
+    for shape in ((40, 40), (40, 41), (40, 90), (90, 40), (1, 5)):
+        cost = rng.integers(0, 50, shape).astype(float)
+        cost[rng.random(shape) < 0.2] = np.inf
+        expected_rows, expected_cols = linear_assignment(cost)
+        rows, cols = auction_assignment(cost)
+        print("Açık artırma", shape, cost[rows, cols].sum(), cost[expected_rows, expected_cols].sum())
+        assert len(rows) == len(expected_rows) and len(set(cols.tolist())) == len(cols)
+        assert cost[rows, cols].sum() == cost[expected_rows, expected_cols].sum()
+
+def test_fitness_snapshot_position():
+    # Anlık görüntüde yer değiştirmiş drone'un ilk bacağı yeni konumundan ölçülmeli
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    snapshot = FleetState.from_drones(drones).move(0, drones[0], deliveries[5])
+    individual = [[1, 2]] + [[] for _ in drones[1:]]
+    ga = GeneticAlgorithm(population_size=10)
+    ga.initialize_population(len(drones), len(deliveries))
+
+    expected = [ga.calculate_fitness(ind, drones, deliveries, zones, fleet_state=snapshot)
+                for ind in ga.population + [individual]]
+    scores = PopulationEvaluator(drones, deliveries, zones, fleet_state=snapshot).evaluate(
+        ga.population + [individual]).tolist()
+    print("Anlık görüntü fitness:", scores[-1], "başlangıçtan:", ga.calculate_fitness(individual, drones, deliveries, zones))
+    assert scores == expected
+    first_leg = PopulationEvaluator(drones, deliveries, zones, fleet_state=snapshot).first_legs[0, 1]
+    assert first_leg == calculate_distance(deliveries[5].pos, deliveries[1].pos)
+
+def test_genetic_generations():
+    # optimize tüm nesilleri çalıştırmalı; yalnızca durgunlukta erken durabilir
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    ga = GeneticAlgorithm(population_size=20, generations=8)
+    best, fitness, history = ga.optimize(drones, deliveries, zones)
+    print("Nesil geçmişi:", history)
+    assert len(history) == 8 and history == sorted(history)
+    assert fitness == history[-1] == ga.calculate_fitness(best, drones, deliveries, zones)
+
+    ga = GeneticAlgorithm(population_size=20, generations=120)
+    _, _, history = ga.optimize(drones, deliveries, zones)
+    assert len(history) == 120 or (len(history) > 20 and len(set(history[-21:])) == 1)
+
+def test_fitness_cache_optimize():
+    # Nesiller boyunca elit kopyalar ve ortak rotalar önbellekten gelmeli
+    data = DataGenerator.load_predefined_dataset(validate=False)
+    drones, deliveries, zones = data['drones'], data['deliveries'], data['no_fly_zones']
+    ga = GeneticAlgorithm(population_size=20, generations=10, cache_size=4096)
+    best, fitness, history = ga.optimize(drones, deliveries, zones)
+
+    print("optimize önbellek istatistikleri:", ga.fitness_cache.stats)
+    assert len(history) == 10
+    assert ga.fitness_cache.hits > 0 and ga.fitness_cache.route_hits > 0
+    assert fitness == ga.calculate_fitness(best, drones, deliveries, zones)
+
+def test_astar_lazy_deletion():
+    # B önce kötü yoldan (S->B) eklenir, sonra A üzerinden iyileşir; eski heap girdisi atlanmalı
+    S, A, B, G = (0.0, 0.0), (1.0, 0.0), (2.0, 0.0), (10.0, 0.0)
+    graph = {S: [(A, 1.0), (B, 10.0)], A: [(B, 2.0)], B: [(G, 20.0)], G: []}
+    astar = AStar([])
+    expanded = []
+
+    def neighbors(position, current_time, closed_set=None):
+        expanded.append(position)
+        return [(n, w) for n, w in graph[position] if closed_set is None or n not in closed_set]
+
+    astar._grid_neighbors = neighbors
+    astar.improved_heuristic = lambda position, goal, current_time: 0.0
+    path = astar.find_path_grid(S, G, "10:00")
+    cost = sum(dict(graph[a])[b] for a, b in zip(path, path[1:]))
+
+    print("Tembel silme yolu:", path, cost, expanded)
+    assert path == [S, A, B, G] and cost == 23.0
+    # B'nin g=10'luk eski girdisi G'den önce çekilir ama yeniden açılmaz
+    assert expanded == [S, A, B]
+
+def test_feasibility_leg_distances():
+    # Batarya kontrolü hareketlerle aynı tablo mesafesini kullanmalı (düz çizgi değil)
+    drones = [Drone(0, 5.0, 1000, 10.0, (0, 0))]
+    deliveries = [DeliveryPoint(0, (10, 0), 1.0, 3, ("09:00", "17:00"))]
+    straight = DistanceMatrix(drones, deliveries)
+    detour = DistanceMatrix(drones, deliveries, leg_costs=np.array([[100.0], [0.0]]))
+
+    assert FeasibilityMatrix(drones, deliveries, distances=straight).matrix[0, 0]
+    assert not FeasibilityMatrix(drones, deliveries, distances=detour).matrix[0, 0]
+    for method in ("greedy", "hungarian", "backtracking"):
+        planner = CSP(drones, deliveries, detour)
+        result = planner.assign_deliveries(method=method, commit=False)
+        print("Dolaşan bacakla", method, ":", result)
+        assert result == {}
+        assert CSP(drones, deliveries, straight).assign_deliveries(method=method, commit=False) == {0: [0]}
+
+def test_hierarchical_narrow_gap():
+    # Hedef, tek girişi hücreden dar (1.0) bir odada: kaba graf göremez, düz planlayıcıya düşülmeli
+    window = ("09:00", "11:00")
+    room = [NoFlyZone(0, [(40, 40), (60, 40), (60, 42), (40, 42)], window),
+            NoFlyZone(1, [(40, 40), (42, 40), (42, 60), (40, 60)], window),
+            NoFlyZone(2, [(58, 40), (60, 40), (60, 60), (58, 60)], window),
+            NoFlyZone(3, [(40, 58), (49.7, 58), (49.7, 60), (40, 60)], window),
+            NoFlyZone(4, [(50.7, 58), (60, 58), (60, 60), (50.7, 60)], window)]
+    astar = AStar(room)
+    planner = HierarchicalAStar(astar, cell_size=5.0, graph_cache_size=1)
+    start, goal = (30.0, 80.0), (50.0, 50.0)
+    path = planner.find_path(start, goal, "10:00")
+    flat = astar.find_path(start, goal, current_time="10:00")
+
+    print("Dar geçit yolu:", path, planner.stats)
+    assert flat is not None and path is not None
+    assert planner.stats['fallbacks'] == 1
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert astar.is_valid_path(a, b, "10:00")
+
+    # Kaba graf önbelleği graph_cache_size aktif kümeyle sınırlı kalmalı (08:00 ve 12:00 bölgesiz)
+    for current_time in ("08:00", "10:00", "12:00", "10:30"):
+        planner.find_path(start, goal, current_time)
+    assert list(planner._abstract_graphs) == [(astar._zones_signature, astar.active_set("10:30"))]
+
+def test_dataset_self_intersecting_zone():
+    # scenario2.json'daki 1 numaralı bölge kendini kesiyor; validate_dataset uyarmalı
+    with open(os.path.join(os.path.dirname(__file__), "..", "scenario2.json")) as f:
+        scenario = json.load(f)
+    zones = [NoFlyZone(z['id'], [tuple(c) for c in z['coordinates']], tuple(z['active_time']))
+             for z in scenario['no_fly_zones']]
+    drones = DataGenerator.generate_drones(2)
+    deliveries = DataGenerator.generate_delivery_points(5)
+    report = DataGenerator.validate_dataset(drones, deliveries, zones)
+    flagged = [w for w in report['warnings'] if 'kendini kesiyor' in w]
+
+    print("Kendini kesen bölge uyarıları:", flagged)
+    assert not zones[0].is_simple
+    assert "Yasak Bölge 1: Poligon kendini kesiyor, köşe sırasını kontrol edin" in flagged
+    assert len(flagged) == sum(1 for zone in zones if not zone.is_simple)
+    convex = NoFlyZone(9, [(40, 30), (60, 30), (60, 50), (40, 50)], ("09:00", "11:00"))
+    assert not any('kendini kesiyor' in w
+                   for w in DataGenerator.validate_dataset(drones, deliveries, [convex])['warnings'])
+
+def test_csp_backtracking_depth():
+    # Arama derinliği teslimat sayısı kadar olabilir; özyineleme sınırına takılmamalı
+    drones = [Drone(0, 5.0, 10 ** 6, 60.0, (0, 0))]
+    deliveries = [DeliveryPoint(i, (0.5 * (i + 1), 0), 0.1, 3, ("00:00", "23:59")) for i in range(150)]
+    search = BacktrackingSearch(drones, deliveries, [], DistanceMatrix(drones, deliveries),
+                                max_nodes=200, time_limit=30)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(len(inspect.stack()) + 40)
+    try:
+        routes = search.solve()
+    finally:
+        sys.setrecursionlimit(limit)
+    print("Derin arama:", search.stats)
+    assert search.stats['served'] == len(routes[0]) == len(deliveries)
+
+    # Kapanmış pencere kontrolü uygunluk satırlarıyla aynı şekilde gece yarısında sarılır
+    delivery = deliveries[0]
+    delivery.time_window = ("09:00", "17:00")
+    state = search.states[0]
+    assert search._closed(0, state._replace(minutes=time_to_minutes("18:00")), 0)
+    assert not search._closed(0, state._replace(minutes=24 * 60 + time_to_minutes("10:00")), 0)
+
+def test_feasibility_matrix_equivalence():
+    # Vektörel matris her drone × teslimat çifti için CSPConstraints yüklemleriyle aynı sonucu vermeli
+    rng = np.random.default_rng(16)
+    for trial in range(5):
+        zones = [NoFlyZone(z, [tuple(p) for p in (rng.uniform(10, 90, 2) + rng.uniform(-20, 20, (4, 2))).tolist()],
+                           (minutes_to_time(start), minutes_to_time(min(1439, start + int(rng.integers(300, 900))))))
+                 for z, start in enumerate(rng.integers(0, 900, 3).tolist())]
+        drones = [Drone(k, float(rng.uniform(1, 5)), int(rng.integers(200, 3000)), 10.0,
+                        tuple(rng.uniform(0, 100, 2).tolist())) for k in range(6)]
+        for drone in drones:
+            drone.current_pos = tuple(rng.uniform(0, 100, 2).tolist())
+            drone.battery = float(rng.uniform(0, drone.initial_battery))
+            # Gece yarısını aşan saatler de denenir
+            drone.time_minutes = float(rng.uniform(400, 2000))
+        deliveries = []
+        for i in range(25):
+            start = int(rng.integers(0, 1300))
+            window = (minutes_to_time(start), minutes_to_time(min(1439, start + int(rng.integers(0, 900)))))
+            deliveries.append(DeliveryPoint(i, tuple(rng.uniform(0, 100, 2).tolist()), float(rng.uniform(0.5, 4)),
+                                            int(rng.integers(1, 6)), window))
+
+        matrix = FeasibilityMatrix(drones, deliveries, zones).matrix
+        for k, drone in enumerate(drones):
+            for d, delivery in enumerate(deliveries):
+                expected = (CSPConstraints.single_package_constraint(drone, delivery) and
+                            CSPConstraints.battery_constraint(drone, delivery) and
+                            CSPConstraints.time_window_constraint(delivery, drone.current_minute) and
+                            CSPConstraints.no_fly_zone_constraint(drone.current_pos, delivery.pos, zones,
+                                                                  drone.current_minute))
+                assert matrix[k, d] == expected, (trial, k, d)
+        print("Uygunluk matrisi", trial, ":", int(matrix.sum()), "/", matrix.size, "uygun çift")
+
+def test_csp_nearest_table_cost():
+    # Engel duyarlı tabloda düz çizgide en yakın dronlar pahalı olabilir; en ucuz drone yine bulunmalı
+    drones = [Drone(k, 5.0, 10 ** 6, 10.0, (float(k), 0.0)) for k in range(40)]
+    deliveries = [DeliveryPoint(0, (0.0, 1.0), 1.0, 3, ("09:00", "17:00"))]
+    legs = np.full((len(drones) + 1, 1), 1000.0)
+    legs[-2, 0] = calculate_distance(drones[-1].start_pos, deliveries[0].pos)
+    legs[-1, 0] = 0.0
+    costs = DistanceMatrix(drones, deliveries, leg_costs=legs)
+
+    result = CSP(drones, deliveries, costs).assign_deliveries(commit=False)
+    print("Tablo maliyetiyle en ucuz drone:", result)
+    assert result == {drones[-1].id: [0]}
+
+def test_fitness_cache_default_off():
+    # Varsayılan yapılandırma önbelleksizdir: aynı sonuç, önbellekli çalıştırmadan daha kısa süre
+    drones = DataGenerator.generate_drones(8)
+    deliveries = DataGenerator.generate_delivery_points(60)
+    zones = DataGenerator.generate_no_fly_zones(3)
+
+    def run(**kwargs):
+        ga = GeneticAlgorithm(population_size=200, generations=15, **kwargs)
+        random.seed(23)
+        begin = time.perf_counter()
+        best, fitness, history = ga.optimize(drones, deliveries, zones)
+        return time.perf_counter() - begin, (best, fitness, history), ga.fitness_cache
+
+    default = [run() for _ in range(2)]
+    cached = [run(cache_size=4096) for _ in range(2)]
+    default_time, cached_time = min(r[0] for r in default), min(r[0] for r in cached)
+    print(f"Varsayılan: {default_time * 1000:.0f} ms, önbellekli: {cached_time * 1000:.0f} ms")
+    assert default[0][2] is None and cached[0][2] is not None
+    assert default[0][1] == cached[0][1]
+    assert default_time < cached_time
+
 if __name__ == "__main__":
     print("--- CSP Testi ---")
     test_csp()
+    test_csp_backtracking()
+    test_csp_backtracking_budget()
+    test_csp_incremental()
+    test_csp_incremental_seed()
+    test_csp_backtracking_depth()
+    test_fleet_state()
+    test_matching()
+    test_auction_shapes()
+    test_drone_locator()
     print("\n--- Genetik Algoritma Testi ---")
     test_genetic()
+    test_population_evaluator()
+    test_fitness_scenario_cache()
+    test_fitness_snapshot_position()
+    test_time_minutes()
+    test_zone_timeline()
+    test_parallel_evaluator()
+    test_fitness_cache()
+    test_genetic_generations()
+    test_fitness_cache_optimize()
+    test_fitness_cache_default_off()
+    test_island_model()
+    test_array_population()
+    print("\n--- A* Testi ---")
+    test_astar_visibility()
+    test_astar_lazy_deletion()
+    test_astar_time_dependent()
+    test_astar_path_cache()
+    test_obstacle_aware_costs()
+    test_feasibility_leg_distances()
+    test_feasibility_matrix_equivalence()
+    test_csp_nearest_table_cost()
+    test_adjacency_list()
+    test_astar_anytime()
+    test_hierarchical_astar()
+    test_hierarchical_narrow_gap()
+    test_segment_kernel()
+    test_zone_index_hits()
+    test_no_fly_zone_fast_paths()
+    test_dataset_self_intersecting_zone()
 
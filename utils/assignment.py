@@ -0,0 +1,195 @@
+from typing import Optional, Tuple
+import numpy as np
+
+# Açık artırmada aynı anda teklif hesaplanan satır sayısı
+AUCTION_CHUNK_SIZE = 1024
+
+# Açık artırmada fazla sütun oranı bunu aşmıyorsa matris kareye doldurulup ε ölçeklenir
+AUCTION_SQUARE_SLACK = 0.01
+
+def _with_penalty(cost: np.ndarray) -> np.ndarray:
+    """Sonsuz (uygunsuz) hücreleri, hiçbir uygun eşleşmeyi feda ettirmeyecek büyük bir değerle değiştir"""
+    finite = np.isfinite(cost)
+    if finite.all():
+        return cost
+    if not finite.any():
+        return np.zeros_like(cost)
+    low, high = cost[finite].min(), cost[finite].max()
+    penalty = high + (high - low + 1.0) * (min(cost.shape) + 1)
+    return np.where(finite, cost, penalty)
+
+def _finite_pairs(cost: np.ndarray, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    keep = np.isfinite(cost[rows, cols])
+    order = np.argsort(rows[keep], kind="stable")
+    return rows[keep][order], cols[keep][order]
+
+def linear_assignment(cost) -> Tuple[np.ndarray, np.ndarray]:
+    """Dikdörtgen maliyet matrisinde en düşük toplam maliyetli eşleştirme (Macar yöntemi)
+
+    Jonker-Volgenant tarzı en kısa artıran yol; her satır eklenirken iç döngü
+    sütunlar üzerinde vektörel çalışır, O(n²·m). Sonsuz maliyetli çiftler
+    eşleştirilmez. (satır indeksleri, sütun indeksleri) döner.
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    transposed = cost.shape[0] > cost.shape[1]
+    work = _with_penalty(cost.T if transposed else cost)
+    n, m = work.shape
+
+    # 1 tabanlı potansiyeller; 0. sütun yapay başlangıç sütunudur
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=int)
+    way = np.zeros(m + 1, dtype=int)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            free = ~used[1:]
+            reduced = work[i0 - 1] - u[i0] - v[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[~used] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        # Artıran yol boyunca eşleşmeleri kaydır
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+
+    cols = np.nonzero(owner[1:])[0]
+    rows = owner[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+    return _finite_pairs(cost, rows, cols)
+
+def _auction_bids(benefit: np.ndarray, prices: np.ndarray, bidders: np.ndarray,
+                  epsilon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Teklif verenlerin en iyi nesnesi ve teklif fiyatı (en iyi − ikinci en iyi + ε)"""
+    values = benefit[bidders] - prices
+    index = np.arange(len(bidders))
+    best = values.argmax(axis=1)
+    best_value = values[index, best]
+    values[index, best] = -np.inf
+    second_value = values.max(axis=1)
+    return best, prices[best] + best_value - second_value + epsilon
+
+def _release_loose(benefit: np.ndarray, prices: np.ndarray, assigned: np.ndarray, owner: np.ndarray,
+                   epsilon: float, chunk_size: int):
+    """ε-tamamlayıcı gevşeklik koşulunu bozan eşleşmeleri çöz"""
+    for begin in range(0, len(assigned), chunk_size):
+        rows = np.arange(begin, min(begin + chunk_size, len(assigned)))
+        rows = rows[assigned[rows] >= 0]
+        values = benefit[rows] - prices
+        loose = rows[values[np.arange(len(rows)), assigned[rows]] < values.max(axis=1) - epsilon]
+        owner[assigned[loose]] = -1
+        assigned[loose] = -1
+
+def _auction_rounds(benefit: np.ndarray, prices: np.ndarray, assigned: np.ndarray, owner: np.ndarray,
+                    epsilon: float, chunk_size: int):
+    """Tüm satırlar eşleşene kadar Jacobi teklif turları (her tur tek vektörel geçiş)"""
+    while True:
+        bidders = np.nonzero(assigned < 0)[0]
+        if len(bidders) == 0:
+            return
+        if len(bidders) == 1:
+            # Tek teklif veren: çakışma yok, sıralama adımları atlanır
+            bidder = bidders[0]
+            values = benefit[bidder] - prices
+            target = int(values.argmax())
+            best_value = values[target]
+            values[target] = -np.inf
+            previous = owner[target]
+            if previous >= 0:
+                assigned[previous] = -1
+            owner[target] = bidder
+            assigned[bidder] = target
+            prices[target] += best_value - values.max() + epsilon
+            continue
+        results = [_auction_bids(benefit, prices, bidders[begin:begin + chunk_size], epsilon)
+                   for begin in range(0, len(bidders), chunk_size)]
+        targets = np.concatenate([target for target, _ in results])
+        bids = np.concatenate([bid for _, bid in results])
+
+        # Her nesne için en yüksek teklif kazanır
+        order = np.lexsort((-bids, targets))
+        first = np.concatenate(([True], targets[order][1:] != targets[order][:-1]))
+        winners, objects, prices_won = bidders[order][first], targets[order][first], bids[order][first]
+        previous = owner[objects]
+        assigned[previous[previous >= 0]] = -1
+        owner[objects] = winners
+        assigned[winners] = objects
+        prices[objects] = prices_won
+
+def auction_assignment(cost, epsilon: Optional[float] = None,
+                       chunk_size: int = AUCTION_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """Bertsekas açık artırmasıyla en düşük maliyetli eşleştirme
+
+    Önerilen yöntem linear_assignment'tır (Macar): her maliyet için tam en
+    iyidir. Açık artırma tamsayı maliyetlerde aynı toplamı verir. Kısa kenar teklif verir; açıkta
+    kalan tüm satırlar aynı turda vektörel olarak teklif verir (Jacobi) ve
+    teklifler satır blokları halinde hesaplanır. Kareye yakın matrisler yapay
+    satırlarla doldurulup ε ölçeklemesiyle çözülür; belirgin dikdörtgenlerde
+    fiyatlar sıfırdan başlayıp tek ε ile ilerler (hiç teklif almayan nesnelerin
+    fiyatı sıfır kalır, bu da en iyiliği korur). Sonuç en iyiden en fazla n·ε
+    uzaktadır; ε verilmezse tamsayı maliyetlerde 1/(n+1) seçilir ve sonuç tam
+    en iyidir. Sonsuz maliyetli çiftler eşleştirilmez.
+    """
+    cost = np.asarray(cost, dtype=float)
+    if cost.size == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    transposed = cost.shape[0] > cost.shape[1]
+    work = _with_penalty(cost.T if transposed else cost)
+    n_rows, n_cols = work.shape
+    if epsilon is None:
+        # Tamsayı maliyetlerde toplam hata n·ε < 1 olduğundan sonuç tam en iyidir
+        spread = max(float(work.max() - work.min()), 1.0)
+        epsilon = 1.0 / (n_rows + 1) if np.all(work == np.round(work)) else spread * 1e-9 / n_rows
+
+    if n_cols - n_rows > n_rows * AUCTION_SQUARE_SLACK:
+        benefit = -work
+        prices = np.zeros(n_cols)
+        assigned = np.full(n_rows, -1)
+        _auction_rounds(benefit, prices, assigned, np.full(n_cols, -1), epsilon, chunk_size)
+    else:
+        # Yapay satırlar sıfır kazançlı
+        benefit = np.zeros((n_cols, n_cols))
+        benefit[:n_rows] = -work
+        assigned = _scaled_auction(benefit, epsilon, chunk_size)[:n_rows]
+
+    rows = np.arange(n_rows)
+    if transposed:
+        return _finite_pairs(cost, assigned, rows)
+    return _finite_pairs(cost, rows, assigned)
+
+def _scaled_auction(benefit: np.ndarray, epsilon: float, chunk_size: int) -> np.ndarray:
+    """Kare kazanç matrisinde ε ölçeklemeli açık artırma; satır başına nesne döner"""
+    n = len(benefit)
+    if n == 1:
+        return np.zeros(1, dtype=int)
+    spread = max(float(benefit.max() - benefit.min()), 1.0)
+    prices = np.zeros(n)
+    assigned = np.full(n, -1)
+    owner = np.full(n, -1)
+    step = spread / 2
+    while True:
+        step = max(step, epsilon)
+        # Yeni ε ile koşulu bozan eşleşmeler çözülür, diğerleri korunur
+        _release_loose(benefit, prices, assigned, owner, step, chunk_size)
+        _auction_rounds(benefit, prices, assigned, owner, step, chunk_size)
+        if step <= epsilon:
+            return assigned
+        step /= 5
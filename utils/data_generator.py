@@ -6,12 +6,13 @@ from typing import List, Tuple, Dict
 from models.drone import Drone
 from models.delivery_point import DeliveryPoint
 from models.no_fly_zone import NoFlyZone
+from utils.distance_matrix import DistanceMatrix
 
 class DataGenerator:
     
     @staticmethod
     def validate_dataset(drones: List[Drone], deliveries: List[DeliveryPoint], 
-                        no_fly_zones: List[NoFlyZone]) -> Dict[str, any]:
+                        no_fly_zones: List[NoFlyZone], distance_matrix: DistanceMatrix = None) -> Dict[str, any]:
         """VERİ SETİ DOĞRULAMA - YENİ EKLENEN ÖZELLİK"""
         validation_report = {
             'is_valid': True,
@@ -40,14 +41,10 @@ class DataGenerator:
             )
         
         # 3. Batarya kontrolleri
-        max_distance = 0
-        for delivery in deliveries:
-            for drone in drones:
-                distance = math.sqrt(
-                    (delivery.pos[0] - drone.start_pos[0])**2 + 
-                    (delivery.pos[1] - drone.start_pos[1])**2
-                )
-                max_distance = max(max_distance, distance)
+        if distance_matrix is None:
+            distance_matrix = DistanceMatrix(drones, deliveries)
+        block = distance_matrix.drone_delivery_block()
+        max_distance = float(block.max()) if block.size else 0
         
         min_battery = min(d.battery for d in drones)
         estimated_energy_need = max_distance * 10  # Basit tahmin
@@ -57,7 +54,14 @@ class DataGenerator:
                 f"En düşük batarya ({min_battery}) uzak teslimatlar için yetersiz olabilir"
             )
         
-        # 4. İstatistikler
+        # 4. Yasak bölge kontrolleri (kendini kesen poligonlarda dışbükey hızlı yollar kullanılamaz)
+        for nfz in no_fly_zones:
+            if len(nfz.coordinates) >= 3 and not nfz.is_simple:
+                validation_report['warnings'].append(
+                    f"Yasak Bölge {nfz.id}: Poligon kendini kesiyor, köşe sırasını kontrol edin"
+                )
+        
+        # 5. İstatistikler
         validation_report['statistics'] = {
             'total_drones': len(drones),
             'total_deliveries': len(deliveries),
@@ -79,6 +79,10 @@ class DataValidator:
                 if not (0 <= x <= 100) or not (0 <= y <= 100):
                     errors.append(f"❌ Yasak Bölge {nfz.id}: Geçersiz {i+1}. koordinat ({x}, {y})")
             
+            # Kendini kesen poligonlarda dışbükey hızlı yollar kullanılamaz
+            if len(nfz.coordinates) >= 3 and not nfz.is_simple:
+                warnings.append(f"⚠️ Yasak Bölge {nfz.id}: Poligon kendini kesiyor, köşe sırasını kontrol edin")
+            
             # Zaman penceresi kontrolü
             try:
                 start_time, end_time = nfz.active_time
@@ -87,7 +91,7 @@ class DataValidator:
             except:
                 errors.append(f"❌ Yasak Bölge {nfz.id}: Zaman formatı hatalı")
         
-        return len(errors) == 0, errors
+        return len(errors) == 0, errors + warnings
     
     @staticmethod
     def validate_scenario_compatibility(drones: List[Drone], deliveries: List[DeliveryPoint]) -> tuple[bool, List[str]]:
@@ -132,13 +136,13 @@ class DataValidator:
         # Ayrı ayrı doğrulama
         drone_valid, drone_errors = DataValidator.validate_drones(drones)
         delivery_valid, delivery_errors = DataValidator.validate_deliveries(deliveries)
-        nfz_valid, nfz_errors = DataValidator.validate_no_fly_zones(no_fly_zones)
+        nfz_valid, nfz_messages = DataValidator.validate_no_fly_zones(no_fly_zones)
         compat_valid, compat_messages = DataValidator.validate_scenario_compatibility(drones, deliveries)
         
-        all_errors.extend(drone_errors + delivery_errors + nfz_errors)
+        all_errors.extend(drone_errors + delivery_errors)
         
-        # Uyumluluk mesajlarını ayır
-        for msg in compat_messages:
+        # Yasak bölge ve uyumluluk mesajlarını ayır
+        for msg in nfz_messages + compat_messages:
             if msg.startswith("❌"):
                 all_errors.append(msg)
             else:
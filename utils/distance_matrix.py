@@ -0,0 +1,100 @@
+from typing import List, Tuple
+import numpy as np
+from utils.geometry import calculate_distance
+from utils.time_utils import TimeValue, minutes_to_time
+
+# float64 matris bu boyutu aşarsa float32'ye geçilir (bayt)
+DISTANCE_MATRIX_MAX_BYTES = 256 * 1024 * 1024
+
+class DistanceMatrix:
+    """Senaryo başına bir kez kurulan ikili mesafe tablosu
+
+    Düğümler önce drone başlangıç noktaları, sonra teslimat noktalarıdır;
+    erişim drone ve teslimat id'leri ile yapılır.
+    """
+
+    def __init__(self, drones, deliveries, dtype=None, max_bytes: int = DISTANCE_MATRIX_MAX_BYTES,
+                 leg_costs: np.ndarray = None):
+        self.drone_nodes = {drone.id: i for i, drone in enumerate(drones)}
+        self.delivery_nodes = {delivery.id: len(drones) + j for j, delivery in enumerate(deliveries)}
+
+        points = [tuple(drone.start_pos) for drone in drones] + [tuple(delivery.pos) for delivery in deliveries]
+        self.points = np.asarray(points, dtype=float).reshape(-1, 2)
+        n = len(points)
+        if dtype is None:
+            dtype = np.float64 if n * n * 8 <= max_bytes else np.float32
+        self.dtype = np.dtype(dtype)
+
+        # Satır blokları halinde doldurulur; ara dizi n × n float64'e şişmez
+        self.matrix = np.empty((n, n), dtype=self.dtype)
+        block = max(1, int(max_bytes // max(1, n * 16)))
+        for begin in range(0, n, block):
+            diff = self.points[begin:begin + block, None, :] - self.points[None, :, :]
+            self.matrix[begin:begin + block] = np.sqrt(diff[..., 0] ** 2 + diff[..., 1] ** 2)
+        # Verilirse (düğümler × teslimatlar) bacak maliyetleri teslimat sütunlarının yerine geçer
+        if leg_costs is not None:
+            self.matrix[:, len(drones):] = leg_costs
+
+        # Konum -> düğüm (aynı konumda ilk düğüm kullanılır)
+        self._position_nodes = {}
+        for i, point in enumerate(points):
+            self._position_nodes.setdefault(point, i)
+
+    @classmethod
+    def obstacle_aware(cls, drones, deliveries, astar, current_time: TimeValue = None, **kwargs) -> 'DistanceMatrix':
+        """Teslimata giden bacakları AStar.leg_cost_matrix ile yasak bölgeleri dolaşarak ölçen tablo
+
+        current_time verilmezse dronların en erken saatindeki aktif bölgeler kullanılır;
+        ulaşılamayan bacaklar np.inf olur.
+        """
+        if current_time is None:
+            current_time = minutes_to_time(min((drone.time_minutes for drone in drones), default=0))
+        return cls(drones, deliveries, leg_costs=astar.leg_cost_matrix(drones, deliveries, current_time), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    @property
+    def nbytes(self) -> int:
+        return self.matrix.nbytes
+
+    def drone_node(self, drone_id: int) -> int:
+        return self.drone_nodes[drone_id]
+
+    def delivery_node(self, delivery_id: int) -> int:
+        return self.delivery_nodes[delivery_id]
+
+    def node_distance(self, node_a: int, node_b: int) -> float:
+        return float(self.matrix[node_a, node_b])
+
+    def drone_to_delivery(self, drone_id: int, delivery_id: int) -> float:
+        return float(self.matrix[self.drone_nodes[drone_id], self.delivery_nodes[delivery_id]])
+
+    def delivery_to_delivery(self, from_id: int, to_id: int) -> float:
+        return float(self.matrix[self.delivery_nodes[from_id], self.delivery_nodes[to_id]])
+
+    def drone_delivery_block(self) -> np.ndarray:
+        """Drone başlangıçları × teslimatlar alt matrisi"""
+        n_drones = len(self.drone_nodes)
+        return self.matrix[:n_drones, n_drones:]
+
+    def between(self, pos_a: Tuple[float, float], pos_b: Tuple[float, float]) -> float:
+        """İki konum arası mesafe; tabloda olmayan konumlar için doğrudan hesaplanır"""
+        node_a = self._position_nodes.get(tuple(pos_a))
+        node_b = self._position_nodes.get(tuple(pos_b))
+        if node_a is None or node_b is None:
+            return calculate_distance(pos_a, pos_b)
+        return float(self.matrix[node_a, node_b])
+
+    def block(self, positions: List[Tuple[float, float]], delivery_ids: List[int]) -> np.ndarray:
+        """Konumlar × teslimatlar mesafe alt matrisi; tabloda olmayan konumlar doğrudan hesaplanır"""
+        columns = np.asarray([self.delivery_nodes[delivery_id] for delivery_id in delivery_ids], dtype=np.int64)
+        result = np.empty((len(positions), len(columns)), dtype=float)
+        for i, pos in enumerate(positions):
+            node = self._position_nodes.get(tuple(pos))
+            if node is not None:
+                result[i] = self.matrix[node, columns]
+            else:
+                diff = self.points[columns] - np.asarray(pos, dtype=float)
+                result[i] = np.sqrt(diff[:, 0] ** 2 + diff[:, 1] ** 2)
+        return result
@@ -0,0 +1,102 @@
+import math
+from typing import List, Tuple
+
+class DroneLocator:
+    """Dronların anlık konumları üzerinde düzgün ızgara indeksi
+
+    positions verilmezse Drone.current_pos her değiştiğinde (move_to, şarj,
+    reset) dinleyiciyle hücresi güncellenir; verilirse (ör. FleetState)
+    konumlar move ile güncellenir. nearest halka halka genişleyerek en yakın
+    dronları bulur. İş bitince close() ile dinleyiciler bırakılmalıdır (ya da with).
+    """
+
+    def __init__(self, drones, cell_size: float = None, positions: List[Tuple[float, float]] = None):
+        self.drones = list(drones)
+        self._indices = {id(drone): k for k, drone in enumerate(self.drones)}
+        self._tracking = positions is None
+        self.positions = [drone.current_pos for drone in self.drones] if positions is None else list(positions)
+
+        if cell_size is None:
+            # Hücre başına ortalama bir drone düşecek boyut
+            xs = [pos[0] for pos in self.positions]
+            ys = [pos[1] for pos in self.positions]
+            extent = max(max(xs) - min(xs), max(ys) - min(ys)) if self.drones else 0.0
+            cell_size = extent / math.sqrt(len(self.drones)) if extent > 0 else 1.0
+        self.cell_size = cell_size
+
+        self._cells = {}
+        self._cell_of = []
+        for k, pos in enumerate(self.positions):
+            cell = self._cell(pos)
+            self._cell_of.append(cell)
+            self._cells.setdefault(cell, set()).add(k)
+            if self._tracking:
+                self.drones[k].add_position_listener(self._moved)
+
+    def __len__(self) -> int:
+        return len(self.drones)
+
+    def __enter__(self) -> 'DroneLocator':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._tracking:
+            for drone in self.drones:
+                drone.remove_position_listener(self._moved)
+
+    def _cell(self, pos: Tuple[float, float]) -> Tuple[int, int]:
+        return (math.floor(pos[0] / self.cell_size), math.floor(pos[1] / self.cell_size))
+
+    def _moved(self, drone):
+        self.move(self._indices[id(drone)], drone.current_pos)
+
+    def move(self, k: int, pos: Tuple[float, float]):
+        self.positions[k] = pos
+        cell = self._cell(pos)
+        if cell != self._cell_of[k]:
+            self._cells[self._cell_of[k]].discard(k)
+            self._cells.setdefault(cell, set()).add(k)
+            self._cell_of[k] = cell
+
+    def _ring(self, cx: int, cy: int, ring: int):
+        """Merkez hücreye Chebyshev uzaklığı tam olarak ring olan hücreler"""
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
+
+    def nearest(self, pos: Tuple[float, float], k: int) -> List[int]:
+        """pos'a en yakın k drone'un indeksleri ((mesafe, indeks) sırasıyla)
+
+        i. halka tarandıktan sonra taranmamış her drone en az i × hücre boyu
+        uzaktadır; k. aday bundan kesin yakınsa arama durur.
+        """
+        k = min(k, len(self.drones))
+        if k <= 0:
+            return []
+        cx, cy = self._cell(pos)
+        found = []
+        ring = 0
+        while True:
+            for cell in self._ring(cx, cy, ring):
+                for i in self._cells.get(cell, ()):
+                    x, y = self.positions[i]
+                    # DistanceMatrix ile aynı formül: eşit mesafeler bit bit eşit kalır
+                    found.append((math.sqrt((x - pos[0]) ** 2 + (y - pos[1]) ** 2), i))
+            if len(found) == len(self.drones):
+                break
+            if len(found) >= k:
+                found.sort()
+                if found[k - 1][0] < ring * self.cell_size:
+                    break
+            ring += 1
+        found.sort()
+        return [i for _, i in found[:k]]
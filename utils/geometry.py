@@ -1,5 +1,6 @@
 import math
-from typing import Tuple, List
+import numpy as np
+from typing import Tuple, List, Optional
 
 def calculate_distance(point1: Tuple[float, float], point2: Tuple[float, float]) -> float:
     return math.sqrt((point2[0] - point1[0])**2 + (point2[1] - point1[1])**2)
@@ -50,3 +51,219 @@ def point_in_polygon(point: Tuple[float, float], polygon: List[Tuple[float, floa
                         inside = not inside
         p1x, p1y = p2x, p2y
     return inside
+
+def polygon_edge_arrays(polygons: List[List[Tuple[float, float]]]):
+    """Poligon kenarlarını düz dizilere aç: (kenar başları, kenar sonları, poligon başlangıç indeksleri)"""
+    edge_starts, edge_ends, offsets = [], [], []
+    for polygon in polygons:
+        offsets.append(len(edge_starts))
+        n = len(polygon)
+        for i in range(n):
+            edge_starts.append(polygon[i])
+            edge_ends.append(polygon[(i + 1) % n])
+    return (np.asarray(edge_starts, dtype=float).reshape(-1, 2),
+            np.asarray(edge_ends, dtype=float).reshape(-1, 2),
+            np.asarray(offsets, dtype=np.int64))
+
+def _orientation_array(p, q, r):
+    """orientation() ile aynı aritmetik: 0 doğrusal, 1 saat yönü, 2 saat yönü tersi"""
+    val = (q[..., 1] - p[..., 1]) * (r[..., 0] - q[..., 0]) - (q[..., 0] - p[..., 0]) * (r[..., 1] - q[..., 1])
+    return np.where(val == 0, 0, np.where(val > 0, 1, 2))
+
+def _on_segment_array(p, q, r):
+    return ((q[..., 0] <= np.maximum(p[..., 0], r[..., 0])) & (q[..., 0] >= np.minimum(p[..., 0], r[..., 0])) &
+            (q[..., 1] <= np.maximum(p[..., 1], r[..., 1])) & (q[..., 1] >= np.minimum(p[..., 1], r[..., 1])))
+
+def segments_intersect_edges(starts: np.ndarray, ends: np.ndarray,
+                             edge_starts: np.ndarray, edge_ends: np.ndarray) -> np.ndarray:
+    """M doğru parçası × E kenar kesişim matrisi (does_segment_intersect_segment ile birebir)"""
+    return segments_intersect_pairwise(starts[:, None, :], ends[:, None, :],
+                                       edge_starts[None, :, :], edge_ends[None, :, :])
+
+def segments_intersect_pairwise(p1: np.ndarray, p2: np.ndarray, p3: np.ndarray, p4: np.ndarray) -> np.ndarray:
+    """(p1, p2) ve (p3, p4) parçalarını eleman eleman test et (yayınlanabilir diziler)"""
+    o1 = _orientation_array(p1, p2, p3)
+    o2 = _orientation_array(p1, p2, p4)
+    o3 = _orientation_array(p3, p4, p1)
+    o4 = _orientation_array(p3, p4, p2)
+
+    return (((o1 != o2) & (o3 != o4)) |
+            ((o1 == 0) & _on_segment_array(p1, p3, p2)) |
+            ((o2 == 0) & _on_segment_array(p1, p4, p2)) |
+            ((o3 == 0) & _on_segment_array(p3, p1, p4)) |
+            ((o4 == 0) & _on_segment_array(p3, p2, p4)))
+
+def segments_intersect_polygons(starts, ends, polygons: List[List[Tuple[float, float]]],
+                                chunk_size: int = 4096, edges=None, candidates=None) -> np.ndarray:
+    """M doğru parçasını K poligonun tüm kenarlarıyla toplu test et -> (M, K) bool matris
+
+    Sonuçlar does_path_intersect_polygon ile aynıdır (doğrusal durumlar dahil).
+    Bellek için parçalar chunk_size'lık bloklar halinde işlenir. edges, aynı
+    poligonlar için önceden hesaplanmış polygon_edge_arrays çıktısı olabilir.
+    candidates verilirse (blok başlangıçları, blok sonları) -> (m, K) aday maskesi
+    döndürmelidir; kenar testi yalnızca aday çiftler için yapılır.
+    """
+    starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+    result = np.zeros((len(starts), len(polygons)), dtype=bool)
+    if len(starts) == 0 or len(polygons) == 0:
+        return result
+
+    edge_starts, edge_ends, offsets = edges if edges is not None else polygon_edge_arrays(polygons)
+    if len(edge_starts) == 0:
+        return result
+    # Boş poligonların sütunu False kalır
+    counts = np.diff(np.append(offsets, len(edge_starts)))
+    non_empty = counts > 0
+
+    for begin in range(0, len(starts), chunk_size):
+        block_starts, block_ends = starts[begin:begin + chunk_size], ends[begin:begin + chunk_size]
+        if candidates is None:
+            hits = segments_intersect_edges(block_starts, block_ends, edge_starts, edge_ends)
+            result[begin:begin + chunk_size, non_empty] = np.logical_or.reduceat(hits, offsets[non_empty], axis=1)
+        else:
+            result[begin:begin + chunk_size] = _candidate_pair_hits(
+                block_starts, block_ends, candidates(block_starts, block_ends) & non_empty,
+                edge_starts, edge_ends, offsets, counts)
+    return result
+
+def _candidate_pair_hits(starts: np.ndarray, ends: np.ndarray, mask: np.ndarray, edge_starts: np.ndarray,
+                         edge_ends: np.ndarray, offsets: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """mask'teki her (parça, poligon) çiftini yalnızca o poligonun kenarlarıyla test et"""
+    result = np.zeros(mask.shape, dtype=bool)
+    seg_idx, poly_idx = np.nonzero(mask)
+    if len(seg_idx) == 0:
+        return result
+
+    # Her aday çift, poligonunun tüm kenarlarına açılır
+    pair_counts = counts[poly_idx]
+    pair_offsets = np.concatenate(([0], np.cumsum(pair_counts)[:-1]))
+    pair_of_edge = np.repeat(np.arange(len(seg_idx)), pair_counts)
+    edge_idx = offsets[poly_idx][pair_of_edge] + (np.arange(pair_counts.sum()) - pair_offsets[pair_of_edge])
+    hits = segments_intersect_pairwise(starts[seg_idx[pair_of_edge]], ends[seg_idx[pair_of_edge]],
+                                       edge_starts[edge_idx], edge_ends[edge_idx])
+    result[seg_idx, poly_idx] = np.logical_or.reduceat(hits, pair_offsets)
+    return result
+
+def polygon_edges(polygon: List[Tuple[float, float]]) -> List[Tuple[Tuple[float, float], Tuple[float, float]]]:
+    """Kapalı poligonun (başlangıç, bitiş) kenar çiftleri"""
+    n = len(polygon)
+    return [(polygon[i], polygon[(i + 1) % n]) for i in range(n)]
+
+def does_path_intersect_edges(start: Tuple[float, float], end: Tuple[float, float], edges) -> bool:
+    """does_path_intersect_polygon'ın önceden hesaplanmış kenar listesiyle çalışan hali"""
+    for edge_start, edge_end in edges:
+        if does_segment_intersect_segment(start, end, edge_start, edge_end):
+            return True
+    return False
+
+def polygon_bbox(polygon: List[Tuple[float, float]]) -> Tuple[float, float, float, float]:
+    """(min_x, min_y, max_x, max_y)"""
+    xs = [x for x, _ in polygon]
+    ys = [y for _, y in polygon]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+def polygon_signed_area(polygon: List[Tuple[float, float]]) -> float:
+    """Pozitif: saat yönü tersi sıralama"""
+    n = len(polygon)
+    return sum(polygon[i][0] * polygon[(i + 1) % n][1] - polygon[(i + 1) % n][0] * polygon[i][1]
+               for i in range(n)) / 2
+
+def polygon_centroid(polygon: List[Tuple[float, float]]) -> Tuple[float, float]:
+    """Alan ağırlık merkezi (alan sıfırsa köşelerin ortalaması)"""
+    n = len(polygon)
+    area = polygon_signed_area(polygon)
+    if area == 0:
+        return (sum(x for x, _ in polygon) / n, sum(y for _, y in polygon) / n)
+    cx = cy = 0.0
+    for i in range(n):
+        (x1, y1), (x2, y2) = polygon[i], polygon[(i + 1) % n]
+        factor = x1 * y2 - x2 * y1
+        cx += (x1 + x2) * factor
+        cy += (y1 + y2) * factor
+    return (cx / (6 * area), cy / (6 * area))
+
+def polygon_is_simple(polygon: List[Tuple[float, float]]) -> bool:
+    """Komşu olmayan kenarlar kesişmiyorsa poligon basittir (kendini kesmez)"""
+    edges = polygon_edges(polygon)
+    n = len(edges)
+    for i in range(n):
+        for j in range(i + 2, n):
+            if i == 0 and j == n - 1:
+                continue  # İlk ve son kenar komşudur
+            if does_segment_intersect_segment(edges[i][0], edges[i][1], edges[j][0], edges[j][1]):
+                return False
+    return True
+
+def _cross(o, a, b) -> float:
+    """(a - o) × (b - o); pozitif: b, o->a'nın solunda"""
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+def polygon_is_convex(polygon: List[Tuple[float, float]]) -> bool:
+    """Tüm dönüşler aynı yöndeyse ve poligon basitse dışbükeydir"""
+    n = len(polygon)
+    if n < 3:
+        return False
+    turns = [_cross(polygon[i], polygon[(i + 1) % n], polygon[(i + 2) % n]) for i in range(n)]
+    if all(t >= 0 for t in turns) or all(t <= 0 for t in turns):
+        return any(t != 0 for t in turns) and polygon_is_simple(polygon)
+    return False
+
+def point_in_convex_polygon(point: Tuple[float, float], ring: List[Tuple[float, float]]) -> Optional[bool]:
+    """Saat yönü tersi dışbükey poligonda O(log n) nokta testi
+
+    Nokta bir kenar doğrusunun tam üzerindeyse None döner; sınır davranışı
+    point_in_polygon'a bırakılır.
+    """
+    n = len(ring)
+    origin = ring[0]
+    first = _cross(origin, ring[1], point)
+    last = _cross(origin, ring[n - 1], point)
+    if first < 0 or last > 0:
+        return False
+    if first == 0 or last == 0:
+        return None
+
+    # v0'dan çıkan yelpazede noktayı içeren dilimi ikili arama ile bul
+    low, high = 1, n - 1
+    while high - low > 1:
+        middle = (low + high) // 2
+        if _cross(origin, ring[middle], point) >= 0:
+            low = middle
+        else:
+            high = middle
+    side = _cross(ring[low], ring[high], point)
+    if side == 0:
+        return None
+    return side > 0
+
+def segment_touches_convex_polygon(start: Tuple[float, float], end: Tuple[float, float],
+                                   ring: List[Tuple[float, float]]) -> Optional[bool]:
+    """Parça saat yönü tersi dışbükey poligonun sınırına değiyor mu (yarı düzlem testi)
+
+    does_path_intersect_polygon gibi yalnızca sınır temasını sayar: tamamen içte
+    kalan parça False'tur. Doğrusal/sınır durumlarında None döner.
+    """
+    n = len(ring)
+    start_inside = end_inside = True
+    for i in range(n):
+        a, b = ring[i], ring[(i + 1) % n]
+        side_start = _cross(a, b, start)
+        side_end = _cross(a, b, end)
+        if side_start == 0 or side_end == 0:
+            return None
+        if side_start < 0 and side_end < 0:
+            return False  # Bu kenarın doğrusu parçayı poligondan ayırıyor
+        start_inside = start_inside and side_start > 0
+        end_inside = end_inside and side_end > 0
+
+    if start_inside and end_inside:
+        return False
+    if start_inside or end_inside:
+        return True
+
+    # İki uç da dışarıda: poligon parçanın doğrusunun tek tarafındaysa kesişme yok
+    sides = [_cross(start, end, vertex) for vertex in ring]
+    if any(side == 0 for side in sides):
+        return None
+    return not (all(side > 0 for side in sides) or all(side < 0 for side in sides))
@@ -0,0 +1,36 @@
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+import numpy as np
+
+# İsim -> (paylaşılan bellek adı, şekil, dtype)
+ArraySpec = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+def publish(arrays: Dict[str, np.ndarray]) -> Tuple[List[shared_memory.SharedMemory], ArraySpec]:
+    """Dizileri paylaşılan belleğe bir kez kopyala; bloklar yayıncıda kapatılıp unlink edilmelidir"""
+    blocks, spec = [], {}
+    for key, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+        blocks.append(block)
+        spec[key] = (block.name, array.shape, array.dtype.str)
+    return blocks, spec
+
+def attach(spec: ArraySpec) -> Tuple[List[shared_memory.SharedMemory], Dict[str, np.ndarray]]:
+    """Yayınlanmış dizilere kopyasız bağlan (bloklar dizilerle birlikte canlı tutulmalı)"""
+    blocks, arrays = [], {}
+    for key, (name, shape, dtype) in spec.items():
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13: işçiler yayıncının resource_tracker'ını paylaşır, kayıt tekrarı zararsızdır
+            block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return blocks, arrays
+
+def release(blocks: List[shared_memory.SharedMemory], unlink: bool = False):
+    for block in blocks:
+        block.close()
+        if unlink:
+            block.unlink()
@@ -0,0 +1,150 @@
+import math
+from collections import OrderedDict
+from typing import List, Tuple
+import numpy as np
+from utils.geometry import segments_intersect_polygons
+from utils.time_utils import TimeValue
+from utils.zone_timeline import ZoneTimeline
+
+# ZoneIndex.for_zones ile paylaşılan indekslerin en fazla sayısı
+ZONE_INDEX_CACHE_SIZE = 8
+
+_index_cache = OrderedDict()
+
+class ZoneIndex:
+    """Yasak bölgelerin sınır kutuları üzerinde düzgün ızgara indeksi
+
+    query_segment yalnızca kutusu parçaya değen aday bölgeleri döndürür;
+    kesin kenar testi sadece bu adaylar için yapılır.
+    """
+
+    def __init__(self, no_fly_zones, cell_size: float = None):
+        self.zones = list(no_fly_zones)
+        # Bölgelerin önceden derlenmiş sınır kutuları ve kenar dizileri kullanılır
+        self.boxes = np.array([nfz.bbox if nfz.bbox is not None else (np.inf, np.inf, -np.inf, -np.inf)
+                               for nfz in self.zones], dtype=float).reshape(-1, 4)
+        finite = self.boxes[np.isfinite(self.boxes).all(axis=1)]
+        # Sınıra değen parçalar kayan nokta hatasıyla elenmesin diye kutular hafif büyütülür
+        scale = max(1.0, float(np.abs(finite).max())) if len(finite) else 1.0
+        self._eps = 1e-9 * scale
+
+        self._edge_counts = np.array([len(nfz.edges) for nfz in self.zones], dtype=np.int64)
+        self._edge_offsets = np.concatenate(([0], np.cumsum(self._edge_counts)[:-1])).astype(np.int64)
+        self.edge_starts = np.concatenate([nfz.edge_starts for nfz in self.zones] + [np.empty((0, 2))])
+        self.edge_ends = np.concatenate([nfz.edge_ends for nfz in self.zones] + [np.empty((0, 2))])
+        self._polygons = [nfz.coordinates for nfz in self.zones]
+
+        if cell_size is None:
+            sizes = np.maximum(finite[:, 2] - finite[:, 0], finite[:, 3] - finite[:, 1]) if len(finite) else []
+            cell_size = float(np.mean(sizes)) if len(sizes) and np.mean(sizes) > 0 else 1.0
+        self.cell_size = cell_size
+
+        self._timeline = None
+        self._grid = {}
+        for k, (min_x, min_y, max_x, max_y) in enumerate(self.boxes.tolist()):
+            if not math.isfinite(min_x):
+                continue
+            for cell in self._cells_in(min_x, min_y, max_x, max_y):
+                self._grid.setdefault(cell, []).append(k)
+
+    @classmethod
+    def for_zones(cls, no_fly_zones) -> 'ZoneIndex':
+        """Aynı bölge listesi için indeksi bir kez kur ve paylaş"""
+        if isinstance(no_fly_zones, ZoneIndex):
+            return no_fly_zones
+        key = tuple(id(nfz) for nfz in no_fly_zones)
+        index = _index_cache.get(key)
+        if index is None:
+            index = cls(no_fly_zones)
+            _index_cache[key] = index
+            if len(_index_cache) > ZONE_INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+        else:
+            _index_cache.move_to_end(key)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    @property
+    def timeline(self) -> ZoneTimeline:
+        """Bölgelerin aktiflik zaman çizelgesi (ilk erişimde kurulur)"""
+        if self._timeline is None:
+            self._timeline = ZoneTimeline(self.zones)
+        return self._timeline
+
+    def __iter__(self):
+        return iter(self.zones)
+
+    def _cells_in(self, min_x: float, min_y: float, max_x: float, max_y: float):
+        for cx in range(math.floor(min_x / self.cell_size), math.floor(max_x / self.cell_size) + 1):
+            for cy in range(math.floor(min_y / self.cell_size), math.floor(max_y / self.cell_size) + 1):
+                yield (cx, cy)
+
+    def query_segment(self, start: Tuple[float, float], end: Tuple[float, float],
+                      current_time: TimeValue = None) -> List:
+        """Kutusu parçaya değen aday bölgeler (özgün sırayla)
+
+        current_time verilirse yalnızca o anda aktif olan adaylar döner.
+        """
+        if not self.zones:
+            return []
+        active = self.timeline.mask_at(current_time) if current_time is not None else -1
+        if active == 0:
+            return []
+        min_x, max_x = min(start[0], end[0]), max(start[0], end[0])
+        min_y, max_y = min(start[1], end[1]), max(start[1], end[1])
+        span = ((math.floor(max_x / self.cell_size) - math.floor(min_x / self.cell_size) + 1) *
+                (math.floor(max_y / self.cell_size) - math.floor(min_y / self.cell_size) + 1))
+        if span > len(self.zones):
+            # Uzun parçalarda hücre taramak tüm kutuları test etmekten pahalı
+            indices = np.arange(len(self.zones))
+            if current_time is not None:
+                indices = np.array([k for k in indices.tolist() if active >> k & 1], dtype=np.int64)
+        else:
+            found = set()
+            for cell in self._cells_in(min_x - self._eps, min_y - self._eps, max_x + self._eps, max_y + self._eps):
+                found.update(self._grid.get(cell, ()))
+            if current_time is not None:
+                found = {k for k in found if active >> k & 1}
+            if not found:
+                return []
+            indices = np.array(sorted(found))
+        mask = self._box_overlap(np.asarray([start], dtype=float), np.asarray([end], dtype=float),
+                                 self.boxes[indices])[0]
+        return [self.zones[k] for k in indices[mask].tolist()]
+
+    def candidates(self, starts, ends) -> np.ndarray:
+        """Parçalar × bölgeler aday maskesi (sınır kutusu testi)"""
+        starts = np.asarray(starts, dtype=float).reshape(-1, 2)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 2)
+        return self._box_overlap(starts, ends, self.boxes)
+
+    def segment_hits(self, starts, ends, chunk_size: int = 4096) -> np.ndarray:
+        """Parçalar × bölgeler kesin kesişim matrisi
+
+        Parçalar chunk_size'lık bloklar halinde işlenir; kenar testi yalnızca
+        sınır kutusu adayı olan çiftlerde yapılır.
+        """
+        return segments_intersect_polygons(starts, ends, self._polygons, chunk_size=chunk_size,
+                                           edges=(self.edge_starts, self.edge_ends, self._edge_offsets),
+                                           candidates=self.candidates)
+
+    def _box_overlap(self, starts: np.ndarray, ends: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+        """Parça-kutu kesişimi (Liang-Barsky), (M, K) bool"""
+        lower = boxes[None, :, :2] - self._eps
+        upper = boxes[None, :, 2:] + self._eps
+        origin = starts[:, None, :]
+        direction = (ends - starts)[:, None, :]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_lower = (lower - origin) / direction
+            t_upper = (upper - origin) / direction
+        t_near = np.where(direction > 0, t_lower, np.where(direction < 0, t_upper, -np.inf))
+        t_far = np.where(direction > 0, t_upper, np.where(direction < 0, t_lower, np.inf))
+        # Eksene paralel parça kutunun o eksendeki aralığı dışındaysa kesişmez
+        parallel_out = (direction == 0) & ((origin < lower) | (origin > upper))
+
+        enter = np.maximum(t_near.max(axis=2), 0.0)
+        leave = np.minimum(t_far.min(axis=2), 1.0)
+        return (enter <= leave) & ~parallel_out.any(axis=2)
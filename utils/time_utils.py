@@ -1,8 +1,49 @@
-from datetime import datetime
-from typing import Tuple
-
-def is_time_in_range(time_str: str, time_range: Tuple[str, str]) -> bool:
-    start_time = datetime.strptime(time_range[0], "%H:%M")
-    end_time = datetime.strptime(time_range[1], "%H:%M")
-    check_time = datetime.strptime(time_str, "%H:%M")
-    return start_time <= check_time <= end_time
+from functools import lru_cache
+from typing import NamedTuple, Tuple, Union
+
+DAY_MINUTES = 24 * 60
+
+# Zaman değerleri "HH:MM" dizgesi ya da gün içi dakika olabilir
+TimeValue = Union[str, int, float]
+
+def is_time_in_range(time_str: TimeValue, time_range) -> bool:
+    return TimeWindow.parse(time_range).contains(time_to_minutes(time_str))
+
+@lru_cache(maxsize=4096)
+def _parse_minutes(time_str: str) -> int:
+    hours, minutes = time_str.split(":")
+    hours, minutes = int(hours), int(minutes)
+    if not (0 <= hours <= 23 and 0 <= minutes <= 59):
+        raise ValueError(f"time data '{time_str}' does not match format '%H:%M'")
+    return hours * 60 + minutes
+
+def time_to_minutes(time_str: TimeValue) -> int:
+    """HH:MM biçimindeki zamanı gün içi dakikaya çevir (sayılar olduğu gibi döner)"""
+    if isinstance(time_str, str):
+        return _parse_minutes(time_str)
+    return time_str
+
+def minutes_to_time(minutes: float) -> str:
+    """Gün içi dakikayı HH:MM formatına çevir (24 saati aşarsa başa sarar)"""
+    total = int(minutes) % DAY_MINUTES
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+class TimeWindow(NamedTuple):
+    """Bir kez ayrıştırılmış [başlangıç, bitiş] dakika aralığı (uçlar dahil)"""
+    start: int
+    end: int
+
+    @classmethod
+    def parse(cls, window) -> 'TimeWindow':
+        """("HH:MM", "HH:MM"), dakika çifti ya da TimeWindow kabul eder"""
+        if isinstance(window, TimeWindow):
+            return window
+        start, end = window
+        return cls(time_to_minutes(start), time_to_minutes(end))
+
+    def contains(self, minute: float) -> bool:
+        # Gece yarısını saran pencereler (başlangıç > bitiş) hiç içermez
+        return self.start <= minute <= self.end
+
+    def as_strings(self) -> Tuple[str, str]:
+        return (minutes_to_time(self.start), minutes_to_time(self.end))
@@ -0,0 +1,77 @@
+from bisect import bisect_right
+from typing import List, Optional, Tuple
+import math
+from utils.time_utils import TimeValue, DAY_MINUTES, time_to_minutes
+
+class ZoneTimeline:
+    """Gün içi her dakika için aktif yasak bölge bit maskesi
+
+    i. bit, i. bölgenin aktif olduğunu gösterir. Tam dakikalar O(1), ara
+    değerler iki komşu dakikanın kesişimiyle cevaplanır; NoFlyZone.is_active
+    ile aynı sonucu verir.
+    """
+
+    def __init__(self, no_fly_zones):
+        self.zones = list(no_fly_zones)
+        # Son eleman 24:00 (DAY_MINUTES) dakikası içindir
+        self._masks = [0] * (DAY_MINUTES + 1)
+        # Dakika sınırına oturmayan pencereler her sorguda doğrudan değerlendirilir
+        self._irregular = []
+
+        events = {}
+        for i, nfz in enumerate(self.zones):
+            start, end = nfz.active_window
+            if start > end:
+                continue  # Gece yarısını saran pencereler hiç aktif değil
+            if start != int(start) or end != int(end):
+                self._irregular.append((1 << i, nfz.active_window))
+                continue
+            first, last = max(int(start), 0), min(int(end), DAY_MINUTES)
+            if first > last:
+                continue
+            events[first] = events.get(first, 0) ^ (1 << i)
+            events[last + 1] = events.get(last + 1, 0) ^ (1 << i)
+
+        mask = 0
+        previous = 0
+        for minute in sorted(events):
+            self._masks[previous:minute] = [mask] * (minute - previous)
+            mask ^= events[minute]
+            previous = minute
+        self._masks[previous:] = [mask] * (len(self._masks) - previous)
+
+        # Aktif kümenin değiştiği dakikalar
+        self._changes = [minute for minute in range(1, DAY_MINUTES + 1)
+                         if self._masks[minute] != self._masks[minute - 1]]
+
+    def mask_at(self, current_time: TimeValue) -> int:
+        """Verilen andaki aktif bölgelerin bit maskesi"""
+        minute = time_to_minutes(current_time)
+        if minute < 0 or minute > DAY_MINUTES:
+            # Gün dışı anlar tabloda yok; pencereler doğrudan değerlendirilir
+            return sum(1 << i for i, nfz in enumerate(self.zones) if nfz.active_window.contains(minute))
+        elif minute == int(minute):
+            mask = self._masks[int(minute)]
+        else:
+            floor = math.floor(minute)
+            mask = self._masks[floor] & self._masks[min(floor + 1, DAY_MINUTES)]
+        for bit, window in self._irregular:
+            if window.contains(minute):
+                mask |= bit
+        return mask
+
+    def active_indices(self, current_time: TimeValue) -> Tuple[int, ...]:
+        mask = self.mask_at(current_time)
+        return tuple(i for i in range(len(self.zones)) if mask >> i & 1)
+
+    def active_zones(self, current_time: TimeValue) -> List:
+        return [self.zones[i] for i in self.active_indices(current_time)]
+
+    def next_change(self, current_time: TimeValue) -> Optional[int]:
+        """Aktif kümenin değişeceği ilk tam dakika (gün içinde yoksa None)
+
+        Düzensiz (tam dakikaya oturmayan) pencereler hesaba katılmaz.
+        """
+        minute = time_to_minutes(current_time)
+        position = bisect_right(self._changes, minute)
+        return self._changes[position] if position < len(self._changes) else None